@@ -0,0 +1,240 @@
+"""
+Exhaustive statistics over every hand, streamed through a process pool.
+
+    python analytics.py hands [--checkpoint PATH] [--processes N]
+    python analytics.py deals [--checkpoint PATH] [--processes N] [--limit CHUNKS]
+
+hands scores every 4 card keep with every top card, 12,994,800 in all, with the
+scoring tables GameState.score uses, for the score distribution and how often and
+how much each kind of meld scores. The score does not depend on which card is the
+top card, so each 5 card hand is scored once and counted 5 times.
+
+deals solves every 6 card deal, 20,358,520 in all, with discard_solver for the
+dealer and the pone, for the distribution of the best expected values and how often
+the two lay away differently. Deals are enumerated by suit isomorphism class
+(962,988 classes), each solved once and counted once per deal in the class.
+
+Work is split into chunks, every finished chunk is added into the checkpoint
+file, and a run with the same checkpoint skips the chunks already in it. Workers
+only return histograms, so memory stays flat however many hands are processed.
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from canonical import classes, first_masks
+from deck import CARDS
+from discard_solver import best_canonical
+from scoring import (CARD_RANK_KEY, CARD_SUIT_KEY, fifteens, flush_score, matches,
+                     rank_counts, straights, suit_counts, tables)
+
+# deals chunks hold the classes starting with this many consecutive first masks
+MASKS_PER_CHUNK = 32
+# expected values are bucketed to the nearest EV_BUCKET points
+EV_BUCKET = 0.5
+
+CATEGORIES = ('fifteens', 'runs', 'pairs', 'flush')
+
+_category_scores = {}
+
+
+class Histograms:
+    """
+    Named histograms of counts, which can be merged and saved as JSON
+    """
+
+    def __init__(self, histograms=None):
+        self.histograms = {name: Counter(h) for name, h in (histograms or {}).items()}
+
+    def add(self, name, key, count=1):
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = Counter()
+        h[key] += count
+
+    def merge(self, other):
+        for name, h in other.histograms.items():
+            for key, count in h.items():
+                self.add(name, key, count)
+
+    def total(self, name):
+        return sum(self.histograms.get(name, {}).values())
+
+    def mean(self, name):
+        h = self.histograms.get(name, {})
+        total = sum(h.values())
+        return sum(float(k) * c for k, c in h.items()) / total if total else 0.0
+
+    def to_dict(self):
+        return {name: {str(k): c for k, c in sorted(h.items())} for name, h in self.histograms.items()}
+
+
+def category_scores(ranks, suits):
+    """
+    (fifteens, runs, pairs, flush) points of encoded rank and suit histograms
+    """
+    scores = _category_scores.get((ranks, suits))
+    if scores is None:
+        counts = rank_counts(ranks)
+        scores = _category_scores[ranks, suits] = (
+            fifteens(counts), straights(counts), matches(counts), flush_score(suit_counts(suits)))
+    return scores
+
+
+def hands_chunk(high):
+    """
+    Histograms of the 5 card hands whose highest card id is high
+    """
+    rank_scores, flush_scores = tables()
+    rank_keys, suit_keys = CARD_RANK_KEY, CARD_SUIT_KEY
+    keys = Counter()
+    r4, s4 = rank_keys[high], suit_keys[high]
+    for c3 in range(3, high):
+        r3, s3 = r4 + rank_keys[c3], s4 + suit_keys[c3]
+        for c2 in range(2, c3):
+            r2, s2 = r3 + rank_keys[c2], s3 + suit_keys[c2]
+            for c1 in range(1, c2):
+                r1, s1 = r2 + rank_keys[c1], s2 + suit_keys[c1]
+                for c0 in range(c1):
+                    keys[r1 + rank_keys[c0], s1 + suit_keys[c0]] += 1
+    stats = Histograms()
+    for (ranks, suits), hands in keys.items():
+        # 5 ways to pick the top card out of the 5 cards
+        combos = 5 * hands
+        stats.add('score', rank_scores[ranks] + flush_scores[suits], combos)
+        for name, points in zip(CATEGORIES, category_scores(ranks, suits)):
+            stats.add(name, points, combos)
+    return stats
+
+
+def hands_chunks():
+    return list(range(4, 52))
+
+
+def deals_chunk(start):
+    """
+    Histograms of the deals in the classes starting with the MASKS_PER_CHUNK first masks from start
+    """
+    stats = Histograms()
+    for first in first_masks(6)[start:start + MASKS_PER_CHUNK]:
+        for masks, deals in classes(6, first):
+            hand = [CARDS[13 * suit + r] for suit, m in enumerate(masks) for r in range(13) if m >> r & 1]
+            dealer = best_canonical(hand, True)
+            pone = best_canonical(hand, False)
+            for role, (_, _, hand_ev, crib_ev) in (('dealer', dealer), ('pone', pone)):
+                ev = hand_ev + crib_ev if role == 'dealer' else hand_ev - crib_ev
+                stats.add(f'{role}_ev', _bucket(ev), deals)
+                stats.add(f'{role}_hand_ev', _bucket(hand_ev), deals)
+            stats.add('same_discard', int(dealer[0] == pone[0]), deals)
+    return stats
+
+
+def deals_chunks():
+    return list(range(0, len(first_masks(6)), MASKS_PER_CHUNK))
+
+
+def _bucket(value):
+    return round(value / EV_BUCKET) * EV_BUCKET
+
+
+JOBS = {'hands': (hands_chunk, hands_chunks), 'deals': (deals_chunk, deals_chunks)}
+
+
+def load_checkpoint(path, job):
+    """
+    The chunks done and their merged histograms, empty when there is no checkpoint yet
+    """
+    if path is None or not os.path.exists(path):
+        return set(), Histograms()
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint['job'] != job:
+        raise ValueError(f"Checkpoint {path} is for {checkpoint['job']}, not {job}.")
+    histograms = {name: {float(k) if '.' in k else int(k): c for k, c in h.items()}
+                  for name, h in checkpoint['histograms'].items()}
+    return set(checkpoint['done']), Histograms(histograms)
+
+
+def save_checkpoint(path, job, done, stats):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'job': job, 'done': sorted(done), 'histograms': stats.to_dict()}, f)
+    os.replace(tmp_path, path)
+
+
+def run(job, checkpoint=None, processes=None, limit=None, progress=None):
+    """
+    Runs the chunks of the job not in the checkpoint yet, at most limit of them,
+    and returns the Histograms of every chunk done
+    """
+    work, chunks = JOBS[job]
+    done, stats = load_checkpoint(checkpoint, job)
+    everything = chunks()
+    todo = [(work, c) for c in everything if c not in done][:limit]
+    if processes == 1:
+        results = map(_run_chunk, todo)
+        pool = None
+    else:
+        pool = Pool(processes)
+        results = pool.imap_unordered(_run_chunk, todo)
+    try:
+        for chunk, chunk_stats in results:
+            stats.merge(chunk_stats)
+            done.add(chunk)
+            if checkpoint is not None:
+                save_checkpoint(checkpoint, job, done, stats)
+            if progress is not None:
+                progress(len(done), len(everything))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return stats
+
+
+def _run_chunk(args):
+    work, chunk = args
+    return chunk, work(chunk)
+
+
+def report(job, stats):
+    total = stats.total('score' if job == 'hands' else 'dealer_ev')
+    if not total:
+        # nothing finished yet, such as a new or empty checkpoint
+        return f"No {job} results yet"
+    lines = []
+    if job == 'hands':
+        lines.append(f"{total:,} keeps and top cards, average score {stats.mean('score'):.3f}")
+        for name in CATEGORIES:
+            h = stats.histograms.get(name, {})
+            scoring = sum(c for k, c in h.items() if k)
+            lines.append(f"{name:<9} scores in {scoring / total:6.1%}, average {stats.mean(name):.3f} points")
+        lines.append('score  share')
+        for score, count in sorted(stats.histograms['score'].items()):
+            lines.append(f"{score:>5}  {count / total:.5%}")
+    else:
+        lines.append(f"{total:,} deals")
+        for role in ('dealer', 'pone'):
+            lines.append(f"{role:<6} best ev {stats.mean(f'{role}_ev'):.3f}, "
+                         f"best keep hand ev {stats.mean(f'{role}_hand_ev'):.3f}")
+        same = stats.histograms.get('same_discard', {}).get(1, 0)
+        lines.append(f"dealer and pone lay away the same cards in {same / total:.1%} of deals")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('job', choices=sorted(JOBS))
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=None)
+    args = parser.parse_args()
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"{done}/{total} chunks, {time.perf_counter() - start:.0f}s", flush=True)
+
+    stats = run(args.job, args.checkpoint, args.processes, args.limit, progress)
+    print(report(args.job, stats))
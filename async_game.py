@@ -0,0 +1,92 @@
+"""
+GameState for asyncio, where the input function may return an awaitable.
+
+AsyncGameState keeps all the rules of GameState and only overrides the phases
+that ask for a decision, so a table waiting on a move yields to the event loop
+instead of blocking a thread. Strategies may return awaitables as well.
+"""
+import inspect
+
+from game_state import GameOver, GameState
+
+
+class AsyncGameState(GameState):
+
+    async def play(self):
+        self.message('Welcome to Cribbage :)')
+        try:
+            while True:
+                for phase in self.phases:
+                    result = phase()
+                    if inspect.isawaitable(result):
+                        await result
+                    if self.recorder is not None:
+                        self.recorder.after_phase(phase.__name__)
+        except GameOver as over:
+            if self.recorder is not None:
+                self.recorder.finish(over.player)
+            self.message('{}', over)
+            return over.player
+
+    async def prompt_crib(self, player):
+        self.to_move, self.decision = player, 'discard'
+        strategy = self.strategies.get(player)
+        if strategy is not None:
+            cards = strategy.choose_discard(list(player.hand), player == self.dealer)
+            if inspect.isawaitable(cards):
+                cards = await cards
+            self.lay_away(player, cards)
+            return
+        self.message("Lay away...")
+        self.crib.append(await self.select_card(player.hand))
+        self.message("Lay away...")
+        self.crib.append(await self.select_card(player.hand))
+        self.end_crib(player)
+
+    async def select_card(self, cards):
+        while True:
+            self.message("Please select a card by index:")
+            inpt = self.input(list(enumerate(cards)))
+            if inspect.isawaitable(inpt):
+                inpt = await inpt
+            idx = self.parse_index(inpt, cards)
+            if idx is not None:
+                return cards.pop(idx)
+
+    async def make_crib(self):
+        self.message(
+            'Cards should now be layed away into the crib. Please pass the game to player 1')
+        self.message('Player 1:')
+        await self.prompt_crib(self.player1)
+
+        self.message('Please pass the game to player 2')
+        self.message('Player 2:')
+        await self.prompt_crib(self.player2)
+
+        self.message('The crib has been created.')
+
+    async def cut(self):
+        if self.cut_rng is not None or self.strategies.get(self.pone()) is not None:
+            return super().cut()
+        self.to_move, self.decision = self.pone(), 'cut'
+        self.message("Please select a number to cut the deck by...")
+        self.top_card = await self.select_card(self.deck)
+        self.message("The center card is {}", self.top_card)
+
+    async def start(self):
+        self.begin_play()
+        playable_cards = self.next_turn()
+        while playable_cards:
+            self.play_card(await self.choose_play(playable_cards))
+            playable_cards = self.next_turn()
+
+    async def choose_play(self, playable_cards):
+        player = self.to_move
+        strategy = self.strategies.get(player)
+        if strategy is None:
+            return await self.select_card(playable_cards)
+        card = strategy.choose_play(playable_cards, self.count, self.played_stack, player.hand,
+                                    self.top_card, self.passed is not None)
+        if inspect.isawaitable(card):
+            card = await card
+        return card
@@ -0,0 +1,83 @@
+"""
+Scores batches of 5 card hands with NumPy.
+
+score_batch takes an (N, 5) integer array of card ids (see deck.Card.id) and
+returns the (N,) scores GameState.score would give each hand, computed with
+array operations over the whole batch instead of Python loops over melds.
+"""
+from itertools import combinations
+
+import numpy as np
+
+HAND_SIZE = 5
+
+# columns of 0/1 picking every subset of the hand with at least 2 cards,
+# float so the subset sums go through a BLAS matrix product
+SUBSETS = np.array([[1 if i in subset else 0 for i in range(HAND_SIZE)]
+                    for size in range(2, HAND_SIZE + 1)
+                    for subset in combinations(range(HAND_SIZE), size)], dtype=np.float32).T
+
+POINTS = np.minimum(np.arange(13) + 1, 10).astype(np.float32)  # by rank index
+
+# hands scored at once, to bound the memory of the intermediate arrays
+CHUNK_SIZE = 1 << 20
+
+
+def score_batch(ids):
+    """
+    Scores of an (N, 5) array of card ids
+    """
+    ids = np.asarray(ids)
+    if ids.ndim != 2 or ids.shape[1] != HAND_SIZE:
+        raise ValueError(f"Hands have shape {ids.shape}. It should be (N, {HAND_SIZE}).")
+    scores = np.empty(len(ids), dtype=np.int16)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        scores[start:start + CHUNK_SIZE] = _score_chunk(ids[start:start + CHUNK_SIZE])
+    return scores
+
+
+def _score_chunk(ids):
+    ranks = ids % 13
+    suits = ids // 13
+    rank_counts = histogram(ranks, 13)
+    return fifteens(POINTS[ranks]) + straights(rank_counts) + \
+        matches(rank_counts) + flushes(histogram(suits, 4))
+
+
+def histogram(values, size):
+    """
+    (N, size) counts of each value in every row of values
+    """
+    n = len(values)
+    offsets = (np.arange(n) * size)[:, None]
+    return np.bincount((values + offsets).ravel(), minlength=n * size).reshape(n, size).astype(np.int16)
+
+
+def fifteens(points):
+    # 2 points for every subset adding to 15
+    sums = points @ SUBSETS
+    return 2 * np.count_nonzero(sums == 15, axis=1).astype(np.int16)
+
+
+def straights(rank_counts):
+    # every meld of 3 or more consecutive ranks scores its length,
+    # once for each way of picking one card of every rank.
+    # ways[:, r] is the number of melds of the current length starting at rank r
+    c = rank_counts
+    ways = c[:, :-2] * c[:, 1:-1] * c[:, 2:]
+    score = 3 * ways.sum(axis=1, dtype=np.int16)
+    for length in range(4, HAND_SIZE + 1):
+        ways = ways[:, :-1] * c[:, length - 1:]
+        score += length * ways.sum(axis=1, dtype=np.int16)
+    return score
+
+
+def matches(rank_counts):
+    # 2 points for every pair of cards with the same rank
+    return (rank_counts * (rank_counts - 1)).sum(axis=1, dtype=np.int16)
+
+
+def flushes(suit_counts):
+    # 4 points for every 4 cards of the same suit
+    c = suit_counts
+    return (c * (c - 1) * (c - 2) * (c - 3) // 6).sum(axis=1, dtype=np.int16)
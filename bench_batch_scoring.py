@@ -0,0 +1,42 @@
+"""
+Hands per second of score_batch across batch sizes, against score_hand.
+
+    python bench_batch_scoring.py [largest batch]
+"""
+import sys
+import time
+
+import numpy as np
+
+from batch_scoring import score_batch
+from deck import CARDS
+from scoring import build_tables, score_hand
+
+
+def random_hands(n, rng):
+    # 5 distinct card ids per row
+    return np.argsort(rng.random((n, 52)), axis=1)[:, :5] if n <= 100000 else \
+        np.concatenate([random_hands(100000, rng) for _ in range(n // 100000)])
+
+
+def main(largest):
+    rng = np.random.default_rng(0)
+    build_tables()
+    hands = random_hands(10000, rng)
+    cards = [[CARDS[i] for i in hand] for hand in hands.tolist()]
+    start = time.perf_counter()
+    for hand in cards:
+        score_hand(hand)
+    print(f"{'score_hand':<12} {'':>10} {len(cards) / (time.perf_counter() - start):>14,.0f} hands/sec")
+    n = 1000
+    while n <= largest:
+        hands = random_hands(n, rng)
+        start = time.perf_counter()
+        score_batch(hands)
+        elapsed = time.perf_counter() - start
+        print(f"{'score_batch':<12} {n:>10,} {n / elapsed:>14,.0f} hands/sec")
+        n *= 10
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000000)
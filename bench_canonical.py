@@ -0,0 +1,27 @@
+"""
+Hands per second through canonicalize and canonical_key.
+
+    python bench_canonical.py [hands]
+"""
+import random
+import sys
+import time
+
+from canonical import canonical_key, canonicalize
+from deck import CARDS
+
+
+def main(n):
+    rng = random.Random(0)
+    for size in (4, 5, 6):
+        hands = [rng.sample(CARDS, size) for _ in range(n)]
+        for name, fn in [('canonicalize', canonicalize), ('canonical_key', canonical_key)]:
+            start = time.perf_counter()
+            for hand in hands:
+                fn(hand)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<14} {size} cards {n / elapsed:>12,.0f} hands/sec")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,38 @@
+"""
+Search speed and latency of PeggingSearch from the lead of random play phases.
+
+    python bench_pegging_search.py [positions] [max nodes]
+"""
+import random
+import sys
+
+from deck import CARDS
+from pegging import PeggingScorer
+from pegging_search import PeggingSearch
+
+
+def main(positions, max_nodes):
+    rng = random.Random(0)
+    for hidden in (False, True):
+        search = PeggingSearch(max_nodes=max_nodes, rng=random.Random(0))
+        nodes = 0
+        elapsed = 0.0
+        worst = 0.0
+        for _ in range(positions):
+            cards = rng.sample(CARDS, 8)
+            hand, opponent_hand = cards[:4], cards[4:]
+            if hidden:
+                unseen = [c for c in CARDS if c not in hand]
+                search.best_play(hand, PeggingScorer(), unseen=unseen, opponent_cards=4)
+            else:
+                search.best_play(hand, PeggingScorer(), opponent_hand)
+            nodes += search.stats.nodes
+            elapsed += search.stats.elapsed
+            worst = max(worst, search.stats.elapsed)
+        print(f"{'hidden' if hidden else 'known':<7} {nodes / elapsed:>10,.0f} nodes/sec "
+              f"{elapsed / positions * 1000:>8.2f}ms mean {worst * 1000:>8.2f}ms max")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
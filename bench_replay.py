@@ -0,0 +1,39 @@
+"""
+Replay speed in games per second, and the time to jump to a random move
+with and without snapshots.
+
+    python bench_replay.py [games]
+"""
+import random
+import sys
+import time
+
+from replay import SNAPSHOT_EVERY, Replay
+from simulator import recorded_games
+from strategy import GreedyStrategy, RandomStrategy
+
+
+def main(n):
+    records = [r.record for r in recorded_games([GreedyStrategy, RandomStrategy], n)]
+    start = time.perf_counter()
+    for record in records:
+        Replay.from_record(record, snapshot_every=None).final_state()
+    elapsed = time.perf_counter() - start
+    print(f"{'full replay':<24} {n / elapsed:>10,.0f} games/sec")
+
+    rng = random.Random(0)
+    for snapshot_every in (None, SNAPSHOT_EVERY):
+        replays = [Replay.from_record(record, snapshot_every) for record in records]
+        for replay in replays:
+            # the first pass fills the snapshots
+            replay.final_state()
+        start = time.perf_counter()
+        for replay in replays:
+            replay.state_at(rng.randrange(len(replay)))
+        elapsed = time.perf_counter() - start
+        label = f"jump, snapshots {snapshot_every or 'off'}"
+        print(f"{label:<24} {n / elapsed:>10,.0f} jumps/sec")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,51 @@
+"""
+Compares hands per second of the scoring tables against the score_meld powerset walk.
+
+    python bench_scoring.py [hands]
+"""
+import random
+import sys
+import time
+
+from deck import Deck
+from events import NullSink
+from game_state import GameState
+from scoring import build_tables, score_hand
+
+
+def random_hands(n, seed=0):
+    rng = random.Random(seed)
+    deck = Deck.shuffled()
+    hands = []
+    for _ in range(n):
+        cards = rng.sample(deck, 5)
+        hands.append((cards[:4], cards[4]))
+    return hands
+
+
+def bench_powerset(hands):
+    gs = GameState(events=NullSink())
+    start = time.perf_counter()
+    for hand, top_card in hands:
+        for meld in GameState.powerset(hand + [top_card]):
+            gs.score_meld(meld)
+    return time.perf_counter() - start
+
+
+def bench_tables(hands):
+    build_tables()
+    start = time.perf_counter()
+    for hand, top_card in hands:
+        score_hand(hand, top_card)
+    return time.perf_counter() - start
+
+
+def main(n):
+    hands = random_hands(n)
+    for name, bench in [('score_meld powerset', bench_powerset), ('score_hand tables', bench_tables)]:
+        elapsed = bench(hands)
+        print(f"{name:<20} {n / elapsed:>12,.0f} hands/sec")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,56 @@
+"""
+Forking a game in the middle of play phase: copy.deepcopy against GameState.clone,
+state() and restore(), and apply() and undo() of a single move.
+
+    python bench_snapshot.py [forks]
+"""
+import copy
+import random
+import sys
+import time
+
+from events import NullSink
+from game_state import GameState
+
+
+def mid_play_game(seed=0):
+    """
+    A game right after the first card of a round is played
+    """
+    rng = random.Random(seed)
+    game = GameState(inputFn=None, events=NullSink(), rng=rng)
+    game.begin_round()
+    while game.decision != 'play':
+        game.apply(rng.choice(list(game.moves())))
+    game.apply(game.moves()[0])
+    game.history = []
+    return game
+
+
+def rate(n, fn):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def main(n):
+    game = mid_play_game()
+    state = game.state()
+    move = game.moves()[0]
+
+    def apply_undo():
+        game.apply(move)
+        game.undo()
+
+    for name, fn in [('copy.deepcopy', lambda: copy.deepcopy(game)),
+                     ('clone', game.clone),
+                     ('state', game.state),
+                     ('restore', lambda: game.restore(state)),
+                     ('apply + undo', apply_undo)]:
+        print(f"{name:<16} {rate(n, fn):>12,.0f} /sec")
+    print(f"state size {len(state)} bytes")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
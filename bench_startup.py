@@ -0,0 +1,54 @@
+"""
+Startup budgets: the time to import the engine and get a GameState, and the time
+from a fresh interpreter to the end of a first headless game, which includes
+building the scoring tables. Each is the median over fresh processes, and the
+benchmark fails when a median is over its budget.
+
+    python bench_startup.py [runs]
+"""
+import statistics
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = 60
+FIRST_GAME_BUDGET_MS = 120
+
+IMPORT = """
+import time
+start = time.perf_counter()
+import cribbage
+cribbage.GameState(inputFn=None, events=cribbage.NullSink())
+print((time.perf_counter() - start) * 1000)
+"""
+
+FIRST_GAME = """
+import random, time
+start = time.perf_counter()
+import cribbage
+rng = random.Random(0)
+cribbage.play_game([cribbage.RandomStrategy(rng), cribbage.RandomStrategy(rng)], rng)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure(code, runs):
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        times.append(float(out.stdout))
+    return statistics.median(times)
+
+
+def main(runs):
+    over = False
+    for name, code, budget in [('import + GameState', IMPORT, IMPORT_BUDGET_MS),
+                               ('first game', FIRST_GAME, FIRST_GAME_BUDGET_MS)]:
+        median = measure(code, runs)
+        status = 'ok' if median <= budget else 'OVER BUDGET'
+        over |= median > budget
+        print(f"{name:<20} {median:>8.1f} ms  budget {budget:>4} ms  {status}")
+    return over
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 9) else 0)
@@ -0,0 +1,313 @@
+"""
+Benchmarks of the hot paths: the deck, card parsing, hand scoring, the play phase
+scoring and full headless games.
+
+Every benchmark builds its inputs from a fixed seed and reports operations per second
+(best of the repeats) and the peak memory traced while it runs once more under
+tracemalloc. Results are written as JSON, and two result files can be compared to
+catch regressions.
+
+    python bench_suite.py [--output results.json] [--only NAME...] [--repeat N]
+    python bench_suite.py --compare base.json new.json [--threshold 0.1]
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from bitboard import score as bitboard_score, to_bitboard
+from deck import CARDS, Card, Deck, DeckArray
+from events import NullSink
+from game_state import GameState
+from pegging import PeggingScorer
+from simulator import play_game
+from strategy import GreedyStrategy, RandomStrategy
+
+SEED = 0
+REPEAT = 5
+THRESHOLD = 0.1  # slow downs above 10% are regressions
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Registers a benchmark. It takes a random.Random, builds its inputs and returns
+    a function running them, which returns the number of operations it ran.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def random_hands(rng, n):
+    hands = []
+    for _ in range(n):
+        cards = rng.sample(CARDS, 5)
+        hands.append((cards[:4], cards[4]))
+    return hands
+
+
+@benchmark('deck_shuffled')
+def bench_deck_shuffled(rng):
+    def run():
+        random.seed(SEED)
+        for _ in range(2000):
+            Deck.shuffled()
+        return 2000
+    return run
+
+
+@benchmark('deal_round')
+def bench_deal_round(rng):
+    deck = DeckArray()
+    cuts = [rng.randrange(40) for _ in range(2000)]
+
+    def run():
+        deal_rng = random.Random(SEED)
+        for cut in cuts:
+            deck.shuffle(deal_rng)
+            deck.deal(6)
+            deck.deal(6)
+            deck.pop(cut)
+        return len(cuts)
+    return run
+
+
+@benchmark('deal_round_permute')
+def bench_deal_round_permute(rng):
+    deck = DeckArray()
+    cuts = [rng.randrange(40) for _ in range(2000)]
+
+    def run():
+        deal_rng = random.Random(SEED)
+        for cut in cuts:
+            deck.permute(deal_rng)
+            deck.deal(6)
+            deck.deal(6)
+            deck.pop(cut)
+        return len(cuts)
+    return run
+
+
+@benchmark('deal_round_list')
+def bench_deal_round_list(rng):
+    # the list deck DeckArray replaced: shuffled cards, dealt and cut by popping
+    cuts = [rng.randrange(40) for _ in range(2000)]
+
+    def run():
+        deal_rng = random.Random(SEED)
+        for cut in cuts:
+            cards = list(CARDS)
+            deal_rng.shuffle(cards)
+            for _ in range(12):
+                cards.pop(0)
+            cards.pop(cut)
+        return len(cuts)
+    return run
+
+
+@benchmark('card_from_string')
+def bench_card_from_string(rng):
+    strings = [str(rng.choice(CARDS)) for _ in range(20000)]
+
+    def run():
+        for s in strings:
+            Card.from_string(s)
+        return len(strings)
+    return run
+
+
+@benchmark('deck_all_from_string')
+def bench_deck_all_from_string(rng):
+    hands = [[str(c) for c in rng.sample(CARDS, 6)] for _ in range(5000)]
+
+    def run():
+        for hand in hands:
+            Deck.all_from_string(hand)
+        return len(hands)
+    return run
+
+
+@benchmark('hand_string_parse')
+def bench_hand_string_parse(rng):
+    lines = [' '.join(str(c) for c in rng.sample(CARDS, 5)) for _ in range(5000)]
+
+    def run():
+        for line in lines:
+            Deck.from_hand_string(line)
+        return len(lines)
+    return run
+
+
+@benchmark('game_state_score')
+def bench_game_state_score(rng):
+    hands = random_hands(rng, 20000)
+    gs = GameState(events=NullSink())
+
+    def run():
+        for hand, top_card in hands:
+            gs.score(hand, top_card)
+        return len(hands)
+    return run
+
+
+@benchmark('score_meld')
+def bench_score_meld(rng):
+    hands = random_hands(rng, 500)
+    gs = GameState(events=NullSink())
+
+    def run():
+        for hand, top_card in hands:
+            for meld in GameState.powerset(hand + [top_card]):
+                gs.score_meld(meld)
+        return len(hands)
+    return run
+
+
+@benchmark('bitboard_score')
+def bench_bitboard_score(rng):
+    boards = [to_bitboard(hand + [top_card]) for hand, top_card in random_hands(rng, 20000)]
+
+    def run():
+        for board in boards:
+            bitboard_score(board)
+        return len(boards)
+    return run
+
+
+def random_counts(rng, n):
+    """
+    n runs of cards played from a random deal until the next one would go over 31
+    """
+    counts = []
+    for _ in range(n):
+        count, played = 0, []
+        for c in rng.sample(CARDS, 8):
+            if count + c.points > 31:
+                break
+            count += c.points
+            played.append(c)
+        counts.append(played)
+    return counts
+
+
+@benchmark('pegging_play')
+def bench_pegging_play(rng):
+    counts = random_counts(rng, 2000)
+
+    def run():
+        scorer = PeggingScorer()
+        plays = 0
+        for played in counts:
+            scorer.reset()
+            for c in played:
+                scorer.play(c)
+            plays += len(played)
+        return plays
+    return run
+
+
+@benchmark('apply_score')
+def bench_apply_score(rng):
+    counts = random_counts(rng, 2000)
+    gs = GameState(events=NullSink())
+
+    def run():
+        plays = 0
+        for played in counts:
+            gs.reset_count()
+            for c in played:
+                gs.apply_score(c)
+            plays += len(played)
+        return plays
+    return run
+
+
+@benchmark('headless_game')
+def bench_headless_game(rng):
+    def run():
+        game_rng = random.Random(SEED)
+        strategies = [GreedyStrategy(game_rng), RandomStrategy(game_rng)]
+        for i in range(50):
+            play_game(strategies, game_rng, dealer=i % 2)
+        return 50
+    return run
+
+
+def run_benchmark(name, repeat=REPEAT):
+    run = BENCHMARKS[name](random.Random(SEED))
+    run()  # warm up, building any tables
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = run()
+        best = max(best, ops / (time.perf_counter() - start))
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ops_per_sec': best, 'peak_bytes': peak}
+
+
+def run_all(names=None, repeat=REPEAT):
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': SEED,
+        'results': {name: run_benchmark(name, repeat) for name in names or BENCHMARKS},
+    }
+
+
+def compare(base, new, threshold=THRESHOLD):
+    """
+    Lines comparing two result dicts, and the names of the benchmarks
+    that got slower by more than the threshold
+    """
+    lines = [f"{'benchmark':<22} {'base ops/s':>14} {'new ops/s':>14} {'change':>8} {'peak KiB':>10}"]
+    regressions = []
+    for name, result in new['results'].items():
+        if name not in base['results']:
+            continue
+        before, after = base['results'][name]['ops_per_sec'], result['ops_per_sec']
+        change = after / before - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        lines.append(f"{name:<22} {before:>14,.0f} {after:>14,.0f} {change:>+8.1%} "
+                     f"{result['peak_bytes'] / 1024:>10,.1f}{flag}")
+    return lines, regressions
+
+
+def print_results(results):
+    print(f"{'benchmark':<22} {'ops/s':>14} {'peak KiB':>10}")
+    for name, result in results['results'].items():
+        print(f"{name:<22} {result['ops_per_sec']:>14,.0f} {result['peak_bytes'] / 1024:>10,.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=None)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), default=None)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args()
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        lines, regressions = compare(base, new, args.threshold)
+        print('\n'.join(lines))
+        sys.exit(1 if regressions else 0)
+    results = run_all(args.only, args.repeat)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
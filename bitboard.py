@@ -0,0 +1,212 @@
+"""
+Hands as bitboards: one int with bit c.id set for every card of the hand.
+
+Card ids are 13 * suit index + rank - 1, so a board is four 13-bit lanes, one per
+suit, with rank r at bit r - 1 of its lane. Scoring a board is integer operations
+and table reads, with the same totals as GameState.score_meld:
+
+    fifteens  the ways to make 15 only depend on how many cards there are of each rank,
+              so they are read from a table keyed by the rank counts (see scoring.py)
+    runs      the rank union of the lanes, ANDed with itself shifted down once per
+              rank of the run, leaves the low rank of every run of that length
+    pairs     the popcount of each two lanes ANDed, the ranks both suits hold
+    flushes   the popcount of each lane
+
+score() reads the whole score from the scoring.py tables, making their rank and suit
+keys from the four lanes with a table read each instead of a lookup per card.
+"""
+from math import comb
+
+import scoring
+from deck import CARDS
+
+LANE_BITS = 13
+LANE = (1 << LANE_BITS) - 1
+SUITS = 4
+
+# popcount, points and scoring.py rank key of every 13-bit lane
+POPCOUNT = bytearray(1 << LANE_BITS)
+LANE_POINTS = bytearray(1 << LANE_BITS)
+LANE_RANK_KEY = [0] * (1 << LANE_BITS)
+for _mask in range(1, 1 << LANE_BITS):
+    _rest = _mask & (_mask - 1)
+    _rank = (_mask ^ _rest).bit_length() - 1
+    POPCOUNT[_mask] = POPCOUNT[_rest] + 1
+    LANE_POINTS[_mask] = LANE_POINTS[_rest] + CARDS[_rank].points
+    LANE_RANK_KEY[_mask] = LANE_RANK_KEY[_rest] + (1 << (scoring.RANK_BITS * _rank))
+del _mask, _rest, _rank
+
+# fifteens points by scoring.py rank key, filled on first use
+_fifteens = {}
+
+_score_keys = scoring.score_keys
+
+# points for the 4 card flushes among n cards of one suit
+FLUSH_POINTS = tuple(4 * comb(n, 4) for n in range(LANE_BITS + 1))
+
+
+def to_bitboard(cards):
+    board = 0
+    for c in cards:
+        board |= 1 << c.id
+    return board
+
+
+def from_bitboard(board):
+    """
+    The cards of the board, in card id order
+    """
+    cards = []
+    while board:
+        low = board & -board
+        cards.append(CARDS[low.bit_length() - 1])
+        board ^= low
+    return cards
+
+
+def lanes(board):
+    """
+    The ranks held in each suit, as 13-bit masks
+    """
+    return [(board >> (LANE_BITS * s)) & LANE for s in range(SUITS)]
+
+
+def card_count(board):
+    return sum(POPCOUNT[lane] for lane in lanes(board))
+
+
+def rank_union(board):
+    """
+    The ranks held in any suit
+    """
+    h, s, d, c = lanes(board)
+    return h | s | d | c
+
+
+def rank_counts(board):
+    """
+    The number of cards of each rank
+    """
+    counts = [0] * LANE_BITS
+    for lane in lanes(board):
+        while lane:
+            low = lane & -lane
+            counts[low.bit_length() - 1] += 1
+            lane ^= low
+    return counts
+
+
+def rank_key(board):
+    """
+    The scoring.py rank histogram of the board, 3 bits per rank
+    """
+    return (LANE_RANK_KEY[board & LANE] + LANE_RANK_KEY[(board >> LANE_BITS) & LANE]
+            + LANE_RANK_KEY[(board >> (2 * LANE_BITS)) & LANE] + LANE_RANK_KEY[board >> (3 * LANE_BITS)])
+
+
+def suit_key(board):
+    """
+    The scoring.py suit histogram of the board, 4 bits per suit
+    """
+    return (POPCOUNT[board & LANE] | POPCOUNT[(board >> LANE_BITS) & LANE] << scoring.SUIT_BITS
+            | POPCOUNT[(board >> (2 * LANE_BITS)) & LANE] << (2 * scoring.SUIT_BITS)
+            | POPCOUNT[board >> (3 * LANE_BITS)] << (3 * scoring.SUIT_BITS))
+
+
+def fifteens(board):
+    key = rank_key(board)
+    points = _fifteens.get(key)
+    if points is None:
+        points = _fifteens[key] = scoring.fifteens(scoring.rank_counts(key))
+    return points
+
+
+def runs(board, union=None, n=None):
+    # every meld of 3 or more consecutive ranks scores its length,
+    # once for each way of picking one card of every rank
+    if union is None:
+        union = rank_union(board)
+    window = union & (union >> 1) & (union >> 2)
+    if not window:
+        return 0
+    if n is None:
+        n = card_count(board)
+    counts = None if n == POPCOUNT[union] else rank_counts(board)
+    score = 0
+    length = 3
+    while window:
+        if counts is None:
+            # one card of each rank, a single way to make each run
+            score += length * POPCOUNT[window]
+        else:
+            w = window
+            while w:
+                low = w & -w
+                r = low.bit_length() - 1
+                ways = 1
+                for c in counts[r:r + length]:
+                    ways *= c
+                score += length * ways
+                w ^= low
+        window &= union >> length
+        length += 1
+    return score
+
+
+def pairs(board):
+    # 2 points for every pair of cards with the same rank, one for each two suits holding it
+    h, s, d, c = lanes(board)
+    return 2 * (POPCOUNT[h & s] + POPCOUNT[h & d] + POPCOUNT[h & c]
+                + POPCOUNT[s & d] + POPCOUNT[s & c] + POPCOUNT[d & c])
+
+
+def flushes(board):
+    return sum(FLUSH_POINTS[POPCOUNT[lane]] for lane in lanes(board))
+
+
+def score(board):
+    """
+    Scores every meld of the board, the same as summing GameState.score_meld
+    over the powerset of its cards
+    """
+    # rank_key and suit_key inlined, the lanes start at bits 0, 13, 26 and 39
+    # and the suit counts are scoring.SUIT_BITS (4) apart
+    h = board & LANE
+    s = (board >> 13) & LANE
+    d = (board >> 26) & LANE
+    c = board >> 39
+    keys = LANE_RANK_KEY
+    counts = POPCOUNT
+    return _score_keys(keys[h] + keys[s] + keys[d] + keys[c],
+                       counts[h] | counts[s] << 4 | counts[d] << 8 | counts[c] << 12)
+
+
+def score_parts(board):
+    """
+    The same total as score() from the integer primitives, without the scoring tables
+    """
+    return fifteens(board) + runs(board) + pairs(board) + flushes(board)
+
+
+def score_meld(board):
+    """
+    Scores the board as one meld, the same as GameState.score_meld
+    """
+    board_lanes = lanes(board)
+    n = sum(POPCOUNT[lane] for lane in board_lanes)
+    if n < 2:
+        raise ValueError(f"Meld {from_bitboard(board)} has a length {n}. It should be higher than 1.")
+    union = board_lanes[0] | board_lanes[1] | board_lanes[2] | board_lanes[3]
+    points = 0
+    if sum(LANE_POINTS[lane] for lane in board_lanes) == 15:
+        points += 2
+    if n > 2 and POPCOUNT[union] == n:
+        ranks = union // (union & -union)
+        if ranks & (ranks + 1) == 0:
+            # n different ranks in a row
+            points += n
+    if n == 2 and POPCOUNT[union] == 1:
+        points += 2
+    if n == 4 and any(POPCOUNT[lane] == 4 for lane in board_lanes):
+        points += 4
+    return points
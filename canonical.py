@@ -0,0 +1,130 @@
+"""
+Suit isomorphism: hands that only differ by relabelling suits score the same,
+since scoring only ever compares suits with each other (the flush).
+
+canonicalize relabels the suits of a hand so every hand in the same class comes
+out as the same canonical hand. Caches and tables keyed by canonical hands need up
+to 24 times fewer entries, about 16 times fewer for 4 card hands and 19 times
+fewer for 5 card hands. See the counts with:
+
+    python canonical.py [max cards]
+"""
+import sys
+from bisect import bisect_right
+from itertools import combinations
+from math import comb, factorial
+
+from deck import CARDS
+
+
+def suit_masks(cards):
+    """
+    13 bit rank mask of the cards in each suit
+    """
+    masks = [0, 0, 0, 0]
+    for c in cards:
+        masks[c.id // 13] |= 1 << (c.id % 13)
+    return masks
+
+
+def canonical_key(cards):
+    """
+    Hashable key, equal for two hands exactly when one is a suit relabelling of the other
+    """
+    return tuple(sorted(suit_masks(cards), reverse=True))
+
+
+def canonicalize(cards):
+    """
+    Returns the canonical hand, sorted by card id, and the permutation used,
+    where perm[suit index] is the canonical suit index
+    """
+    masks = suit_masks(cards)
+    order = sorted(range(4), key=lambda s: masks[s], reverse=True)
+    perm = [0, 0, 0, 0]
+    for i, suit in enumerate(order):
+        perm[suit] = i
+    perm = tuple(perm)
+    return sorted(permute(cards, perm), key=lambda c: c.id), perm
+
+
+def permute(cards, perm):
+    """
+    Relabels the suits of the cards, suit index s becomes perm[s]
+    """
+    return [CARDS[13 * perm[c.id // 13] + c.id % 13] for c in cards]
+
+
+def invert(perm):
+    """
+    The permutation that undoes perm
+    """
+    inverse = [0, 0, 0, 0]
+    for suit, i in enumerate(perm):
+        inverse[i] = suit
+    return tuple(inverse)
+
+
+_masks_by_bits = []
+
+
+def masks_by_bits(bits):
+    """
+    13 bit rank masks with that many bits, in ascending order, listed on first use
+    """
+    if not _masks_by_bits:
+        _masks_by_bits.extend(sorted(sum(1 << r for r in ranks) for ranks in combinations(range(13), n))
+                              for n in range(14))
+    return _masks_by_bits[bits]
+
+
+def first_masks(size):
+    """
+    The masks a canonical hand with size cards can start with, in ascending order
+    """
+    return sorted(m for bits in range(1, size + 1) for m in masks_by_bits(bits))
+
+
+def classes(size, first):
+    """
+    Yields the (suit masks, hands) of every class of hands with size cards whose
+    canonical suit masks start with first, hands being the number of hands in the class
+    """
+    def rest(masks, bound, cards):
+        if len(masks) == 3:
+            # the last suit takes the cards left
+            candidates = masks_by_bits(cards)
+            for m in candidates[:bisect_right(candidates, bound)]:
+                yield masks + (m,)
+            return
+        for bits in range(cards + 1):
+            candidates = masks_by_bits(bits)
+            for m in candidates[:bisect_right(candidates, bound)]:
+                yield from rest(masks + (m,), m, cards - bits)
+
+    for masks in rest((first,), first, size - bin(first).count('1')):
+        yield masks, 24 // _repeats(masks)
+
+
+def _repeats(masks):
+    # relabellings that leave the hand the same: suits with equal masks swapping
+    repeats = 1
+    for m in set(masks):
+        repeats *= factorial(masks.count(m))
+    return repeats
+
+
+def count_classes(size):
+    """
+    Number of suit isomorphism classes of hands with size cards
+    """
+    return len({canonical_key(hand) for hand in combinations(CARDS, size)})
+
+
+if __name__ == '__main__':
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'cards':>5} {'hands':>12} {'canonical':>12} {'reduction':>10}")
+    for size in range(1, max_size + 1):
+        hands = comb(52, size)
+        n_classes = count_classes(size)
+        print(f"{size:>5} {hands:>12,} {n_classes:>12,} {hands / n_classes:>9.1f}x")
@@ -0,0 +1,150 @@
+"""
+Exhaustive average crib score for every 2 cards laid away.
+
+The crib average only depends on the crib key of the 2 cards (see
+discard_solver.crib_key), 169 keys in all. For each key, the generator scores
+the crib with every pair the opponent can lay away and every top card from the
+other cards, 1225 * 48 cribs, spreading the keys over a process pool. The dealer
+adds the average and the pone takes it away, so both use the same table.
+
+The table file is MAGIC followed by the number of cribs scored per key and the
+total crib score of each key in key order, as little endian uint32.
+
+    python crib_table.py build [path] [--processes N]
+    python crib_table.py verify [path] [--keys N] [--processes N]
+"""
+import os
+import random
+import struct
+import sys
+from itertools import combinations
+
+from scoring import CARD_RANK_KEY, CARD_SUIT_KEY, tables
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crib_averages.bin')
+
+MAGIC = b'CRIB-EV\x01'
+HEADER = struct.Struct('<8sI')
+TOTAL = struct.Struct('<I')
+
+# cribs per key: the opponent's 2 cards from the other 50, then a top card from 48
+CRIBS_PER_KEY = 1225 * 48
+
+
+def crib_keys():
+    """
+    Every crib key, (low rank, high rank, suited), in table order
+    """
+    keys = []
+    for low in range(13):
+        for high in range(low, 13):
+            keys.append((low, high, False))
+            if low != high:
+                keys.append((low, high, True))
+    return keys
+
+
+def key_cards(key):
+    """
+    Card ids of 2 cards with the crib key
+    """
+    low, high, suited = key
+    return low, high + (0 if suited else 13)
+
+
+def crib_total(key):
+    """
+    Total score of every crib made with the 2 cards of the key
+    """
+    rank_scores, flush_scores = tables()
+    rank_keys = CARD_RANK_KEY
+    suit_keys = CARD_SUIT_KEY
+    a, b = key_cards(key)
+    rest = [i for i in range(52) if i not in (a, b)]
+    r0, s0 = rank_keys[a] + rank_keys[b], suit_keys[a] + suit_keys[b]
+    total = 0
+    for x, y in combinations(rest, 2):
+        r1, s1 = r0 + rank_keys[x] + rank_keys[y], s0 + suit_keys[x] + suit_keys[y]
+        for t in rest:
+            if t != x and t != y:
+                total += rank_scores[r1 + rank_keys[t]] + flush_scores[s1 + suit_keys[t]]
+    return total
+
+
+def compute(keys, processes=None):
+    """
+    Totals for the keys, computed over a process pool
+    """
+    if processes == 1:
+        return [crib_total(key) for key in keys]
+    from multiprocessing import Pool
+    with Pool(processes) as pool:
+        return pool.map(crib_total, keys)
+
+
+def averages(processes=None):
+    """
+    {crib key: average crib score} computed exactly, without the table file
+    """
+    keys = crib_keys()
+    return {key: total / CRIBS_PER_KEY for key, total in zip(keys, compute(keys, processes))}
+
+
+def build(path=DEFAULT_PATH, processes=None):
+    totals = compute(crib_keys(), processes)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, CRIBS_PER_KEY))
+        for total in totals:
+            f.write(TOTAL.pack(total))
+    os.replace(tmp_path, path)
+
+
+def load(path=DEFAULT_PATH):
+    """
+    {crib key: average crib score} from the table file
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    keys = crib_keys()
+    if len(data) != HEADER.size + TOTAL.size * len(keys):
+        raise ValueError(f"Crib table {path} has {len(data)} bytes. "
+                         f"It should have {HEADER.size + TOTAL.size * len(keys)}.")
+    magic, cribs = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a crib table.")
+    totals = struct.unpack_from(f'<{len(keys)}I', data, HEADER.size)
+    return {key: total / cribs for key, total in zip(keys, totals)}
+
+
+def verify(path=DEFAULT_PATH, keys=None, processes=None, seed=0):
+    """
+    Recomputes the keys, all of them by default or a random sample of that many,
+    and returns the keys where the table is different
+    """
+    averages = load(path)
+    check = crib_keys()
+    if keys is not None:
+        check = random.Random(seed).sample(check, keys)
+    totals = compute(check, processes)
+    return [key for key, total in zip(check, totals) if total / CRIBS_PER_KEY != averages[key]]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command', choices=['build', 'verify'])
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--keys', type=int, default=None)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+    if args.command == 'build':
+        build(args.path, args.processes)
+        print(f"Wrote {len(crib_keys())} crib averages to {args.path}")
+    else:
+        wrong = verify(args.path, args.keys, args.processes)
+        for key in wrong:
+            print(f"Crib key {key} does not match")
+        print(f"{len(wrong)} keys differ")
+        sys.exit(1 if wrong else 0)
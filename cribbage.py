@@ -0,0 +1,51 @@
+"""
+One import for the whole engine, loading each module only when one of its names is used.
+
+    import cribbage
+    game = cribbage.GameState(strategies=[cribbage.GreedyStrategy(), cribbage.RandomStrategy()])
+
+Importing this module imports nothing else, so worker processes and command line
+tools only pay for the parts they touch: the scoring tables, the solvers and their
+files load on first use as well.
+"""
+from importlib import import_module
+
+# {name: module it is defined in}
+EXPORTS = {
+    'Suit': 'deck', 'Rank': 'deck', 'Card': 'deck', 'Deck': 'deck', 'DeckArray': 'deck',
+    'CARDS': 'deck',
+    'Player': 'player',
+    'GameState': 'game_state', 'GameOver': 'game_state', 'WINNING_SCORE': 'game_state',
+    'AsyncGameState': 'async_game',
+    'NullSink': 'events', 'ConsoleSink': 'events', 'ListSink': 'events',
+    'BufferedFileSink': 'events',
+    'score_hand': 'scoring',
+    'to_bitboard': 'bitboard', 'from_bitboard': 'bitboard',
+    'PeggingScorer': 'pegging',
+    'Strategy': 'strategy', 'RandomStrategy': 'strategy', 'GreedyStrategy': 'strategy',
+    'SolverStrategy': 'strategy', 'SearchStrategy': 'strategy',
+    'solve': 'discard_solver', 'best_discard': 'discard_solver',
+    'PeggingSearch': 'pegging_search',
+    'ScoreIndex': 'score_index',
+    'play_game': 'simulator', 'simulate': 'simulator',
+    'simulate_lockstep': 'lockstep',
+    'RecordWriter': 'records', 'RecordReader': 'records', 'GameRecorder': 'records',
+    'Replay': 'replay',
+    'EquityEstimator': 'equity', 'win_probability': 'equity',
+    'Profiler': 'profiler',
+}
+
+__all__ = sorted(EXPORTS)
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
@@ -1,5 +1,6 @@
 from enum import Enum
 import random
+import struct
 
 
 class Suit(Enum):
@@ -28,21 +29,10 @@ class Rank(Enum):
     KING = 13
 
     def points(self):
-        if self in [Rank.JACK, Rank.QUEEN, Rank.KING]:
-            return 10
-        return self.value
+        return RANK_POINTS[self.value]
 
     def __str__(self):
-        if self.value == Rank.ACE.value:
-            return 'A'
-        if self.value == Rank.JACK.value:
-            return 'J'
-        if self.value == Rank.QUEEN.value:
-            return 'Q'
-        if self.value == Rank.KING.value:
-            return 'K'
-
-        return str(self.value)
+        return RANK_SYMBOLS[self.value]
 
     def __sub__(self, other):
         return self.value - other.value
@@ -52,47 +42,105 @@ class Rank(Enum):
         """
         From <number>|(J|Q|K|A) format to class
         """
-        try:
-            return Rank(int(s))
-        except ValueError:
-            # check for one of J, Q, K, A
-            if s == 'A':
-                return Rank(1)
-            if s == 'J':
-                return Rank(11)
-            if s == 'Q':
-                return Rank(12)
-            if s == 'K':
-                return Rank(13)
-        raise ValueError(f"Invalid card string: {s}")
+        rank = RANKS_BY_STRING.get(s)
+        if rank is None:
+            raise ValueError(f"Invalid card string: {s}")
+        return rank
+
+
+# indexed by Rank.value
+RANK_POINTS = (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+RANK_SYMBOLS = ('', 'A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+
+# every way a rank or suit is written: the symbols, the rank numbers, T for ten and the
+# ASCII suit letters found in logs
+RANKS_BY_STRING = {**{str(rank.value): rank for rank in Rank},
+                   **{RANK_SYMBOLS[rank.value]: rank for rank in Rank}, 'T': Rank.TEN}
+SUITS_BY_STRING = {**{suit.value: suit for suit in Suit},
+                   **{suit.name[0]: suit for suit in Suit},
+                   **{suit.name[0].lower(): suit for suit in Suit}}
 
 
 class Card:
+    """
+    One of the 52 playing cards.
+    Cards are interned: Card(suit, rank) always returns the same immutable instance,
+    which carries its id (0-51, ordered by suit then rank) and its points.
+    """
+    __slots__ = ('suit', 'rank', 'id', 'points', 'mask', '_str')
+
+    def __new__(cls, suit, rank):
+        return CARDS[13 * SUITS.index(suit) + rank.value - 1]
 
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = rank
+    @staticmethod
+    def _intern(suit, rank, id):
+        card = object.__new__(Card)
+        object.__setattr__(card, 'suit', suit)
+        object.__setattr__(card, 'rank', rank)
+        object.__setattr__(card, 'id', id)
+        object.__setattr__(card, 'points', rank.points())
+        object.__setattr__(card, 'mask', 1 << id)
+        object.__setattr__(card, '_str', str(rank) + str(suit))
+        return card
+
+    @staticmethod
+    def from_id(id):
+        """
+        The card with the given id (0-51)
+        """
+        return CARDS[id]
 
     @staticmethod
     def from_string(s):
         """
-        Takes a card formatted as <rank><suit> and creates a card
+        Takes a card formatted as <rank><suit> and returns the card.
+        The suit may also be one of the ASCII letters H, S, D or C.
         """
-        suit = s[-1]
-        rank = s[:-1]
-        return Card(Suit(suit), Rank.fromString(rank))
+        card = CARDS_BY_STRING.get(s)
+        if card is None:
+            raise ValueError(f"Invalid card string: {s}")
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Card {self} is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Card {self} is immutable.")
+
+    def __reduce__(self):
+        # keep cards interned across copies and processes
+        return (Card.from_id, (self.id,))
 
     def __str__(self):
-        return str(self.rank) + str(self.suit)
+        return self._str
 
     def __repr__(self):
-        return str(self.rank) + str(self.suit)
+        return self._str
 
     def __sub__(self, other):
         return self.rank - other.rank
 
     def __eq__(self, other):
-        return self.suit == other.suit and self.rank == self.rank
+        return self is other
+
+    def __hash__(self):
+        return self.id
+
+
+SUITS = list(Suit)
+CARDS = tuple(Card._intern(suit, rank, 13 * i + rank.value - 1)
+              for i, suit in enumerate(SUITS) for rank in Rank)
+# every spelling of every card, see RANKS_BY_STRING and SUITS_BY_STRING
+CARDS_BY_STRING = {r + s: Card(suit, rank)
+                   for r, rank in RANKS_BY_STRING.items() for s, suit in SUITS_BY_STRING.items()}
+DECK_SIZE = len(CARDS)
+_NEW_DECK = bytes(range(DECK_SIZE))
+
+# DeckArray.permute sorts one double in [1, 2) per card: 64 random bits are masked
+# down to 44 random mantissa bits, and the card id goes in the low byte
+_SORT_KEYS = struct.Struct(f'<{DECK_SIZE}d')
+_KEY_RANDOM = sum((((1 << 52) - 1) & ~0xFF) << (64 * i) for i in range(DECK_SIZE))
+_KEY_IDS = sum((0x3FF << 52 | i) << (64 * i) for i in range(DECK_SIZE))
 
 
 class Deck:
@@ -101,13 +149,7 @@ class Deck:
         """
         Creates a shuffled deck with 52 standard cards.
         """
-        cards = []
-        # populate all the cards that exist in the deck...
-        for suit in Suit:
-            for rank in Rank:
-                cards.append(Card(suit, rank))
-
-        # shuffle them
+        cards = list(CARDS)
         random.shuffle(cards)
         return cards
 
@@ -117,3 +159,156 @@ class Deck:
         Convenience method for Card.from_string over a list of card strings
         """
         return [Card.from_string(c) for c in ss]
+
+    @staticmethod
+    def from_hand_string(s):
+        """
+        Cards of a hand string such as "Q♦ J♣ 4♦" or "QD,JC,4D",
+        the cards separated by spaces or commas
+        """
+        lookup = CARDS_BY_STRING
+        try:
+            return [lookup[c] for c in s.replace(',', ' ').split()]
+        except KeyError as e:
+            raise ValueError(f"Invalid card string: {e.args[0]}") from None
+
+    @staticmethod
+    def read_hands(lines):
+        """
+        Yields the cards of each hand string in lines, such as an open file,
+        skipping blank lines
+        """
+        for line in lines:
+            if line.strip():
+                yield Deck.from_hand_string(line)
+
+    @staticmethod
+    def from_ids(ids):
+        """
+        Cards for a list of card ids
+        """
+        return [CARDS[i] for i in ids]
+
+    @staticmethod
+    def to_ids(cards):
+        """
+        Card ids for a list of cards
+        """
+        return [c.id for c in cards]
+
+    @staticmethod
+    def to_mask(cards):
+        """
+        Bitmask with bit card.id set for each of the cards
+        """
+        mask = 0
+        for c in cards:
+            mask |= c.mask
+        return mask
+
+    @staticmethod
+    def from_mask(mask):
+        """
+        Cards for the set bits of a bitmask, in id order
+        """
+        cards = []
+        while mask:
+            low = mask & -mask
+            cards.append(CARDS[low.bit_length() - 1])
+            mask ^= low
+        return cards
+
+
+class DeckArray:
+    """
+    A deck kept as the 52 card ids in one bytearray, shuffled in place.
+    Dealing and cutting move a cursor forward: the cards before the cursor are gone,
+    so no list is shifted and no card is created.
+    """
+    __slots__ = ('ids', 'cursor')
+
+    def __init__(self, ids=_NEW_DECK):
+        self.ids = bytearray(ids)
+        self.cursor = DECK_SIZE - len(self.ids)
+        if self.cursor:
+            # a partial deck, the missing cards count as already dealt
+            self.ids[:0] = bytes(i for i in range(DECK_SIZE) if i not in self.ids)
+
+    def shuffle(self, rng=None):
+        """
+        Puts all 52 cards back and shuffles them with rng, or the random module,
+        in the same order it would shuffle a new list of CARDS
+        """
+        self.ids[:] = _NEW_DECK
+        (random if rng is None else rng).shuffle(self.ids)
+        self.cursor = 0
+
+    def permute(self, rng=None):
+        """
+        Puts all 52 cards back in a random order, about twice as fast as shuffle.
+        Sorts a random key per card made from one rng.getrandbits call, so the
+        order is not the one shuffle would give with the same seed.
+        """
+        bits = (random if rng is None else rng).getrandbits(64 * DECK_SIZE)
+        keys = _SORT_KEYS.unpack((bits & _KEY_RANDOM | _KEY_IDS).to_bytes(8 * DECK_SIZE, 'little'))
+        # the low byte of each sorted key is its card id
+        self.ids[:] = _SORT_KEYS.pack(*sorted(keys))[::8]
+        self.cursor = 0
+
+    def deal(self, n):
+        """
+        The next n cards, as a list
+        """
+        start = self.cursor
+        if start + n > DECK_SIZE:
+            raise IndexError(f"Cannot deal {n} cards from a deck of {DECK_SIZE - start}.")
+        self.cursor = start + n
+        ids = self.ids
+        return [CARDS[ids[i]] for i in range(start, start + n)]
+
+    def pop(self, index):
+        """
+        Takes out the card at index of the cards left, like list.pop.
+        The first card left takes its place, so the order of the rest changes.
+        """
+        cursor = self.cursor
+        if index < 0:
+            index += DECK_SIZE - cursor
+        if not 0 <= index < DECK_SIZE - cursor:
+            raise IndexError(f"Card index {index} is out of range.")
+        ids = self.ids
+        i = cursor + index
+        card = ids[i]
+        ids[i] = ids[cursor]
+        ids[cursor] = card
+        self.cursor = cursor + 1
+        return CARDS[card]
+
+    def clear(self):
+        self.cursor = DECK_SIZE
+
+    def state(self):
+        """
+        Snapshot of the deck for restore
+        """
+        return bytes(self.ids), self.cursor
+
+    def restore(self, state):
+        self.ids[:], self.cursor = state
+
+    def __len__(self):
+        return DECK_SIZE - self.cursor
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += DECK_SIZE - self.cursor
+        if not 0 <= index < DECK_SIZE - self.cursor:
+            raise IndexError(f"Card index {index} is out of range.")
+        return CARDS[self.ids[self.cursor + index]]
+
+    def __iter__(self):
+        ids = self.ids
+        return (CARDS[ids[i]] for i in range(self.cursor, DECK_SIZE))
+
+    def __repr__(self):
+        return f"DeckArray({list(self)})"
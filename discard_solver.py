@@ -0,0 +1,122 @@
+"""
+Ranks the 15 ways of laying away 2 cards from a 6 card hand.
+
+Each keep is scored against all 46 possible top cards for its expected hand score,
+and the 2 cards laid away add (dealer) or take away (pone) the average crib they
+make. Solutions are cached by canonical hand (see canonical.py), so hands that
+only differ by suits share one cache entry.
+
+The crib averages are read from the table crib_table.py builds, or computed
+exactly the same way on first use when there is no table file (a few seconds).
+"""
+import os
+from functools import lru_cache
+from itertools import combinations
+
+import crib_table
+from canonical import canonicalize, permute
+from scoring import CARD_RANK_KEY, CARD_SUIT_KEY, tables
+
+CACHE_SIZE = 1 << 16
+
+_crib_averages = {}
+
+
+class Discard:
+    """
+    One way of laying away 2 cards, with its expected value
+    """
+
+    def __init__(self, discard, keep, hand_ev, crib_ev, is_dealer):
+        self.discard = discard  # the 2 cards laid away
+        self.keep = keep  # the 4 cards kept
+        self.hand_ev = hand_ev  # expected score of the kept hand
+        self.crib_ev = crib_ev  # average score of a crib with the laid away cards
+        self.ev = hand_ev + crib_ev if is_dealer else hand_ev - crib_ev
+
+    def __repr__(self):
+        return f"Discard({self.discard} keep {self.keep} -> {self.ev:.2f})"
+
+
+def solve(hand, is_dealer):
+    """
+    Returns all 15 Discards of the 6 card hand, best first
+    """
+    if len(hand) != 6:
+        raise ValueError(f"Hand {hand} has {len(hand)} cards. It should have 6.")
+    canonical, perm = canonicalize(hand)
+    ids = tuple(c.id for c in canonical)
+    to_card = {c.id: card for c, card in zip(permute(hand, perm), hand)}
+    discards = []
+    for discard, keep, hand_ev, crib_ev in _solve_canonical(ids, is_dealer):
+        discards.append(Discard([to_card[i] for i in discard], [to_card[i] for i in keep],
+                                hand_ev, crib_ev, is_dealer))
+    return discards
+
+
+def best_discard(hand, is_dealer):
+    """
+    The 2 cards to lay away
+    """
+    return solve(hand, is_dealer)[0].discard
+
+
+def best_canonical(hand, is_dealer):
+    """
+    The best discard of the 6 card hand as (discard, keep, hand_ev, crib_ev), with the
+    cards given as ids of the canonical hand, for callers that only need the values
+    """
+    canonical, _ = canonicalize(hand)
+    return _solve_canonical(tuple(c.id for c in canonical), is_dealer)[0]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _solve_canonical(ids, is_dealer):
+    rank_scores, flush_scores = tables()
+    top_cards = [i for i in range(52) if i not in ids]
+    solutions = []
+    for discard in combinations(ids, 2):
+        keep = tuple(i for i in ids if i not in discard)
+        ranks = sum(CARD_RANK_KEY[i] for i in keep)
+        suits = sum(CARD_SUIT_KEY[i] for i in keep)
+        total = 0
+        for t in top_cards:
+            total += rank_scores[ranks + CARD_RANK_KEY[t]] + flush_scores[suits + CARD_SUIT_KEY[t]]
+        hand_ev = total / len(top_cards)
+        crib_ev = crib_average(*discard)
+        ev = hand_ev + crib_ev if is_dealer else hand_ev - crib_ev
+        solutions.append((ev, discard, keep, hand_ev, crib_ev))
+    solutions.sort(key=lambda s: s[0], reverse=True)
+    return tuple(s[1:] for s in solutions)
+
+
+def crib_key(a, b):
+    """
+    Crib averages only depend on the ranks of the 2 cards and if they share a suit
+    """
+    low, high = sorted((a % 13, b % 13))
+    return low, high, a // 13 == b // 13
+
+
+def load_crib_averages(path=crib_table.DEFAULT_PATH):
+    """
+    Solves with the crib averages of the table file at path, computed exactly in
+    this process when there is no file, and drops the solutions cached before
+    """
+    if os.path.exists(path):
+        averages = crib_table.load(path)
+    else:
+        # in this process, as solvers also run in pool workers that cannot start a pool
+        averages = crib_table.averages(processes=1)
+    _crib_averages.clear()
+    _crib_averages.update(averages)
+    _solve_canonical.cache_clear()
+
+
+def crib_average(a, b):
+    """
+    Average crib score with the cards with ids a and b laid away into it
+    """
+    if not _crib_averages:
+        load_crib_averages()
+    return _crib_averages[crib_key(a, b)]
@@ -0,0 +1,321 @@
+"""
+Win probability of a game position: the scores, who deals and player 1's dealt hand.
+
+EquityEstimator rolls out games to 121 from the position in a process pool and stops
+once the Wilson confidence interval of the win rate is within the tolerance.
+win_probability keeps one estimator, and its pool, for every call not given one.
+
+Positions at the start of a round without known cards are looked up in the equity
+table instead. The table holds the probability that the pone wins for every pair of
+scores under 121 and is solved backwards from the winning score, using the
+distribution of round points (play phase, then the pone's hand, then the dealer's
+hand and crib) of recorded games between the rollout strategies.
+
+    python equity.py build [games] [--path P] [--processes N]
+    python equity.py SCORE1 SCORE2 [--dealer 1|2] [--hand CARDS...]
+"""
+import argparse
+import array
+import math
+import os
+import random
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from deck import Deck, DeckArray
+from events import NullSink
+from game_state import WINNING_SCORE, GameOver, GameState
+from simulator import play_game
+from strategy import GreedyStrategy
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'equity_table.bin')
+
+TABLE_GAMES = 20000
+BATCH_SIZE = 50
+TOLERANCE = 0.02
+MAX_GAMES = 20000
+Z = 1.96  # 95% confidence
+
+_table = None
+_estimator = None
+
+
+class Equity:
+
+    def __init__(self, win_rate, low, high, games):
+        self.win_rate = win_rate  # estimated probability that player 1 wins
+        self.low = low  # confidence interval of the win rate
+        self.high = high
+        self.games = games  # games rolled out, 0 for a table lookup
+
+    def __repr__(self):
+        return f"Equity({self.win_rate:.3f} [{self.low:.3f}, {self.high:.3f}] over {self.games} games)"
+
+
+def wilson(wins, games, z=Z):
+    """
+    Wilson score interval of a win rate
+    """
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    centre = (p + z * z / (2 * games)) / (1 + z * z / games)
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return max(centre - half, 0.0), min(centre + half, 1.0)
+
+
+class RolloutGame(GameState):
+    """
+    GameState whose first deal gives player 1 the known hand
+    """
+
+    def __init__(self, hand=None, rng=None, strategies=None):
+        super().__init__(inputFn=None, events=NullSink(), rng=rng, strategies=strategies)
+        self.known_hand = hand
+
+    def re_shuffle(self):
+        super().re_shuffle()
+        if self.known_hand:
+            # player 1 is dealt the first 6 cards
+            hand, self.known_hand = self.known_hand, None
+            ids = [c.id for c in hand]
+            self.deck = DeckArray(ids + [i for i in self.deck.ids if i not in ids])
+
+
+def rollout(strategies, rng, score1, score2, dealer=0, hand=None):
+    """
+    Plays one game on from the position, returns 0 if player 1 wins and 1 otherwise
+    """
+    game = RolloutGame(hand, rng, strategies)
+    players = [game.player1, game.player2]
+    game.player1.score, game.player2.score = score1, score2
+    game.dealer = players[dealer]
+    try:
+        while True:
+            for phase in game.phases:
+                phase()
+    except GameOver as over:
+        return players.index(over.player)
+
+
+def rollout_batch(strategy_classes, position, games, seed):
+    """
+    Player 1's wins in games rolled out from position (score1, score2, dealer, hand ids)
+    """
+    score1, score2, dealer, hand_ids = position
+    rng = random.Random(seed)
+    strategies = [cls(random.Random(rng.getrandbits(64))) for cls in strategy_classes]
+    hand = Deck.from_ids(hand_ids) if hand_ids else None
+    wins = 0
+    for _ in range(games):
+        wins += rollout(strategies, rng, score1, score2, dealer, hand) == 0
+    return wins, games
+
+
+class EquityEstimator:
+    """
+    Rolls out positions over a process pool kept open between estimates
+    """
+
+    def __init__(self, strategy_classes=(GreedyStrategy, GreedyStrategy), processes=None,
+                 tolerance=TOLERANCE, max_games=MAX_GAMES, batch_size=BATCH_SIZE):
+        self.strategy_classes = list(strategy_classes)
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.tolerance = tolerance
+        self.max_games = max_games
+        self.batch_size = batch_size
+        self.pool = ProcessPoolExecutor(self.processes) if self.processes > 1 else None
+
+    def estimate(self, score1, score2, dealer=0, hand=None, seed=0):
+        """
+        Equity of player 1 with the given scores, dealer (0 for player 1, 1 for
+        player 2) and player 1's dealt hand, if known
+        """
+        position = (score1, score2, dealer, tuple(c.id for c in hand) if hand else ())
+        seeds = random.Random(seed)
+        wins = games = 0
+        if self.pool is None:
+            while not self.done(wins, games):
+                w, n = rollout_batch(self.strategy_classes, position,
+                                     self.batch_size, seeds.getrandbits(64))
+                wins, games = wins + w, games + n
+        else:
+            pending = {self.submit(position, seeds) for _ in range(2 * self.processes)}
+            while not self.done(wins, games):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    w, n = future.result()
+                    wins, games = wins + w, games + n
+                    pending.add(self.submit(position, seeds))
+            for future in pending:
+                future.cancel()
+        return Equity(wins / games, *wilson(wins, games), games)
+
+    def submit(self, position, seeds):
+        return self.pool.submit(rollout_batch, self.strategy_classes, position,
+                                self.batch_size, seeds.getrandbits(64))
+
+    def done(self, wins, games):
+        if games >= self.max_games:
+            return True
+        low, high = wilson(wins, games)
+        return games > 0 and (high - low) / 2 <= self.tolerance
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def round_points(strategy_classes, games, seed):
+    """
+    Counters of (pone, dealer) points in the play phase and in counting the hands
+    over the finished rounds of recorded games
+    """
+    rng = random.Random(seed)
+    strategies = [cls(random.Random(rng.getrandbits(64))) for cls in strategy_classes]
+    play, hands = Counter(), Counter()
+    for i in range(games):
+        record = play_game(strategies, rng, dealer=i % 2, record=True).record
+        dealer = record.first_dealer
+        for r in record.rounds[:-1]:
+            pone = 1 - dealer
+            play[r.play_points[pone], r.play_points[dealer]] += 1
+            hands[r.hand_points[pone], r.hand_points[dealer] + r.crib_points] += 1
+            dealer = pone
+    return play, hands
+
+
+def solve_table(play, hands):
+    """
+    Probability that the pone wins from every (pone score, dealer score) at the start
+    of a round, as a flat list indexed by pone score * WINNING_SCORE + dealer score
+    """
+    n = WINNING_SCORE
+    play = _distribution(play)
+    hands = _distribution(hands)
+    start = [0.0] * (n * n)  # at the start of a round
+    counting = [0.0] * (n * n)  # after the play phase, before the hands are counted
+    for total in range(2 * n - 2, -1, -1):
+        cells = [(p, total - p) for p in range(max(0, total - n + 1), min(total, n - 1) + 1)]
+        # every round scores at least the last card, so this only needs higher totals
+        for p, d in cells:
+            equity = 0.0
+            for pp, dp, prob in play:
+                if p + pp >= n:
+                    # whoever gets there first in the play phase, call it even when both do
+                    equity += prob if d + dp < n else prob / 2
+                elif d + dp < n:
+                    equity += prob * counting[(p + pp) * n + d + dp]
+            start[p * n + d] = equity
+        # the pone counts first, then the dealer deals the next round as pone
+        for p, d in cells:
+            equity = 0.0
+            for ph, dh, prob in hands:
+                if p + ph >= n:
+                    equity += prob
+                elif d + dh < n:
+                    equity += prob * (1 - start[(d + dh) * n + p + ph])
+            counting[p * n + d] = equity
+    return start
+
+
+def _distribution(counter):
+    total = sum(counter.values())
+    return [(a, b, count / total) for (a, b), count in counter.items()]
+
+
+def build(path=DEFAULT_PATH, games=TABLE_GAMES, processes=None, seed=0,
+          strategy_classes=(GreedyStrategy, GreedyStrategy)):
+    """
+    Writes the equity table from the rounds of games between the strategies
+    """
+    seeds = random.Random(seed)
+    chunks = [(list(strategy_classes), min(500, games - start), seeds.getrandbits(64))
+              for start in range(0, games, 500)]
+    play, hands = Counter(), Counter()
+    with ProcessPoolExecutor(processes) as pool:
+        for chunk_play, chunk_hands in pool.map(round_points, *zip(*chunks)):
+            play.update(chunk_play)
+            hands.update(chunk_hands)
+    table = solve_table(play, hands)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        array.array('H', (round(e * 65535) for e in table)).tofile(f)
+    os.replace(tmp_path, path)
+
+
+def load_table(path=DEFAULT_PATH):
+    """
+    The equity table, or None if it has not been built
+    """
+    global _table
+    if _table is None and os.path.exists(path):
+        table = array.array('H')
+        with open(path, 'rb') as f:
+            table.fromfile(f, WINNING_SCORE * WINNING_SCORE)
+        _table = table
+    return _table
+
+
+def table_equity(score1, score2, dealer=0, table=None):
+    """
+    Player 1's equity at the start of a round from the equity table, None without one
+    """
+    table = table if table is not None else load_table()
+    if table is None:
+        return None
+    if score1 >= WINNING_SCORE or score2 >= WINNING_SCORE:
+        return float(score1 >= WINNING_SCORE)
+    n = WINNING_SCORE
+    if dealer == 0:
+        return 1 - table[score2 * n + score1] / 65535
+    return table[score1 * n + score2] / 65535
+
+
+def default_estimator():
+    """
+    The EquityEstimator win_probability rolls out with when it is given none,
+    created on first use and kept, with its process pool, for the calls after
+    """
+    global _estimator
+    if _estimator is None:
+        _estimator = EquityEstimator()
+    return _estimator
+
+
+def win_probability(score1, score2, dealer=0, hand=None, estimator=None):
+    """
+    Player 1's Equity, from the table when no cards are known, else rolled out
+    """
+    if hand is None:
+        equity = table_equity(score1, score2, dealer)
+        if equity is not None:
+            return Equity(equity, equity, equity, 0)
+    if estimator is None:
+        estimator = default_estimator()
+    return estimator.estimate(score1, score2, dealer, hand)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command')
+    parser.add_argument('args', nargs='*', type=int)
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--dealer', type=int, choices=[1, 2], default=1)
+    parser.add_argument('--hand', nargs=6, default=None)
+    args = parser.parse_args()
+    if args.command == 'build':
+        build(args.path, args.args[0] if args.args else TABLE_GAMES, args.processes)
+        print(f"Wrote {WINNING_SCORE * WINNING_SCORE} equities to {args.path}")
+    else:
+        hand = Deck.all_from_string(args.hand) if args.hand else None
+        score1, score2 = int(args.command), args.args[0]
+        with EquityEstimator(processes=args.processes) as estimator:
+            print(win_probability(score1, score2, args.dealer - 1, hand, estimator))
@@ -0,0 +1,143 @@
+"""
+Events reported by GameState while a game is played.
+
+GameState only builds an event when its sink is enabled, so a game played with a
+NullSink does no formatting at all. ConsoleSink prints events like the game always
+has, ListSink keeps them, and BufferedFileSink writes them as JSON lines in batches.
+"""
+import json
+
+
+class Message:
+    """
+    Text for the players, like prompts and instructions
+    """
+    kind = 'message'
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    def to_dict(self):
+        return {'event': self.kind, 'text': self.text}
+
+
+class TurnEvent:
+    """
+    A card played in play phase, and the count after it
+    """
+    kind = 'turn'
+
+    def __init__(self, player, card, count):
+        self.player = player
+        self.card = card
+        self.count = count
+
+    def __str__(self):
+        return f"{self.card} was played for {self.card.points} points."
+
+    def to_dict(self):
+        return {'event': self.kind, 'player': self.player.id if self.player is not None else None,
+                'card': str(self.card), 'count': self.count}
+
+
+class ScoreEvent:
+    """
+    Points scored, by what and by whom
+    """
+    TEXT = {
+        # score_meld
+        'fifteen': "Adds to 15! {cards} -> {points} points",
+        'straight': "Straight! {cards} -> {points} points",
+        'match': "Match! {cards} -> {points} points",
+        'flush': "Flush! {cards} -> {points} points",
+        # play phase
+        'fifteen_or_31': "Landed on {count} -> {points} points!",
+        'run': "Straight! -> {points} points",
+        'pair': "Match! -> {points} points",
+        'go': "GO -> {points} point for {player}",
+        'last_card': "Last card -> {points} point for {player}",
+        # counting the hands
+        'hand': "Hand {cards} -> {points} points for {player}",
+        'crib': "Crib {cards} -> {points} points for {player}",
+    }
+
+    def __init__(self, kind, points, player=None, cards=(), count=None):
+        self.kind = kind
+        self.points = points
+        self.player = player
+        self.cards = tuple(cards)
+        self.count = count
+
+    def __str__(self):
+        return ScoreEvent.TEXT[self.kind].format(
+            cards=self.cards, points=self.points, player=self.player, count=self.count)
+
+    def to_dict(self):
+        return {'event': 'score', 'kind': self.kind, 'points': self.points,
+                'player': self.player.id if self.player is not None else None,
+                'cards': [str(c) for c in self.cards], 'count': self.count}
+
+
+class NullSink:
+    """
+    Drops every event. GameState checks enabled before building an event.
+    """
+    enabled = False
+
+    def emit(self, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(NullSink):
+    enabled = True
+
+    def emit(self, event):
+        print(event)
+
+
+class ListSink(NullSink):
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+class BufferedFileSink(NullSink):
+    """
+    Appends events to a file as JSON lines, batch_size events per write
+    """
+    enabled = True
+
+    def __init__(self, path, batch_size=1024):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def emit(self, event):
+        self.buffer.append(event.to_dict())
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in self.buffer))
+            self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
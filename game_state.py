@@ -1,206 +1,324 @@
-import random
+import copy
+import struct
 
-from deck import Deck
+from deck import CARDS, DECK_SIZE, DeckArray
+from events import ConsoleSink, Message, ScoreEvent, TurnEvent
 from player import Player
-from queue import Queue
+from pegging import PeggingScorer
+from scoring import score_hand
 from itertools import chain, combinations
 
+WINNING_SCORE = 121
+
+# GameState.state() layout: dealer, to_move, last_player, passed, decision, both scores, top card,
+# count, cards in the count, cards of one rank at the end of the count, the ranks
+# in the count (PeggingScorer.ranks) and the deck cursor; then the 52 deck ids and the
+# hands, original hands, crib and played stack, each as its length and card ids.
+# Scores are 16 bits, so a score past WINNING_SCORE still fits
+STATE = struct.Struct('<5B2H4BQB')
+# player fields: 0 for nobody, 1 for player1, 2 for player2
+DECISIONS = (None, 'discard', 'cut', 'play')
+NO_CARD = 255
+NO_DECK = 255
+
+
+class GameOver(Exception):
+    """
+    Raised as soon as a player reaches the winning score
+    """
+
+    def __init__(self, player):
+        super().__init__(f"{player} wins!")
+        self.player = player
+
 
 class GameState:
 
-    def __init__(self, inputFn=input):
-        self.player1 = Player()
-        self.player2 = Player()
-        self.deck = Deck.shuffled()
+    def __init__(self, inputFn=input, events=None, rng=None, strategies=None, players=None):
+        self.player1, self.player2 = players if players is not None else (Player(), Player())
+        # strategy.Strategy deciding for each player instead of inputFn
+        self.strategies = dict(zip([self.player1, self.player2], strategies or []))
+        self.rng = rng  # the rng DeckArray.shuffle shuffles with, None for the random module
+        self.fast_shuffle = False  # DeckArray.permute instead of shuffle: faster, but another order for a seed
+        self._deck = None  # shuffled on first use, so building a game stays cheap
+        self.cut_rng = None  # a random.Random picking the cut instead of the pone, when set
 
-        self.center_card = None
+        self.top_card = None
         self.played_stack = []
         self.crib = []
         self.phases = [self.re_shuffle, self.deal,
-                       self.make_crib, self.cut, self.start, self.peg]
+                       self.make_crib, self.cut, self.start, self.peg, self.reset]
         self.dealer = self.player1
         self.input = inputFn
-        self.straight = []  # used for straight detection in play phase
-        self.matches = []  # used for match detection in play phase
+        self.pegging = PeggingScorer()  # the count and its scoring in play phase
+        self.events = events if events is not None else ConsoleSink()
+        self.to_move = None  # the player making the current decision
+        self.decision = None  # 'discard', 'cut' or 'play'
+        self.last_player = None  # the player who played the last card in play phase
+        self.passed = None  # the player who said GO since the count last started over
+        self.recorder = None  # a records.GameRecorder told about every phase played
+        self.history = []  # state() before each apply(), for undo()
 
     def play(self):
-        print('Welcome to Cribbage :)')
-        while self.player1.score <= 121 and self.player2.score <= 121:
-            for i in range(len(self.phases)):
-                self.phases[i]()
+        self.message('Welcome to Cribbage :)')
+        try:
+            while True:
+                for phase in self.phases:
+                    phase()
+                    if self.recorder is not None:
+                        self.recorder.after_phase(phase.__name__)
+        except GameOver as over:
+            if self.recorder is not None:
+                self.recorder.finish(over.player)
+            self.message('{}', over)
+            return over.player
+
+    def message(self, text, *args):
+        """
+        Reports text formatted with args, only formatting it when someone is listening
+        """
+        if self.events.enabled:
+            self.events.emit(Message(text.format(*args) if args else text))
+
+    @property
+    def deck(self):
+        if self._deck is None:
+            self.re_shuffle()
+        return self._deck
+
+    @deck.setter
+    def deck(self, deck):
+        self._deck = deck
+
+    @property
+    def count(self):
+        """
+        The count in play phase
+        """
+        return self.pegging.count
+
+    def opponent(self, player):
+        return self.player2 if player == self.player1 else self.player1
+
+    def pone(self):
+        """
+        The player who is not the dealer
+        """
+        return self.opponent(self.dealer)
+
+    def award(self, player, points, kind=None, cards=()):
+        """
+        Adds points to the player, ending the game once they reach the winning score.
+        kind and cards describe the points for a ScoreEvent.
+        """
+        if kind is not None and self.events.enabled:
+            self.events.emit(ScoreEvent(kind, points, player, cards))
+        player.score += points
+        if player.score >= WINNING_SCORE:
+            raise GameOver(player)
 
     def re_shuffle(self):
-        self.deck = Deck.shuffled()
+        if self._deck is None:
+            self._deck = DeckArray()
+        if self.fast_shuffle:
+            self._deck.permute(self.rng)
+        else:
+            self._deck.shuffle(self.rng)
 
     def deal_hand(self):
-        return [self.deck.pop(0) for ind in range(6)]
+        return self.deck.deal(6)
 
     def deal(self):
         self.player1.hand = self.deal_hand()
         self.player2.hand = self.deal_hand()
 
     def prompt_crib(self, player):
-        print("Lay away...")
+        self.to_move, self.decision = player, 'discard'
+        strategy = self.strategies.get(player)
+        if strategy is not None:
+            self.lay_away(player, strategy.choose_discard(list(player.hand), player == self.dealer))
+            return
+        self.message("Lay away...")
         self.crib.append(self.select_card(player.hand))
-        print("Lay away...")
+        self.message("Lay away...")
         self.crib.append(self.select_card(player.hand))
+        self.end_crib(player)
+
+    def lay_away(self, player, cards):
+        for card in cards:
+            player.hand.remove(card)
+            self.crib.append(card)
+        self.end_crib(player)
+
+    def end_crib(self, player):
         # For scoring later
-        player.original_hand = player.hand
+        player.original_hand = list(player.hand)
 
     def select_card(self, cards):
         """
         Prompts the player to select a card from the cards provided
         Returns the selected card, which is removed from the list of cards provided
         """
-        idx = -1  # should not be inital value
         while True:
-            print("Please select a card by index:")
-            inpt = self.input(list(enumerate(cards)))
-            try:
-                idx = int(inpt)
-            except ValueError:
-                print(f"'{inpt}' is not a valid index.")
-            if idx < 0 or idx >= len(cards):
-                print(f"The index {idx} is not available.")
-            else:
-                break
-        assert idx != -1  # make sure it's not initial value
-        return cards.pop(idx)
+            self.message("Please select a card by index:")
+            idx = self.parse_index(self.input(list(enumerate(cards))), cards)
+            if idx is not None:
+                return cards.pop(idx)
+
+    def parse_index(self, inpt, cards):
+        """
+        The index of cards the input selects, or None if it is not valid
+        """
+        try:
+            idx = int(inpt)
+        except ValueError:
+            self.message("'{}' is not a valid index.", inpt)
+            return None
+        if idx < 0 or idx >= len(cards):
+            self.message("The index {} is not available.", idx)
+            return None
+        return idx
 
     def make_crib(self):
-        print(
+        self.message(
             'Cards should now be layed away into the crib. Please pass the game to player 1')
-        print('Player 1:')
+        self.message('Player 1:')
         self.prompt_crib(self.player1)
 
-        print('Please pass the game to player 2')
-        print('Player 2:')
+        self.message('Please pass the game to player 2')
+        self.message('Player 2:')
         self.prompt_crib(self.player2)
 
-        print('The crib has been created.')
+        self.message('The crib has been created.')
 
     def cut(self):
-        print("Please select a number to cut the deck by...")
-        print(f"The center card is {self.select_card(self.deck)}")
+        self.to_move, self.decision = self.pone(), 'cut'
+        strategy = self.strategies.get(self.to_move)
+        if self.cut_rng is not None:
+            self.top_card = self.deck.pop(self.cut_rng.randrange(len(self.deck)))
+        elif strategy is not None:
+            self.top_card = self.deck.pop(strategy.choose_cut(len(self.deck)))
+        else:
+            self.message("Please select a number to cut the deck by...")
+            self.top_card = self.select_card(self.deck)
+        self.message("The center card is {}", self.top_card)
 
     def start(self):
-        print('let the game begin')
-        player_queue = [self.player2, self.player1] if self.dealer == self.player1 else [
-            self.player1, self.player1]
-        the_count = 0
-        while True:
-            print(f"The count is {the_count}")
-            current_player = player_queue.pop(0)
-            print(current_player)
+        """
+        The play phase. Players take turns playing cards until both hands are empty,
+        the pone leads and the count starts over after 31 or when both players GO.
+        """
+        self.begin_play()
+        playable_cards = self.next_turn()
+        while playable_cards:
+            self.play_card(self.choose_play(playable_cards))
+            playable_cards = self.next_turn()
+
+    def choose_play(self, playable_cards):
+        """
+        The card self.to_move plays, from their strategy or else prompted for
+        """
+        player = self.to_move
+        strategy = self.strategies.get(player)
+        if strategy is not None:
+            return strategy.choose_play(playable_cards, self.count, self.played_stack, player.hand,
+                                        self.top_card, self.passed is not None)
+        return self.select_card(playable_cards)
+
+    def begin_play(self):
+        self.message('let the game begin')
+        self.to_move, self.decision = self.pone(), 'play'
+        self.last_player = None
+        self.reset_count()
+
+    def next_turn(self):
+        """
+        Moves on to the next player who can play, scoring GO and the last card on the way.
+        Returns the cards self.to_move can play, or no cards once both hands are empty.
+        """
+        while self.player1.hand or self.player2.hand:
+            current_player = self.to_move
+            self.message("The count is {}", self.count)
+            self.message("{}", current_player)
             playable_cards = list(self.filter_playable_cards(
-                current_player.hand, the_count))
-            if len(playable_cards) == 0:
-                print("GO")
-                player_queue[0].score += 1
-                player_queue.append(current_player)
-                break
-            card_played = self.select_card(playable_cards)
-            self.played_stack.append(card_played)
-            print(f"{card_played} was played for {card_played.rank.points()} points.")
-            the_count += card_played.rank.points()
-            current_player.score += self.apply_score(
-                card_played, the_count)
-            player_queue.append(current_player)
+                current_player.hand, self.count))
+            if playable_cards:
+                return playable_cards
+            self.message("GO")
+            other_player = self.opponent(current_player)
+            if any(self.filter_playable_cards(other_player.hand, self.count)):
+                self.passed = current_player
+                self.to_move = other_player
+                continue
+            # nobody can play, the last card played gets a point
+            self.award(self.last_player, 1, 'go')
+            self.reset_count()
+            self.to_move = self.opponent(self.last_player)
+        if self.count > 0:
+            # last card
+            self.award(self.last_player, 1, 'last_card')
+            self.reset_count()
+        return []
+
+    def play_card(self, card_played):
+        """
+        self.to_move plays the card from their hand
+        """
+        player = self.to_move
+        player.hand.remove(card_played)
+        self.played_stack.append(card_played)
+        self.last_player = player
+        self.award(player, self.apply_score(card_played, player))
+        if self.count == 31:
+            self.reset_count()
+        self.to_move = self.opponent(player)
+
+    def reset_count(self):
+        """
+        Starts the count over at 0 in play phase
+        """
+        self.pegging.reset()
+        self.passed = None
 
     def filter_playable_cards(self, hand, count):
         needed = 31 - count
         for c in hand:
-            if c.rank.points() <= needed:
+            if c.points <= needed:
                 yield c
 
-    def check_landed_15_or_31(self, count):
-        if count == 15 or count == 31:
-            # Count is now 31 -> 2 points
-            # Count is now 15 -> 2 points
-            print(f"Landed on {count} -> 2 points!")
-            return 2
-        return 0
-
-    def check_straight(self, played_card):
-        straight_len = len(self.straight)
-        if straight_len == 0:
-            # fill the straight list
-            self.straight.append(played_card)
-        else:  # straight queue has at least 1 card in it
-            # check the bottom and top completion next
-            bot = self.straight[0]
-            top = self.straight[-1]
-            cmp = played_card
-            bdiff = cmp - bot
-            tdiff = cmp - top
-            if abs(bdiff) == 1 or abs(tdiff) == 1:
-                # add to the list
-                self.straight.append(cmp)
-                self.straight = sorted(
-                    self.straight, key=lambda c: c.rank.value)
-                # add points for the number of cards in the straight list
-                # unless there are only two cards in there
-                pts = len(self.straight)
-                if pts > 2:
-                    print(f"Straight! {self.straight} -> {pts} points")
-                    return pts
-                else:
-                    return 0
-            else:
-                # straight broken, clear straight list
-                # add played card because it might be part of a subsequent straight
-                self.straight.clear()
-                self.straight.append(played_card)
-        return 0
-
-    def check_match(self, played_card):
-        matches_len = len(self.matches)
-        if matches_len == 0:
-            self.matches.append(played_card)  # add the last
-        else:  # matches has at least one card, lets see if rank matches
-            cmp = self.matches[0]
-            if cmp.rank == played_card.rank:
-                # add to the matches, add the points
-                self.matches.append(played_card)
-                # a[n] = n^2 + n is [2,6,12...]
-                pts = matches_len + matches_len**2
-                if pts > 0:
-                    print(f"Match! {self.matches} -> {pts} points")
-                return pts
-            else:
-                self.matches.clear()
-                # still might have the last played card to start somthing
-                self.matches.append(played_card)
-        return 0
-
-    def apply_score(self, played_card, count):
-        score += self.check_landed_15_or_31(count)
-        # Previous N are unordered straight (at least 3, three -> 3 points, four -> 4 points, etc)
-        score += self.check_straight(played_card)
-        # Previous N are same rank (pair -> 2 points, triplet -> 6 points, quadruplet -> 12)
-        score += self.check_match(played_card)
+    def apply_score(self, played_card, player=None):
+        """
+        Adds the played card to the count and returns the points it scores
+        """
+        pegging = self.pegging
+        score = pegging.play(played_card)
+        if self.events.enabled:
+            self.events.emit(TurnEvent(player, played_card, pegging.count))
+            for kind, points in [('fifteen_or_31', pegging.fifteen_or_31), ('run', pegging.run),
+                                 ('pair', pegging.match)]:
+                if points:
+                    self.events.emit(ScoreEvent(kind, points, player, [played_card], pegging.count))
         return score
 
     def peg(self):
         """
         Scores the cards in the original hands, in conjunction with
-        the top card from the deck
+        the top card from the deck. The pone counts first, then the dealer and the crib.
         """
-        self.player1.score += self.score(
-            self.player1.original_hand, self.top_card)
-        self.player2.score += self.score(
-            self.player2.original_hand, self.top_card)
-        self.dealer.score += self.score(self.crib, self.top_card)
+        pone = self.pone()
+        self.award(pone, self.score(pone.original_hand, self.top_card),
+                   'hand', pone.original_hand + [self.top_card])
+        self.award(self.dealer, self.score(self.dealer.original_hand, self.top_card),
+                   'hand', self.dealer.original_hand + [self.top_card])
+        self.award(self.dealer, self.score(self.crib, self.top_card),
+                   'crib', self.crib + [self.top_card])
 
     def score(self, hand, top_card):
         """
-        Finds all of the permutations of the hand and top card to find the score for the hand.
+        Scores the hand and top card, the same as running score_meld over every meld
+        in the powerset of the hand and top card, using the tables in scoring.py
         """
-        powerset = GameState.powerset(list(hand).append(top_card))
-        score = 0
-        for meld in powerset:
-            score += self.score_meld(meld)
-        return score
+        return score_hand(hand, top_card)
 
     def score_meld(self, meld):
         """
@@ -213,8 +331,8 @@ class GameState:
                 f"Meld {meld} has a length {len(meld)}. It should be higher than 1.")
         score = 0
         # Check adds to 15
-        if sum([c.rank.points() for c in meld]) == 15:
-            print(f"Adds to 15! {meld} -> 2 points")
+        if sum([c.points for c in meld]) == 15:
+            self.report_meld('fifteen', 2, meld)
             score += 2
         # Check a straight
         if len(meld) > 2:
@@ -231,33 +349,169 @@ class GameState:
                 else:
                     t = c  # update rolling pairs
             if is_straight:
-                print(f"Straight! {meld} -> {len(meld)} points")
+                self.report_meld('straight', len(meld), meld)
                 score += len(meld)
         # Check a match, only a pair...
         if len(meld) == 2 and meld[0].rank == meld[1].rank:
-            print(f"Match! {meld} -> 2 points")
+            self.report_meld('match', 2, meld)
             score += 2
         # Check flush
         if len(meld) == 4:
             s = meld[0].suit
             if all(c.suit == s for c in meld):
-                print(f"Flush! {meld} -> 4 points")
+                self.report_meld('flush', 4, meld)
                 score += 4
         return score
 
+    def report_meld(self, kind, points, meld):
+        if self.events.enabled:
+            self.events.emit(ScoreEvent(kind, points, cards=meld))
+
     def reset(self):
         """
         Resets all of the current game state to ready it for the next round
         """
         # Switch who is dealer
         self.dealer = self.player2 if self.dealer == self.player1 else self.player1
-        # Reset deck (shuffle?)
-        self.deck = []
-        # Reset straight and match lists
-        self.straight = []
-        self.matches = []
-        # Reset crib
+        # Reset deck, it is shuffled at the start of the next round
+        if self._deck is not None:
+            self._deck.clear()
+        # Reset the count
+        self.reset_count()
+        # Reset crib and played cards
         self.crib = []
+        self.played_stack = []
+
+    def state(self):
+        """
+        The whole state of the round and scores packed in about 100 bytes, for restore.
+        Players are saved by seat, strategies, events and inputFn are not saved.
+        """
+        seats = (None, self.player1, self.player2)
+        pegging = self.pegging
+        if self._deck is None:
+            ids, cursor = b'', NO_DECK
+        else:
+            ids, cursor = self._deck.ids, self._deck.cursor
+        state = bytearray(STATE.pack(
+            seats.index(self.dealer), seats.index(self.to_move), seats.index(self.last_player),
+            seats.index(self.passed), DECISIONS.index(self.decision), self.player1.score, self.player2.score,
+            NO_CARD if self.top_card is None else self.top_card.id,
+            pegging.count, pegging.length, pegging.pair_length, pegging.ranks, cursor))
+        state += ids
+        for cards in (self.player1.hand, self.player2.hand, self.player1.original_hand,
+                      self.player2.original_hand, self.crib, self.played_stack):
+            state.append(len(cards))
+            state += bytes(c.id for c in cards)
+        return bytes(state)
+
+    def restore(self, state):
+        """
+        Puts the game back to a state() of this game or of any other GameState
+        """
+        (dealer, to_move, last_player, passed, decision, score1, score2, top_card,
+         count, length, pair_length, ranks, cursor) = STATE.unpack_from(state)
+        seats = (None, self.player1, self.player2)
+        self.dealer, self.to_move, self.last_player = seats[dealer], seats[to_move], seats[last_player]
+        self.passed = seats[passed]
+        self.decision = DECISIONS[decision]
+        self.player1.score, self.player2.score = score1, score2
+        self.top_card = None if top_card == NO_CARD else CARDS[top_card]
+        self.pegging.restore((count, ranks, length, pair_length))
+        pos = STATE.size
+        if cursor == NO_DECK:
+            self._deck = None
+        else:
+            if self._deck is None:
+                self._deck = DeckArray()
+            self._deck.restore((state[pos:pos + DECK_SIZE], cursor))
+            pos += DECK_SIZE
+        lists = []
+        for _ in range(6):
+            n = state[pos]
+            lists.append([CARDS[i] for i in state[pos + 1:pos + 1 + n]])
+            pos += 1 + n
+        (self.player1.hand, self.player2.hand, self.player1.original_hand,
+         self.player2.original_hand, self.crib, self.played_stack) = lists
+
+    def clone(self):
+        """
+        A new game in the same state, sharing the strategies, events, inputFn and rng.
+        Costs one state() and restore() instead of a deepcopy of the game.
+        The clone is not recorded or profiled.
+        """
+        game = copy.copy(self)
+        # methods wrapped on this game (profiler.Profiler.attach) would still call this game
+        for name, value in list(game.__dict__.items()):
+            if callable(value) and hasattr(type(self), name):
+                del game.__dict__[name]
+        game.player1, game.player2 = copy.copy(self.player1), copy.copy(self.player2)
+        seats = {self.player1: game.player1, self.player2: game.player2}
+        game.strategies = {seats[p]: s for p, s in self.strategies.items()}
+        # methods bound to this game are bound to the clone instead
+        game.phases = [getattr(game, phase.__name__) for phase in self.phases]
+        if getattr(self.input, '__self__', None) is self:
+            game.input = getattr(game, self.input.__name__)
+        game.pegging = PeggingScorer()
+        game._deck = None
+        game.recorder = None
+        game.history = []
+        game.restore(self.state())
+        return game
+
+    def begin_round(self):
+        """
+        Shuffles and deals a round, then waits on player 1 to lay away as make_crib does,
+        so the round can be played with apply()
+        """
+        self.re_shuffle()
+        self.deal()
+        self.to_move, self.decision = self.player1, 'discard'
+
+    def moves(self):
+        """
+        The moves self.to_move can make for self.decision, for apply():
+        pairs of cards to lay away, deck indexes to cut at, or cards to play
+        """
+        if self.decision == 'discard':
+            return list(combinations(self.to_move.hand, 2))
+        if self.decision == 'cut':
+            return range(len(self.deck))
+        if self.decision == 'play':
+            return list(self.filter_playable_cards(self.to_move.hand, self.count))
+        return []
+
+    def apply(self, move):
+        """
+        Makes one of the moves() and moves on to the next decision, scoring on the way.
+        After the last card is played the decision is None, counting the hands is left
+        to the peg phase. GameOver is raised as in play(), undo() still takes the move back.
+        """
+        self.history.append(self.state())
+        player = self.to_move
+        if self.decision == 'discard':
+            self.lay_away(player, move)
+            other = self.opponent(player)
+            if len(other.hand) > len(player.hand):
+                self.to_move = other
+            else:
+                self.to_move, self.decision = self.pone(), 'cut'
+        elif self.decision == 'cut':
+            self.top_card = self.deck.pop(move)
+            self.begin_play()
+            self.next_turn()
+        elif self.decision == 'play':
+            self.play_card(move)
+            if not self.next_turn():
+                self.to_move = self.decision = None
+        else:
+            raise ValueError("There is no decision to make a move for.")
+
+    def undo(self):
+        """
+        Takes back the last apply()
+        """
+        self.restore(self.history.pop())
 
     def powerset(iterable):
         """
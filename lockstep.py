@@ -0,0 +1,162 @@
+"""
+Thousands of games in lockstep, deciding each step in one batch per strategy.
+
+Every game is an AsyncGameState whose strategies only queue their decisions.
+Once every unfinished game is waiting on a decision, the scheduler hands all the
+queued discards, and all the queued plays, of each strategy to its batched
+method (choose_discards, choose_plays) in one call, then lets the games run on
+to their next decision.
+
+    python lockstep.py [games] [--seed S]
+"""
+import argparse
+import asyncio
+import inspect
+import random
+import time
+
+from async_game import AsyncGameState
+from events import NullSink
+from game_state import GameOver
+from simulator import SCORING_PHASES, GameResult, SimulationSummary
+from strategy import GreedyStrategy, RandomStrategy
+
+
+class QueuedStrategy:
+    """
+    Stands in for a strategy in one game, queuing its decisions on the scheduler
+    """
+
+    def __init__(self, scheduler, strategy):
+        self.scheduler = scheduler
+        self.strategy = strategy
+
+    def choose_discard(self, hand, is_dealer):
+        return self.scheduler.queue(self.strategy, 'discard', (hand, is_dealer))
+
+    def choose_play(self, playable, count, played, hand, top_card, opponent_passed):
+        return self.scheduler.queue(self.strategy, 'play',
+                                    (playable, count, played, hand, top_card, opponent_passed))
+
+    def choose_cut(self, cards):
+        return self.strategy.choose_cut(cards)
+
+
+class LockstepGame(AsyncGameState):
+    """
+    AsyncGameState returning a GameResult, counting points per scoring phase like play_game
+    """
+
+    async def play(self):
+        players = [self.player1, self.player2]
+        points = {phase: [0, 0] for phase in SCORING_PHASES}
+        rounds = 0
+        try:
+            while True:
+                rounds += 1
+                for phase in self.phases:
+                    before = [p.score for p in players]
+                    try:
+                        result = phase()
+                        if inspect.isawaitable(result):
+                            await result
+                    finally:
+                        if phase.__name__ in points:
+                            for i, p in enumerate(players):
+                                points[phase.__name__][i] += p.score - before[i]
+        except GameOver as over:
+            return GameResult(players.index(over.player), points, rounds)
+
+
+class LockstepScheduler:
+
+    def __init__(self):
+        self.queued = {}  # {(strategy, 'discard' or 'play'): [(arguments, future)]}
+        self.waiting = 0  # games waiting on a decision
+        self.running = 0  # games not finished
+        self.ready = None  # set once every running game is waiting
+        self.steps = 0
+        self.batches = 0
+        self.decisions = 0
+
+    def queue(self, strategy, kind, arguments):
+        future = asyncio.get_running_loop().create_future()
+        self.queued.setdefault((strategy, kind), []).append((arguments, future))
+        self.waiting += 1
+        self.check()
+        return future
+
+    def check(self):
+        if self.waiting == self.running:
+            self.ready.set()
+
+    async def run(self, games):
+        """
+        Plays the games to the end and returns what their play methods return
+        """
+        self.ready = asyncio.Event()
+        self.running = len(games)
+        tasks = [asyncio.ensure_future(self.run_game(game)) for game in games]
+        while self.running:
+            await self.ready.wait()
+            self.ready.clear()
+            self.decide()
+        return [task.result() for task in tasks]
+
+    async def run_game(self, game):
+        try:
+            return await game.play()
+        finally:
+            self.running -= 1
+            self.check()
+
+    def decide(self):
+        queued, self.queued = self.queued, {}
+        self.waiting = 0
+        self.steps += 1
+        for (strategy, kind), decisions in queued.items():
+            arguments = [a for a, _ in decisions]
+            if kind == 'discard':
+                choices = strategy.choose_discards(arguments)
+            else:
+                choices = strategy.choose_plays(arguments)
+            self.batches += 1
+            self.decisions += len(decisions)
+            for (_, future), choice in zip(decisions, choices):
+                future.set_result(choice)
+
+
+def simulate_lockstep(strategy_classes, games, seed=0, scheduler=None):
+    """
+    Plays games between the two strategy classes in lockstep in this process,
+    one strategy instance per seat deciding for every game, and returns a SimulationSummary
+    """
+    rng = random.Random(seed)
+    strategies = [cls(random.Random(rng.getrandbits(64))) for cls in strategy_classes]
+    scheduler = scheduler if scheduler is not None else LockstepScheduler()
+    seats = [QueuedStrategy(scheduler, s) for s in strategies]
+    tables = []
+    for i in range(games):
+        game = LockstepGame(inputFn=None, events=NullSink(),
+                            rng=random.Random(rng.getrandbits(64)), strategies=seats)
+        # players take turns dealing first
+        game.dealer = [game.player1, game.player2][i % 2]
+        tables.append(game)
+    summary = SimulationSummary()
+    for result in asyncio.run(scheduler.run(tables)):
+        summary.add(result)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('games', nargs='?', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    scheduler = LockstepScheduler()
+    start = time.perf_counter()
+    summary = simulate_lockstep([GreedyStrategy, RandomStrategy], args.games, args.seed, scheduler)
+    elapsed = time.perf_counter() - start
+    print(summary)
+    print(f"{scheduler.steps} steps, {scheduler.decisions / scheduler.batches:,.1f} decisions per batch")
+    print(f"{args.games / elapsed * 60:,.0f} games per minute")
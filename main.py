@@ -1,6 +1,7 @@
 from game_state import GameState
 
-game = GameState()
-game.play()
+if __name__ == '__main__':
+    game = GameState()
+    game.play()
 
 # TODO(): event loop for turns and structure of a round
@@ -0,0 +1,75 @@
+"""
+Incremental scoring for the play phase.
+
+The ranks played since the count last started over are kept in one integer,
+4 bits per card with the newest card lowest. Each played card is scored for 15/31,
+pairs and runs in bounded time: a count can hold at most 13 cards, so the run
+check walks at most 13 nibbles and nothing is sorted or rebuilt.
+"""
+
+
+class PeggingScorer:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Starts the count over at 0
+        """
+        self.count = 0
+        self.ranks = 0  # ranks played since the count started, 4 bits each, newest lowest
+        self.length = 0  # number of cards in ranks
+        self.pair_length = 0  # number of cards of the same rank at the end of ranks
+        # points from the last card played
+        self.fifteen_or_31 = 0
+        self.match = 0
+        self.run = 0
+
+    def play(self, card):
+        """
+        Adds the card to the count and returns the points it scores
+        """
+        rank = card.rank.value
+        self.count += card.points
+        self.fifteen_or_31 = 2 if self.count == 15 or self.count == 31 else 0
+
+        # Last N are same rank (pair -> 2 points, triplet -> 6 points, quadruplet -> 12)
+        if self.length and self.ranks & 0xF == rank:
+            self.pair_length += 1
+        else:
+            self.pair_length = 1
+        self.match = self.pair_length * (self.pair_length - 1)
+
+        self.ranks = (self.ranks << 4) | rank
+        self.length += 1
+
+        # Last N are an unordered run (at least 3, three -> 3 points, four -> 4 points, etc)
+        self.run = 0
+        if self.pair_length == 1 and self.length >= 3:
+            ranks = self.ranks
+            seen = 0
+            low = high = rank
+            for n in range(1, self.length + 1):
+                r = ranks & 0xF
+                ranks >>= 4
+                if seen >> r & 1:
+                    break  # a repeated rank ends every longer run
+                seen |= 1 << r
+                if r < low:
+                    low = r
+                elif r > high:
+                    high = r
+                if n >= 3 and high - low == n - 1:
+                    self.run = n
+        return self.fifteen_or_31 + self.match + self.run
+
+    def state(self):
+        """
+        Everything needed to restore the scorer, as a tuple of ints
+        """
+        return self.count, self.ranks, self.length, self.pair_length
+
+    def restore(self, state):
+        self.count, self.ranks, self.length, self.pair_length = state
+        self.fifteen_or_31 = self.match = self.run = 0
@@ -0,0 +1,244 @@
+"""
+Game tree search for the play phase.
+
+Only ranks matter in the play phase, so a position is both hands as rank counts
+(3 bits per rank), the PeggingScorer state, the player to move and the player who
+played the last card. Positions are searched with negamax and alpha-beta on the
+difference in points, with a transposition table keyed on the position packed into
+one int, and iterative deepening so a node or time budget always leaves a move.
+
+When the opponent's cards are hidden, opponent hands are sampled from the unseen
+cards and the value of each play is averaged over the samples (expectimax over
+sampled deals).
+"""
+import random
+import time
+from math import inf
+
+from deck import CARDS
+from pegging import PeggingScorer
+
+ME, OPPONENT = 0, 1
+NOBODY = 2
+
+# one card of each rank, for the scorer
+RANK_CARDS = [None] + [CARDS[r - 1] for r in range(1, 14)]
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+TABLE_SIZE = 1 << 20
+SAMPLES = 32
+
+
+class OutOfBudget(Exception):
+    pass
+
+
+class SearchStats:
+
+    def __init__(self):
+        self.nodes = 0
+        self.table_hits = 0
+        self.elapsed = 0.0
+        self.depth = 0  # deepest fully searched depth
+
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.nodes} nodes, {self.table_hits} table hits, depth {self.depth}, "
+                f"{self.elapsed * 1000:.1f}ms, {self.nodes_per_second():,.0f} nodes/sec")
+
+
+def rank_counts(cards):
+    """
+    Rank counts of the cards, 3 bits per rank
+    """
+    counts = 0
+    for c in cards:
+        counts += 1 << (3 * (c.rank.value - 1))
+    return counts
+
+
+class PeggingSearch:
+
+    def __init__(self, max_nodes=None, max_time=None, table_size=TABLE_SIZE, samples=SAMPLES, rng=None):
+        self.max_nodes = max_nodes
+        self.max_time = max_time
+        self.table_size = table_size
+        self.samples = samples
+        self.rng = rng or random.Random()
+        self.table = {}
+        self.scorer = PeggingScorer()
+        self.stats = SearchStats()
+
+    def best_play(self, hand, pegging, opponent_hand=None, unseen=(), opponent_cards=0,
+                  opponent_passed=False):
+        """
+        Returns the card of hand to play and its value in points over the opponent.
+        pegging is the PeggingScorer of the current count. Without opponent_hand,
+        the opponent holds opponent_cards of the unseen cards.
+        """
+        self.stats = SearchStats()
+        self.start_time = time.perf_counter()
+        self.out_of_budget = False
+        self.root_state = pegging.state()
+        last = ME if opponent_passed else OPPONENT if pegging.count else NOBODY
+        mine = rank_counts(hand)
+        if opponent_hand is not None:
+            opponent_hands = [rank_counts(opponent_hand)]
+        else:
+            unseen = list(unseen)
+            opponent_hands = [rank_counts(self.rng.sample(unseen, opponent_cards))
+                              for _ in range(self.samples)]
+        totals = {}
+        searched = 0
+        try:
+            for theirs in opponent_hands:
+                values = self.root_values(mine, theirs, last)
+                for rank, value in values.items():
+                    totals[rank] = totals.get(rank, 0) + value
+                searched += 1
+                if self.out_of_budget:
+                    break
+        except OutOfBudget:
+            pass
+        self.stats.elapsed = time.perf_counter() - self.start_time
+        playable = [c for c in hand if c.points <= 31 - pegging.count]
+        if not totals:
+            # out of budget before any search finished
+            return max(playable, key=lambda c: c.points), 0.0
+        rank = max(totals, key=totals.get)
+        card = next(c for c in playable if c.rank.value == rank)
+        return card, totals[rank] / searched
+
+    def root_values(self, mine, theirs, last):
+        """
+        Value of each rank ME can play, from the deepest depth searched within budget
+        """
+        cards = _cards_left(mine) + _cards_left(theirs)
+        values = {}
+        for depth in range(1, cards + 1):
+            previous = values
+            try:
+                values = {}
+                for rank in _playable_ranks(mine, self.root_state[0]):
+                    self.scorer.restore(self.root_state)
+                    values[rank] = self.play(mine, theirs, ME, rank, depth, -inf, inf)
+            except OutOfBudget:
+                if depth == 1:
+                    raise
+                self.out_of_budget = True
+                return previous
+            self.stats.depth = max(self.stats.depth, depth)
+        return values
+
+    def play(self, mine, theirs, mover, rank, depth, alpha, beta):
+        """
+        Value for mover of mover playing rank
+        """
+        scorer = self.scorer
+        state = scorer.state()
+        points = scorer.play(RANK_CARDS[rank])
+        if scorer.count == 31:
+            scorer.reset()
+        shift = 3 * (rank - 1)
+        if mover == ME:
+            mine -= 1 << shift
+        else:
+            theirs -= 1 << shift
+        value = points - self.search(mine, theirs, 1 - mover, mover, depth - 1, points - beta, points - alpha)
+        scorer.restore(state)
+        return value
+
+    def search(self, mine, theirs, mover, last, depth, alpha, beta):
+        """
+        Negamax value of the position for mover
+        """
+        stats = self.stats
+        stats.nodes += 1
+        if stats.nodes & 0x3FF == 0:
+            self.check_budget()
+        scorer = self.scorer
+        count = scorer.count
+        if not mine and not theirs:
+            # last card
+            if count == 0 or last == NOBODY:
+                return 0
+            return 1 if last == mover else -1
+        if depth == 0:
+            return 0
+
+        own, other = (mine, theirs) if mover == ME else (theirs, mine)
+        playable = _playable_ranks(own, count)
+        if not playable:
+            if _playable_ranks(other, count):
+                # GO, the other player keeps playing
+                return -self.search(mine, theirs, 1 - mover, last, depth, -beta, -alpha)
+            # nobody can play, the last card gets a point and the count starts over
+            state = scorer.state()
+            scorer.reset()
+            leader = 1 - last
+            value = self.search(mine, theirs, leader, NOBODY, depth, -inf, inf)
+            scorer.restore(state)
+            value = value if leader == mover else -value
+            return value + (1 if last == mover else -1)
+
+        key = (((own << 39 | other) << 6 | count) << 52 | scorer.ranks) << 7 | \
+            scorer.length << 3 | scorer.pair_length
+        key = key << 2 | (NOBODY if last == NOBODY else last == mover)
+        entry = self.table.get(key)
+        best_rank = None
+        if entry is not None:
+            entry_depth, value, flag, best_rank = entry
+            if entry_depth >= depth:
+                stats.table_hits += 1
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+            if best_rank in playable:
+                playable.remove(best_rank)
+                playable.insert(0, best_rank)
+
+        original_alpha = alpha
+        best = -inf
+        for rank in playable:
+            value = self.play(mine, theirs, mover, rank, depth, alpha, beta)
+            if value > best:
+                best = value
+                best_rank = rank
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        self.table[key] = (depth, best, flag, best_rank)
+        return best
+
+    def check_budget(self):
+        if self.max_nodes is not None and self.stats.nodes >= self.max_nodes:
+            raise OutOfBudget()
+        if self.max_time is not None and time.perf_counter() - self.start_time >= self.max_time:
+            raise OutOfBudget()
+
+
+def _cards_left(counts):
+    return sum((counts >> (3 * r)) & 0b111 for r in range(13))
+
+
+def _playable_ranks(counts, count):
+    """
+    Ranks in the rank counts that can be played on the count, highest first
+    """
+    needed = 31 - count
+    ranks = []
+    for rank in range(13, 0, -1):
+        if (counts >> (3 * (rank - 1))) & 0b111 and RANK_CARDS[rank].points <= needed:
+            ranks.append(rank)
+    return ranks
@@ -0,0 +1,175 @@
+"""
+Opt-in timing of a game's phases and scoring functions.
+
+Profiler.attach wraps the phases and scoring methods of one GameState instance, so
+a game that is not attached runs the plain methods with no overhead at all. Every
+call records its wall time, the time of the calls made inside it and the change in
+allocated memory blocks (sys.getallocatedblocks), per call stack.
+
+Profilers can be merged, so one per table or process adds up to one report: a
+summary table per function, or folded stacks (one 'a;b;c microseconds' line per
+stack) for flamegraph.pl, speedscope and similar tools.
+"""
+import functools
+import inspect
+import sys
+import time
+
+# the scoring methods of GameState timed along with the phases
+SCORING = ('score', 'score_meld', 'apply_score', 'award')
+
+
+class Frame:
+    __slots__ = ('path', 'start', 'blocks', 'inner')
+
+    def __init__(self, path, start, blocks):
+        self.path = path  # names of the calls down to this one
+        self.start = start
+        self.blocks = blocks
+        self.inner = 0.0  # time spent in the calls made inside this one
+
+
+class Stats:
+    __slots__ = ('calls', 'total', 'inner', 'blocks')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0  # seconds, including inner calls
+        self.inner = 0.0
+        self.blocks = 0  # allocated blocks still alive at the end of the calls
+
+    @property
+    def own(self):
+        return self.total - self.inner
+
+
+class Profiler:
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stack = []
+        self.stats = {}  # {call path: Stats}
+        self.overhead = 0  # blocks the profiler itself keeps alive during a call
+        self.overhead = self.calibrate()
+
+    def calibrate(self, calls=100):
+        """
+        Blocks counted by timing a call that allocates nothing
+        """
+        for _ in range(calls):
+            self.enter('')
+            self.exit()
+        blocks = self.stats.pop(('',)).blocks
+        return round(blocks / calls)
+
+    def enter(self, name):
+        path = self.stack[-1].path + (name,) if self.stack else (name,)
+        self.stack.append(Frame(path, self.clock(), sys.getallocatedblocks()))
+
+    def exit(self):
+        frame = self.stack.pop()
+        elapsed = self.clock() - frame.start
+        stats = self.stats.get(frame.path)
+        if stats is None:
+            stats = self.stats[frame.path] = Stats()
+        stats.calls += 1
+        stats.total += elapsed
+        stats.inner += frame.inner
+        stats.blocks += sys.getallocatedblocks() - frame.blocks - self.overhead
+        if self.stack:
+            self.stack[-1].inner += elapsed
+
+    def wrap(self, name, fn):
+        """
+        fn, timed under name
+        """
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed(*args, **kwargs):
+                self.enter(name)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.exit()
+        else:
+            @functools.wraps(fn)
+            def timed(*args, **kwargs):
+                self.enter(name)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.exit()
+        return timed
+
+    def attach(self, game, functions=SCORING):
+        """
+        Times the phases of the game and its scoring methods, returns the game
+        """
+        game.phases = [self.wrap(phase.__name__, phase) for phase in game.phases]
+        for name in functions:
+            setattr(game, name, self.wrap(name, getattr(game, name)))
+        return game
+
+    @staticmethod
+    def detach(game, functions=SCORING):
+        game.phases = [getattr(phase, '__wrapped__', phase) for phase in game.phases]
+        for name in functions:
+            game.__dict__.pop(name, None)
+
+    def merge(self, other):
+        for path, theirs in other.stats.items():
+            stats = self.stats.get(path)
+            if stats is None:
+                stats = self.stats[path] = Stats()
+            stats.calls += theirs.calls
+            stats.total += theirs.total
+            stats.inner += theirs.inner
+            stats.blocks += theirs.blocks
+
+    def by_function(self):
+        """
+        {name: Stats} adding up every stack the function was called in.
+        Total time only counts the outermost call when a function calls itself.
+        """
+        functions = {}
+        own = {}
+        for path, stats in self.stats.items():
+            name = path[-1]
+            total = functions.get(name)
+            if total is None:
+                total = functions[name] = Stats()
+                own[name] = 0.0
+            total.calls += stats.calls
+            own[name] += stats.own
+            if name not in path[:-1]:
+                total.total += stats.total
+                total.blocks += stats.blocks
+        for name, total in functions.items():
+            total.inner = total.total - own[name]
+        return functions
+
+    def summary(self):
+        """
+        Table of calls, time and allocated blocks per function, most time first
+        """
+        functions = self.by_function()
+        everything = sum(s.own for s in functions.values()) or 1.0
+        lines = [f"{'function':<14} {'calls':>10} {'total ms':>10} {'own ms':>10} "
+                 f"{'own %':>6} {'us/call':>9} {'blocks':>8}"]
+        for name, s in sorted(functions.items(), key=lambda item: item[1].total, reverse=True):
+            lines.append(f"{name:<14} {s.calls:>10,} {s.total * 1e3:>10.1f} {s.own * 1e3:>10.1f} "
+                         f"{s.own / everything:>6.1%} {s.total / s.calls * 1e6:>9.1f} {s.blocks:>8,}")
+        return '\n'.join(lines)
+
+    def folded(self):
+        """
+        Folded stacks, one line per call stack with the microseconds spent in it
+        """
+        lines = []
+        for path, stats in sorted(self.stats.items()):
+            lines.append(f"{';'.join(path)} {max(round(stats.own * 1e6), 0)}")
+        return '\n'.join(lines) + '\n'
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            f.write(self.folded())
@@ -0,0 +1,278 @@
+"""
+Compact binary game records.
+
+A record file starts with MAGIC and holds one record per game, back to back. Next
+to it, an index file holds the offset of every record as a little endian uint64, so
+the reader can jump straight to record i. Both files are memory-mapped for reading.
+
+A record is:
+    varint seed, byte flags (bit 0: player 2 dealt first, bit 1: player 2 won),
+    varint player 1 score, varint player 2 score, varint number of rounds
+and for each round a fixed 49 byte block of 65 six bit card ids:
+    52 deck order, 4 laid away (player 1 then player 2), 1 top card, 8 played in order
+followed by varint points: play phase player 1, player 2, hand player 1, player 2, crib.
+Cards a round never got to (when the game ends mid round) are NO_CARD.
+
+    python records.py write PATH [games] [--seed S]
+    python records.py stats PATH
+"""
+import mmap
+import os
+import struct
+
+MAGIC = b'CRIB\x01'
+NO_CARD = 63
+
+DECK_CARDS = 52
+CRIB_CARDS = 4
+PLAYED_CARDS = 8
+ROUND_CARDS = DECK_CARDS + CRIB_CARDS + 1 + PLAYED_CARDS
+ROUND_BYTES = (6 * ROUND_CARDS + 7) // 8
+
+OFFSET = struct.Struct('<Q')
+
+
+class RoundRecord:
+
+    def __init__(self, deck=(), crib=(), top_card=None, played=(),
+                 play_points=(0, 0), hand_points=(0, 0), crib_points=0):
+        self.deck = list(deck)  # card ids, in the order they were dealt
+        self.crib = list(crib)  # card ids laid away, player 1's two then player 2's
+        self.top_card = top_card  # card id
+        self.played = list(played)  # card ids in the order they were played
+        self.play_points = tuple(play_points)
+        self.hand_points = tuple(hand_points)
+        self.crib_points = crib_points
+
+
+class GameRecord:
+
+    def __init__(self, seed=0, first_dealer=0, winner=0, scores=(0, 0), rounds=None):
+        self.seed = seed
+        self.first_dealer = first_dealer  # 0 for player 1, 1 for player 2
+        self.winner = winner
+        self.scores = tuple(scores)
+        self.rounds = rounds if rounds is not None else []
+
+    def encode(self):
+        out = bytearray()
+        write_varint(out, self.seed)
+        out.append(self.first_dealer | self.winner << 1)
+        write_varint(out, self.scores[0])
+        write_varint(out, self.scores[1])
+        write_varint(out, len(self.rounds))
+        for r in self.rounds:
+            cards = _fill(r.deck, DECK_CARDS) + _fill(r.crib, CRIB_CARDS) + \
+                _fill([] if r.top_card is None else [r.top_card], 1) + _fill(r.played, PLAYED_CARDS)
+            packed = 0
+            for i, c in enumerate(cards):
+                packed |= c << (6 * i)
+            out += packed.to_bytes(ROUND_BYTES, 'little')
+            for points in (*r.play_points, *r.hand_points, r.crib_points):
+                write_varint(out, points)
+        return bytes(out)
+
+    @staticmethod
+    def decode(buf, pos=0):
+        """
+        Decodes the record at pos of buf, returns the record and the position after it
+        """
+        seed, pos = read_varint(buf, pos)
+        flags = buf[pos]
+        pos += 1
+        score1, pos = read_varint(buf, pos)
+        score2, pos = read_varint(buf, pos)
+        count, pos = read_varint(buf, pos)
+        rounds = []
+        for _ in range(count):
+            packed = int.from_bytes(buf[pos:pos + ROUND_BYTES], 'little')
+            pos += ROUND_BYTES
+            cards = [(packed >> (6 * i)) & 0x3F for i in range(ROUND_CARDS)]
+            points = []
+            for _ in range(5):
+                value, pos = read_varint(buf, pos)
+                points.append(value)
+            top_card = cards[DECK_CARDS + CRIB_CARDS]
+            rounds.append(RoundRecord(
+                _unfill(cards[:DECK_CARDS]),
+                _unfill(cards[DECK_CARDS:DECK_CARDS + CRIB_CARDS]),
+                None if top_card == NO_CARD else top_card,
+                _unfill(cards[DECK_CARDS + CRIB_CARDS + 1:]),
+                points[0:2], points[2:4], points[4]))
+        return GameRecord(seed, flags & 1, flags >> 1 & 1, (score1, score2), rounds), pos
+
+
+def _fill(ids, size):
+    return list(ids) + [NO_CARD] * (size - len(ids))
+
+
+def _unfill(ids):
+    return [c for c in ids if c != NO_CARD]
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(buf, pos):
+    value = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+class GameRecorder:
+    """
+    Builds the GameRecord of a GameState, told the name of each phase once it is played
+    """
+
+    def __init__(self, game, seed=0):
+        self.game = game
+        self.players = [game.player1, game.player2]
+        self.record = GameRecord(seed, self.players.index(game.dealer))
+        self.round = None
+        self.scores_before_play = (0, 0)
+
+    def scores(self):
+        return tuple(p.score for p in self.players)
+
+    def after_phase(self, name):
+        game = self.game
+        if name == 're_shuffle':
+            self.round = RoundRecord(deck=[c.id for c in game.deck])
+            self.record.rounds.append(self.round)
+        elif name == 'make_crib':
+            self.round.crib = [c.id for c in game.crib]
+        elif name == 'cut':
+            self.round.top_card = game.top_card.id
+            self.scores_before_play = self.scores()
+        elif name == 'start':
+            self.end_play()
+        elif name == 'peg':
+            self.round.hand_points = tuple(game.score(p.original_hand, game.top_card)
+                                           for p in self.players)
+            self.round.crib_points = game.score(game.crib, game.top_card)
+
+    def end_play(self):
+        self.round.played = [c.id for c in self.game.played_stack]
+        self.round.play_points = tuple(
+            now - before for now, before in zip(self.scores(), self.scores_before_play))
+
+    def finish(self, winner):
+        """
+        The finished GameRecord, once winner has won the game
+        """
+        if self.round is not None and self.round.top_card is not None and not self.round.played:
+            # the game ended in play phase
+            self.end_play()
+        self.record.winner = self.players.index(winner)
+        self.record.scores = self.scores()
+        return self.record
+
+
+class RecordWriter:
+    """
+    Appends records to a record file and its index
+    """
+
+    def __init__(self, path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.data = open(path, 'ab')
+        self.index = open(path + '.idx', 'ab')
+        if new:
+            self.data.write(MAGIC)
+        self.offset = self.data.tell()
+
+    def append(self, record):
+        buf = record.encode()
+        self.index.write(OFFSET.pack(self.offset))
+        self.data.write(buf)
+        self.offset += len(buf)
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordReader:
+    """
+    Memory-mapped reader, iterating records in order or jumping to record i
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not a game record file.")
+        with open(path + '.idx', 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return len(self.index) // OFFSET.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Record {i} is out of range.")
+        offset, = OFFSET.unpack_from(self.index, i * OFFSET.size)
+        return GameRecord.decode(self.data, offset)[0]
+
+    def __iter__(self):
+        pos = len(MAGIC)
+        end = len(self.data)
+        while pos < end:
+            record, pos = GameRecord.decode(self.data, pos)
+            yield record
+
+    def close(self):
+        self.data.close()
+        if self.index:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from simulator import recorded_games
+    from strategy import GreedyStrategy, RandomStrategy
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command', choices=['write', 'stats'])
+    parser.add_argument('path')
+    parser.add_argument('games', nargs='?', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.command == 'write':
+        with RecordWriter(args.path) as writer:
+            for result in recorded_games([GreedyStrategy, RandomStrategy], args.games, args.seed):
+                writer.append(result.record)
+    else:
+        with RecordReader(args.path) as reader:
+            games = len(reader)
+            rounds = sum(len(r.rounds) for r in reader)
+            size = os.path.getsize(args.path)
+            print(f"{games} games, {rounds} rounds, {size} bytes, "
+                  f"{size / max(games, 1):.1f} bytes per game")
@@ -0,0 +1,135 @@
+"""
+Deterministic replay of a game from its deck orders and action log.
+
+The action log is the card id picked at every decision, in order: the two cards each
+player lays away, the top card cut and every card played. ReplayGame answers its own
+prompts from the log through inputFn, so it runs the exact same rules as GameState.
+
+Replay rebuilds the state before any move, keeping a clone of the game at the first
+phase boundary after every snapshot_every moves, so jumping to a late move only
+replays from the closest snapshot before it.
+"""
+import bisect
+
+from deck import CARDS, DeckArray
+from events import NullSink
+from game_state import GameOver, GameState
+
+SNAPSHOT_EVERY = 16
+
+
+class StopReplay(Exception):
+    """
+    Raised by ReplayGame when it is asked for the move it should stop at
+    """
+
+
+class ReplayGame(GameState):
+    """
+    GameState dealing the recorded decks and playing the recorded actions
+    """
+
+    def __init__(self, decks, actions, first_dealer=0):
+        super().__init__(inputFn=self.next_action, events=NullSink())
+        self.decks = decks  # card ids of the deck, in dealing order, for each round
+        self.actions = actions  # card id picked at each decision
+        self.dealer = self.player2 if first_dealer else self.player1
+        self.rounds = 0
+        self.moves = 0  # actions played so far
+        self.stop_at = None  # the move to stop before
+        self.winner = None
+
+    def re_shuffle(self):
+        self.deck = DeckArray(self.decks[self.rounds])
+        self.rounds += 1
+
+    def next_action(self, options):
+        if self.moves == self.stop_at:
+            raise StopReplay()
+        if self.moves >= len(self.actions):
+            raise ValueError(f"The action log ends after {self.moves} moves.")
+        card = CARDS[self.actions[self.moves]]
+        for idx, c in options:
+            if c is card:
+                self.moves += 1
+                return idx
+        raise ValueError(f"Move {self.moves}: {card} is not one of the options.")
+
+
+class Snapshot:
+
+    def __init__(self, moves, phase, game):
+        self.moves = moves
+        self.phase = phase  # index of the next phase to play
+        self.game = game
+
+
+class Replay:
+
+    def __init__(self, decks, actions, first_dealer=0, snapshot_every=SNAPSHOT_EVERY):
+        self.decks = tuple(tuple(d) for d in decks)
+        self.actions = tuple(actions)
+        self.snapshot_every = snapshot_every
+        self.snapshots = [Snapshot(0, 0, ReplayGame(self.decks, self.actions, first_dealer))]
+
+    @staticmethod
+    def from_record(record, snapshot_every=SNAPSHOT_EVERY):
+        """
+        Replay of a records.GameRecord
+        """
+        decks = []
+        actions = []
+        for r in record.rounds:
+            decks.append(r.deck)
+            actions += r.crib
+            if r.top_card is not None:
+                actions.append(r.top_card)
+            actions += r.played
+        return Replay(decks, actions, record.first_dealer, snapshot_every)
+
+    def __len__(self):
+        return len(self.actions)
+
+    def state_at(self, move):
+        """
+        A new ReplayGame right before the move is made, or at the end of the game
+        when move is past the last action
+        """
+        keys = [s.moves for s in self.snapshots]
+        snapshot = self.snapshots[bisect.bisect_right(keys, move) - 1]
+        game = self.copy(snapshot.game)
+        game.stop_at = move
+        return self.run(game, snapshot.phase)
+
+    def final_state(self):
+        return self.state_at(len(self.actions))
+
+    def copy(self, game):
+        # the decks and actions are shared by every copy
+        return game.clone()
+
+    def run(self, game, phase):
+        """
+        Plays the game from the phase index until it stops or ends
+        """
+        phases = game.phases
+        try:
+            while True:
+                while phase < len(phases):
+                    phases[phase]()
+                    phase += 1
+                    self.snapshot(game, phase)
+                phase = 0
+        except GameOver as over:
+            game.winner = over.player
+        except StopReplay:
+            pass
+        return game
+
+    def snapshot(self, game, phase):
+        if self.snapshot_every is None:
+            return
+        if game.moves >= self.snapshots[-1].moves + self.snapshot_every:
+            snapshot = self.copy(game)
+            snapshot.stop_at = None
+            self.snapshots.append(Snapshot(game.moves, phase % len(game.phases), snapshot))
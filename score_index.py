@@ -0,0 +1,119 @@
+"""
+Precomputed score for every 5 card hand (4 card hand + top card).
+
+The index file holds one byte per hand, 2,598,960 in all, at the position given
+by the combinatorial number system rank of the hand's sorted card ids.
+Opening the index memory-maps the file, so processes reading the same file share
+one copy in the page cache.
+
+Build the index with:
+
+    python score_index.py [path] [--processes N]
+"""
+import argparse
+import mmap
+import os
+from math import comb
+from multiprocessing import Pool
+
+from scoring import CARD_RANK_KEY, CARD_SUIT_KEY, tables
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_scores.bin')
+
+HAND_SIZE = 5
+DECK_SIZE = 52
+INDEX_SIZE = comb(DECK_SIZE, HAND_SIZE)
+
+# _COMB[k][n] == comb(n, k)
+_COMB = [[comb(n, k) for n in range(DECK_SIZE)] for k in range(HAND_SIZE + 1)]
+
+
+def hand_rank(ids):
+    """
+    Combinatorial number system rank of 5 ascending card ids
+    """
+    c0, c1, c2, c3, c4 = ids
+    return _COMB[1][c0] + _COMB[2][c1] + _COMB[3][c2] + _COMB[4][c3] + _COMB[5][c4]
+
+
+def build_block(high):
+    """
+    Scores every hand whose highest card id is high, in rank order.
+    Those hands fill the index from comb(high, 5) up to comb(high + 1, 5).
+    """
+    rank_scores, flush_scores = tables()
+    rank_keys = CARD_RANK_KEY
+    suit_keys = CARD_SUIT_KEY
+    block = bytearray(_COMB[4][high])
+    pos = 0
+    r4, s4 = rank_keys[high], suit_keys[high]
+    for c3 in range(3, high):
+        r3, s3 = r4 + rank_keys[c3], s4 + suit_keys[c3]
+        for c2 in range(2, c3):
+            r2, s2 = r3 + rank_keys[c2], s3 + suit_keys[c2]
+            for c1 in range(1, c2):
+                r1, s1 = r2 + rank_keys[c1], s2 + suit_keys[c1]
+                for c0 in range(c1):
+                    block[pos] = rank_scores[r1 + rank_keys[c0]] + \
+                        flush_scores[s1 + suit_keys[c0]]
+                    pos += 1
+    return high, bytes(block)
+
+
+def build(path=DEFAULT_PATH, processes=None):
+    """
+    Writes the index file, scoring blocks of hands in parallel across processes
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.truncate(INDEX_SIZE)
+        with Pool(processes) as pool:
+            for high, block in pool.imap_unordered(build_block, range(HAND_SIZE - 1, DECK_SIZE)):
+                f.seek(_COMB[5][high])
+                f.write(block)
+    os.replace(tmp_path, path)
+
+
+class ScoreIndex:
+    """
+    Read only, memory-mapped view of the index file
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            self.scores = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.scores) != INDEX_SIZE:
+            size = len(self.scores)
+            self.scores.close()
+            raise ValueError(
+                f"Index {path} has {size} entries. It should have {INDEX_SIZE}.")
+
+    def score(self, hand, top_card):
+        """
+        Score of the hand and top card, the same as GameState.score
+        """
+        return self.scores[hand_rank(sorted(c.id for c in (*hand, top_card)))]
+
+    def score_ids(self, ids):
+        """
+        Score of a hand given as 5 ascending card ids
+        """
+        return self.scores[hand_rank(ids)]
+
+    def close(self):
+        self.scores.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+    build(args.path, args.processes)
+    print(f"Wrote {INDEX_SIZE} hand scores to {args.path}")
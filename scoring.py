@@ -0,0 +1,144 @@
+"""
+Table driven hand scoring.
+
+A hand is encoded as a rank histogram (3 bits per rank) and a suit histogram
+(4 bits per suit). Fifteens, straights and matches only depend on the ranks and
+the flush only depends on the suits, so the score of a hand is two table reads
+instead of running GameState.score_meld over every subset of the hand.
+"""
+from itertools import combinations_with_replacement
+from math import comb
+
+from deck import CARDS, Rank, Suit
+
+RANK_BITS = 3
+SUIT_BITS = 4
+
+RANK_KEY = {rank: 1 << (RANK_BITS * (rank.value - 1)) for rank in Rank}
+SUIT_KEY = {suit: 1 << (SUIT_BITS * i) for i, suit in enumerate(Suit)}
+
+# the same keys indexed by card id
+CARD_RANK_KEY = tuple(RANK_KEY[c.rank] for c in CARDS)
+CARD_SUIT_KEY = tuple(SUIT_KEY[c.suit] for c in CARDS)
+
+# tables() fills the tables for every hand of up to 5 cards
+TABLE_HAND_SIZE = 5
+
+_rank_scores = {}
+_flush_scores = {}
+_built = False
+
+
+def score_hand(hand, top_card=None):
+    """
+    Scores the hand together with the top card.
+    Returns the same total as summing GameState.score_meld over every meld.
+    """
+    ranks = 0
+    suits = 0
+    for c in hand:
+        ranks += CARD_RANK_KEY[c.id]
+        suits += CARD_SUIT_KEY[c.id]
+    if top_card is not None:
+        ranks += CARD_RANK_KEY[top_card.id]
+        suits += CARD_SUIT_KEY[top_card.id]
+    return score_keys(ranks, suits)
+
+
+def tables():
+    """
+    Returns the (rank, flush) tables, keyed by encoded rank and suit histograms
+    """
+    if not _built:
+        build_tables()
+    return _rank_scores, _flush_scores
+
+
+def score_keys(ranks, suits):
+    """
+    Scores an already encoded rank histogram and suit histogram
+    """
+    try:
+        return _rank_scores[ranks] + _flush_scores[suits]
+    except KeyError:
+        # not seen yet, score it directly and remember it, so a single game
+        # does not pay for building the tables
+        if ranks not in _rank_scores:
+            _rank_scores[ranks] = rank_score(rank_counts(ranks))
+        if suits not in _flush_scores:
+            _flush_scores[suits] = flush_score(suit_counts(suits))
+        return _rank_scores[ranks] + _flush_scores[suits]
+
+
+def build_tables():
+    """
+    Fills the rank and flush tables for every hand of up to TABLE_HAND_SIZE cards
+    """
+    global _built
+    for size in range(TABLE_HAND_SIZE + 1):
+        for ranks in combinations_with_replacement(range(13), size):
+            counts = [0] * 13
+            for r in ranks:
+                counts[r] += 1
+            if max(counts) > 4:
+                continue  # only 4 cards of each rank
+            key = sum(c << (RANK_BITS * r) for r, c in enumerate(counts))
+            _rank_scores[key] = rank_score(counts)
+        for suits in combinations_with_replacement(range(4), size):
+            counts = [suits.count(s) for s in range(4)]
+            key = sum(c << (SUIT_BITS * s) for s, c in enumerate(counts))
+            _flush_scores[key] = flush_score(counts)
+    _built = True
+
+
+def rank_counts(key):
+    return [(key >> (RANK_BITS * r)) & 0b111 for r in range(13)]
+
+
+def suit_counts(key):
+    return [(key >> (SUIT_BITS * s)) & 0b1111 for s in range(4)]
+
+
+def rank_score(counts):
+    """
+    Fifteens, straights and matches for a histogram of the 13 ranks
+    """
+    return fifteens(counts) + straights(counts) + matches(counts)
+
+
+def fifteens(counts):
+    # ways[t] is the number of subsets of the cards seen so far adding to t
+    ways = [1] + [0] * 15
+    for r, c in enumerate(counts):
+        if c == 0:
+            continue
+        points = Rank(r + 1).points()
+        for t in range(15, 0, -1):
+            for k in range(1, c + 1):
+                if k * points > t:
+                    break
+                ways[t] += comb(c, k) * ways[t - k * points]
+    return 2 * ways[15]
+
+
+def straights(counts):
+    # every meld of 3 or more consecutive ranks scores its length,
+    # once for each way of picking one card of every rank
+    score = 0
+    for length in range(3, 14):
+        for low in range(14 - length):
+            ways = 1
+            for c in counts[low:low + length]:
+                ways *= c
+            score += length * ways
+    return score
+
+
+def matches(counts):
+    # 2 points for every pair of cards with the same rank
+    return sum(c * (c - 1) for c in counts)
+
+
+def flush_score(counts):
+    # 4 points for every 4 cards of the same suit
+    return sum(4 * comb(c, 4) for c in counts)
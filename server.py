@@ -0,0 +1,261 @@
+"""
+Asyncio game host running many tables in one process.
+
+Players connect over TCP and are seated in pairs in the order they connect.
+The line protocol is:
+
+    server: WELCOME <seat>                        seat 1 or 2 at the table
+    server: PROMPT <seq> <decision> <cards...>    discard, cut or play, and the cards to pick from
+    client: <seq> <index>                         index of the picked card for prompt seq
+    server: END <WIN|LOSE> <score> <opponent score>
+    server: END ABANDONED                         the opponent disconnected
+
+A move not made within the move timeout picks index 0. A reply to any prompt but
+the latest one, such as a reply that came after its timeout, is dropped.
+
+Finished games are appended to a game record file when one is given.
+
+    python server.py serve [--host H] [--port P] [--timeout S] [--record PATH]
+    python server.py loadtest [tables] [--timeout S] [--profile FOLDED_PATH]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+
+from async_game import AsyncGameState
+from events import NullSink
+from profiler import Profiler
+from records import GameRecorder, RecordWriter
+
+MOVE_TIMEOUT = 30.0
+HOST = '127.0.0.1'
+PORT = 7121
+BACKLOG = 1024
+
+# move processing times kept for percentiles
+SAMPLES = 100000
+
+
+class Metrics:
+
+    def __init__(self, samples=SAMPLES):
+        self.started = time.perf_counter()
+        self.moves = 0
+        self.timeouts = 0
+        self.stale = 0  # replies dropped for not answering the latest prompt
+        self.games = 0
+        self.abandoned = 0
+        # seconds from a move arriving to the table being ready for the next move
+        self.processing = deque(maxlen=samples)
+
+    def moves_per_second(self):
+        return self.moves / (time.perf_counter() - self.started)
+
+    def percentile(self, p):
+        if not self.processing:
+            return 0.0
+        times = sorted(self.processing)
+        return times[int(p / 100 * (len(times) - 1))]
+
+    def __str__(self):
+        return (f"{self.games} games, {self.abandoned} abandoned, {self.moves} moves, "
+                f"{self.timeouts} timeouts, {self.stale} stale replies | "
+                f"{self.moves_per_second():,.0f} moves/sec | "
+                f"move processing p50 {self.percentile(50) * 1000:.3f}ms "
+                f"p99 {self.percentile(99) * 1000:.3f}ms")
+
+
+class Seat:
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, line):
+        self.writer.write(line.encode() + b'\n')
+        # waits while the client is slow to read, so the write buffer stays bounded
+        await self.writer.drain()
+
+
+class Table:
+    """
+    One game between two seats. Every prompt of the game becomes a move request
+    to the seat of the player to move.
+    """
+
+    def __init__(self, server, seats):
+        self.server = server
+        self.game = AsyncGameState(inputFn=self.request_move, events=NullSink())
+        if server.records is not None:
+            self.game.recorder = GameRecorder(self.game)
+        # tables interleave, so each keeps its own call stack until the game is over
+        self.profiler = None
+        if server.profiler is not None:
+            self.profiler = Profiler()
+            self.profiler.attach(self.game)
+        self.players = {self.game.player1: seats[0], self.game.player2: seats[1]}
+        self.move_received = None
+        self.sequence = 0  # number of the latest prompt
+
+    async def run(self):
+        metrics = self.server.metrics
+        seats = list(self.players.values())
+        try:
+            for i, seat in enumerate(seats):
+                await seat.send(f"WELCOME {i + 1}")
+            winner = await self.game.play()
+        except ConnectionError:
+            metrics.abandoned += 1
+            for seat in seats:
+                await self.tell(seat, "END ABANDONED")
+        else:
+            metrics.games += 1
+            if self.game.recorder is not None:
+                self.server.records.append(self.game.recorder.record)
+            for player, seat in self.players.items():
+                opponent = self.game.opponent(player)
+                result = 'WIN' if player == winner else 'LOSE'
+                await self.tell(seat, f"END {result} {player.score} {opponent.score}")
+        if self.profiler is not None:
+            self.server.profiler.merge(self.profiler)
+        for seat in seats:
+            seat.writer.close()
+
+    @staticmethod
+    async def tell(seat, line):
+        """
+        Sends the line unless the seat has gone away
+        """
+        if seat.writer.is_closing():
+            return
+        try:
+            await seat.send(line)
+        except ConnectionError:
+            pass
+
+    async def request_move(self, options):
+        metrics = self.server.metrics
+        if self.move_received is not None:
+            metrics.processing.append(time.perf_counter() - self.move_received)
+        seat = self.players[self.game.to_move]
+        self.sequence += 1
+        sequence = str(self.sequence).encode()
+        cards = ' '.join(str(c) for _, c in options)
+        await seat.send(f"PROMPT {self.sequence} {self.game.decision} {cards}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.server.move_timeout
+        while True:
+            try:
+                line = await asyncio.wait_for(seat.reader.readline(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                metrics.timeouts += 1
+                move = '0'
+                break
+            if not line:
+                raise ConnectionError("Player disconnected.")
+            parts = line.split()
+            if len(parts) == 2 and parts[0] == sequence:
+                move = parts[1].decode()
+                break
+            metrics.stale += 1
+        self.move_received = time.perf_counter()
+        metrics.moves += 1
+        return move
+
+
+class GameServer:
+
+    def __init__(self, move_timeout=MOVE_TIMEOUT, records=None, profiler=None):
+        self.move_timeout = move_timeout
+        self.records = records  # a RecordWriter for finished games
+        self.profiler = profiler  # a Profiler adding up every table
+        self.metrics = Metrics()
+        self.waiting = None  # a seat waiting for an opponent
+        self.tables = set()
+        self.server = None
+
+    async def start(self, host=HOST, port=PORT):
+        self.server = await asyncio.start_server(self.connect, host, port, backlog=BACKLOG)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def connect(self, reader, writer):
+        seat = Seat(reader, writer)
+        waiting = self.waiting
+        if waiting is not None and (waiting.writer.is_closing() or waiting.reader.at_eof()):
+            # the waiting client went away before an opponent came, the new seat waits instead
+            waiting.writer.close()
+            waiting = None
+        if waiting is None:
+            self.waiting = seat
+            return
+        first, self.waiting = self.waiting, None
+        table = Table(self, [first, seat])
+        self.tables.add(table)
+        try:
+            await table.run()
+        finally:
+            self.tables.discard(table)
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def random_player(reader, writer, rng):
+    """
+    Loopback client picking random cards until the game ends
+    """
+    async for line in reader:
+        parts = line.decode().split()
+        if parts[0] == 'PROMPT':
+            writer.write(f"{parts[1]} {rng.randrange(len(parts) - 3)}\n".encode())
+        elif parts[0] == 'END':
+            break
+    writer.close()
+
+
+async def loadtest(tables, move_timeout=MOVE_TIMEOUT, seed=0, profiler=None):
+    """
+    Plays tables games between loopback clients and returns the server metrics
+    """
+    rng = random.Random(seed)
+    server = GameServer(move_timeout, profiler=profiler)
+    port = await server.start(HOST, 0)
+    # connect one at a time so the listen backlog never overflows
+    connections = [await asyncio.open_connection(HOST, port) for _ in range(2 * tables)]
+    await asyncio.gather(*(random_player(reader, writer, rng) for reader, writer in connections))
+    await server.close()
+    return server.metrics
+
+
+async def serve(host, port, move_timeout, record_path=None):
+    records = RecordWriter(record_path) if record_path else None
+    server = GameServer(move_timeout, records)
+    await server.start(host, port)
+    try:
+        await server.server.serve_forever()
+    finally:
+        if records is not None:
+            records.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command', choices=['serve', 'loadtest'])
+    parser.add_argument('tables', nargs='?', type=int, default=500)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--timeout', type=float, default=MOVE_TIMEOUT)
+    parser.add_argument('--record', default=None)
+    parser.add_argument('--profile', default=None)
+    args = parser.parse_args()
+    if args.command == 'serve':
+        asyncio.run(serve(args.host, args.port, args.timeout, args.record))
+    else:
+        profiler = Profiler() if args.profile else None
+        print(asyncio.run(loadtest(args.tables, args.timeout, profiler=profiler)))
+        if profiler is not None:
+            print(profiler.summary())
+            profiler.write_folded(args.profile)
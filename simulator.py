@@ -0,0 +1,201 @@
+"""
+Headless simulation of complete games between strategies.
+
+Games are played through GameState with a strategy deciding for each player
+and a NullSink for its events, in chunks spread over a process pool. Each chunk is seeded from the simulation seed
+and its position, so results only depend on the seed and not on the worker count.
+
+    python simulator.py [games] [--processes N] [--seed S] [--profile FOLDED_PATH] [--fast-shuffle]
+
+With --profile the games run in this process under a Profiler, which prints its
+summary and writes folded stacks for a flame graph. With --fast-shuffle the decks are
+shuffled with DeckArray.permute, faster but a different game for the same seed.
+"""
+import random
+import time
+
+from events import NullSink
+from game_state import GameOver, GameState
+from records import GameRecorder
+from strategy import GreedyStrategy, RandomStrategy
+
+# the phases that score points, and how the summary labels them
+SCORING_PHASES = {'start': 'play', 'peg': 'hands'}
+
+CHUNK_SIZE = 500
+
+
+class GameResult:
+
+    def __init__(self, winner, points, rounds, record=None):
+        self.winner = winner  # 0 for player 1, 1 for player 2
+        self.points = points  # {phase: [player 1 points, player 2 points]}
+        self.rounds = rounds
+        self.record = record  # the records.GameRecord, when recorded
+
+
+class SimulationSummary:
+    """
+    Totals over many games, which can be merged together
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.rounds = 0
+        self.points = {phase: [0, 0] for phase in SCORING_PHASES}
+
+    def add(self, result):
+        self.games += 1
+        self.wins[result.winner] += 1
+        self.rounds += result.rounds
+        for phase, points in result.points.items():
+            self.points[phase][0] += points[0]
+            self.points[phase][1] += points[1]
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.rounds += other.rounds
+        for phase, points in other.points.items():
+            self.points[phase] = [a + b for a, b in zip(self.points[phase], points)]
+
+    def win_rate(self, player):
+        return self.wins[player] / self.games if self.games else 0.0
+
+    def average_points(self, phase, player):
+        """
+        Average points per game the player scored in the phase
+        """
+        return self.points[phase][player] / self.games if self.games else 0.0
+
+    def average_rounds(self):
+        return self.rounds / self.games if self.games else 0.0
+
+    def __str__(self):
+        lines = [f"{self.games} games, {self.average_rounds():.2f} rounds per game"]
+        for player in range(2):
+            phases = ', '.join(
+                f"{label} {self.average_points(phase, player):.2f}" for phase, label in SCORING_PHASES.items())
+            lines.append(
+                f"Player {player + 1}: wins {self.win_rate(player):.1%} | points per game: {phases}")
+        return '\n'.join(lines)
+
+
+def play_game(strategies, rng, dealer=0, record=False, seed=0, profiler=None, cut_rng=None,
+              fast_shuffle=False):
+    """
+    Plays one game to the end, player 1 and player 2 using the given strategies
+    and rng shuffling the deck, with DeckArray.permute when fast_shuffle is set.
+    A cut_rng cuts the deck instead of the strategies.
+    With record, the result holds the GameRecord of the game, tagged with seed.
+    A profiler times the phases and scoring of the game.
+    """
+    game = GameState(inputFn=None, events=NullSink(), rng=rng, strategies=strategies)
+    game.cut_rng = cut_rng
+    game.fast_shuffle = fast_shuffle
+    if profiler is not None:
+        profiler.attach(game)
+    players = [game.player1, game.player2]
+    game.dealer = players[dealer]
+    recorder = GameRecorder(game, seed) if record else None
+    points = {phase: [0, 0] for phase in SCORING_PHASES}
+    rounds = 0
+    try:
+        while True:
+            rounds += 1
+            for phase in game.phases:
+                before = [p.score for p in players]
+                try:
+                    phase()
+                finally:
+                    if phase.__name__ in points:
+                        for i, p in enumerate(players):
+                            points[phase.__name__][i] += p.score - before[i]
+                if recorder is not None:
+                    recorder.after_phase(phase.__name__)
+    except GameOver as over:
+        record = recorder.finish(over.player) if recorder is not None else None
+        return GameResult(players.index(over.player), points, rounds, record)
+
+
+def play_seeded(strategy_classes, seed, dealer=0, record=False, cut_rng=None):
+    """
+    Plays one game where the deck and every strategy's rng come from seed,
+    so the seed kept in its GameRecord plays the same game again
+    """
+    strategies = [cls(random.Random(seed + 1 + i)) for i, cls in enumerate(strategy_classes)]
+    return play_game(strategies, random.Random(seed), dealer, record, seed, cut_rng=cut_rng)
+
+
+def recorded_games(strategy_classes, games, seed=0):
+    """
+    The GameResults of recorded games with seeds drawn from seed, players taking turns dealing first
+    """
+    seeds = random.Random(seed)
+    return [play_seeded(strategy_classes, seeds.getrandbits(32), i % 2, record=True)
+            for i in range(games)]
+
+
+def simulate_chunk(strategy_classes, games, seed, fast_shuffle=False, profiler=None):
+    """
+    Plays a chunk of games with every random choice seeded from seed.
+    Strategy classes are created with their own random.Random.
+    """
+    rng = random.Random(seed)
+    strategies = [cls(random.Random(rng.getrandbits(64))) for cls in strategy_classes]
+    summary = SimulationSummary()
+    for i in range(games):
+        # players take turns dealing first
+        summary.add(play_game(strategies, rng, dealer=i % 2, profiler=profiler,
+                              fast_shuffle=fast_shuffle))
+    return summary
+
+
+def simulate(strategy_classes, games, seed=0, processes=None, chunk_size=CHUNK_SIZE,
+             profiler=None, fast_shuffle=False):
+    """
+    Plays games between the two strategy classes over a process pool
+    and returns one SimulationSummary. Games run in this process with a profiler.
+    With fast_shuffle, decks are shuffled with DeckArray.permute.
+    """
+    seeds = random.Random(seed)
+    chunks = []
+    for start in range(0, games, chunk_size):
+        chunks.append((strategy_classes, min(chunk_size, games - start), seeds.getrandbits(64),
+                       fast_shuffle))
+    summary = SimulationSummary()
+    if processes == 1 or profiler is not None:
+        for chunk in chunks:
+            summary.merge(simulate_chunk(*chunk, profiler))
+        return summary
+    # imported here so importing the simulator stays quick for callers that play in process
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(processes) as pool:
+        for chunk_summary in pool.map(simulate_chunk, *zip(*chunks)):
+            summary.merge(chunk_summary)
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from profiler import Profiler
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('games', nargs='?', type=int, default=10000)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--fast-shuffle', action='store_true')
+    args = parser.parse_args()
+    profiler = Profiler() if args.profile else None
+    start = time.perf_counter()
+    summary = simulate([GreedyStrategy, RandomStrategy], args.games, args.seed, args.processes,
+                       profiler=profiler, fast_shuffle=args.fast_shuffle)
+    elapsed = time.perf_counter() - start
+    print(summary)
+    if profiler is not None:
+        print(profiler.summary())
+        profiler.write_folded(args.profile)
+    print(f"{args.games / elapsed * 60:,.0f} games per minute")
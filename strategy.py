@@ -0,0 +1,127 @@
+"""
+Strategies decide for a player instead of prompting through GameState.input.
+
+A strategy has these methods, which GameState(strategies=...) calls:
+    choose_discard(hand, is_dealer) returns the two cards of the hand to lay away
+    choose_play(playable, count, played, hand, top_card, opponent_passed) returns the card to
+    play from the playable cards, played is every card played this round, hand is the player's
+    whole hand, top_card the cut card and opponent_passed whether the opponent said GO on
+    this count
+    choose_cut(cards) returns the index to cut a deck of that many cards at
+
+and batched versions taking the arguments of many games' decisions at once, which
+lockstep.py calls so vectorized or model-based strategies can decide in bulk:
+    choose_discards([(hand, is_dealer), ...]) returns the discards in the same order
+    choose_plays([(playable, count, played, hand, top_card, opponent_passed), ...]) returns
+    the cards to play
+"""
+import random
+from itertools import combinations
+
+from deck import CARDS
+from scoring import score_hand
+
+
+class Strategy:
+    """
+    Base of the strategies. The batched methods decide one game at a time
+    unless a strategy overrides them, and the deck is cut at random.
+    """
+    # bumped whenever a strategy decides differently, so cached tournament results are replayed
+    version = 1
+
+    def __init__(self, rng=random):
+        self.rng = rng
+
+    def choose_discard(self, hand, is_dealer):
+        raise NotImplementedError
+
+    def choose_play(self, playable, count, played, hand, top_card, opponent_passed):
+        raise NotImplementedError
+
+    def choose_cut(self, cards):
+        return self.rng.randrange(cards)
+
+    def choose_discards(self, decisions):
+        return [self.choose_discard(*decision) for decision in decisions]
+
+    def choose_plays(self, decisions):
+        return [self.choose_play(*decision) for decision in decisions]
+
+
+class RandomStrategy(Strategy):
+    """
+    Lays away and plays random cards
+    """
+
+    def choose_discard(self, hand, is_dealer):
+        return self.rng.sample(hand, 2)
+
+    def choose_play(self, playable, count, played, hand, top_card, opponent_passed):
+        return self.rng.choice(playable)
+
+
+class GreedyStrategy(RandomStrategy):
+    """
+    Keeps the four cards that score the most on their own,
+    and plays for 15, 31 or a pair when it can
+    """
+
+    def choose_discard(self, hand, is_dealer):
+        keep = max(combinations(hand, 4), key=score_hand)
+        return [c for c in hand if c not in keep]
+
+    def choose_play(self, playable, count, played, hand, top_card, opponent_passed):
+        for c in playable:
+            if count + c.points in (15, 31):
+                return c
+        if played:
+            for c in playable:
+                if c.rank == played[-1].rank:
+                    return c
+        return max(playable, key=lambda c: c.points)
+
+
+class SolverStrategy(GreedyStrategy):
+    """
+    Lays away the cards discard_solver ranks best, and plays like GreedyStrategy
+    """
+
+    def choose_discard(self, hand, is_dealer):
+        # the solver and its tables load with the first strategy that uses them
+        from discard_solver import best_discard
+        return best_discard(hand, is_dealer)
+
+
+class SearchStrategy(SolverStrategy):
+    """
+    Lays away like SolverStrategy and plays the card PeggingSearch finds best,
+    sampling the opponent's hidden cards
+    """
+    version = 2
+
+    def __init__(self, rng=random, max_nodes=5000, samples=16):
+        super().__init__(rng)
+        from pegging_search import PeggingSearch
+        self.search = PeggingSearch(max_nodes=max_nodes, samples=samples, rng=rng)
+
+    def choose_play(self, playable, count, played, hand, top_card, opponent_passed):
+        # the current count is the last cards played that add up to it
+        window = []
+        total = 0
+        for c in reversed(played):
+            if total == count:
+                break
+            total += c.points
+            window.append(c)
+        from pegging import PeggingScorer
+        pegging = PeggingScorer()
+        for c in reversed(window):
+            pegging.play(c)
+        unseen = [c for c in CARDS if c not in hand and c not in played and c is not top_card]
+        opponent_cards = 4 - (len(played) - (4 - len(hand)))
+        if opponent_cards == 0:
+            return max(playable, key=lambda c: c.points)
+        card, _ = self.search.best_play(hand, pegging, unseen=unseen, opponent_cards=opponent_cards,
+                                        opponent_passed=opponent_passed)
+        return card
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from math import comb
+from unittest.mock import patch
+
+import analytics
+from analytics import CATEGORIES, Histograms, deals_chunk, hands_chunk, report, run
+from canonical import first_masks
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'checkpoint.json')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_hands_chunk_counts_every_keep_and_top_card(self):
+        # Given the hands whose highest card is the 11th card
+        stats = hands_chunk(10)
+        # Then every 5 card hand is counted once per top card
+        self.assertEqual(stats.total('score'), 5 * comb(10, 4))
+        # And the categories add up to the scores
+        categories = sum(stats.mean(name) for name in CATEGORIES)
+        self.assertAlmostEqual(categories, stats.mean('score'))
+
+    def test_deals_chunk_counts_every_deal(self):
+        # Given the class of deals of ace to six of one suit
+        start = first_masks(6).index(0b111111)
+        with patch.object(analytics, 'MASKS_PER_CHUNK', 1):
+            stats = deals_chunk(start)
+        # Then it counts once for each of the 4 suits
+        self.assertEqual(stats.total('dealer_ev'), 4)
+        self.assertEqual(stats.total('pone_ev'), 4)
+        self.assertEqual(stats.total('same_discard'), 4)
+
+    def test_checkpoint_resumes(self):
+        # Given a run stopped after 2 chunks
+        first = run('hands', self.path, processes=1, limit=2)
+        # When it is run again with the same checkpoint
+        second = run('hands', self.path, processes=1, limit=1)
+        # Then it carries on with the next chunk, keeping the first 2
+        self.assertEqual(first.total('score'), 5 * (comb(4, 4) + comb(5, 4)))
+        self.assertEqual(second.total('score'), 5 * (comb(4, 4) + comb(5, 4) + comb(6, 4)))
+        # And another job cannot use the checkpoint
+        with self.assertRaises(ValueError):
+            run('deals', self.path, processes=1, limit=1)
+
+    def test_histograms_merge(self):
+        # Given two histograms
+        a, b = Histograms(), Histograms()
+        a.add('score', 2, 3)
+        b.add('score', 2)
+        b.add('score', 4)
+        # When they are merged
+        a.merge(b)
+        # Then the counts add up
+        self.assertEqual(a.to_dict(), {'score': {'2': 4, '4': 1}})
+        self.assertEqual(a.mean('score'), 2.4)
+
+    def test_report_without_results(self):
+        # Given no finished chunks
+        stats = Histograms()
+        # When either job is reported
+        # Then it says there are no results instead of dividing by zero
+        self.assertEqual(report('hands', stats), "No hands results yet")
+        self.assertEqual(report('deals', stats), "No deals results yet")
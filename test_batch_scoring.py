@@ -0,0 +1,34 @@
+import random
+import unittest
+
+from deck import CARDS
+from events import NullSink
+from game_state import GameState
+
+try:
+    import numpy as np
+    from batch_scoring import score_batch
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchScoring(unittest.TestCase):
+
+    def test_score_batch_matches_score_meld(self):
+        # Given a batch of random hands
+        rng = random.Random(5)
+        hands = [rng.sample(range(52), 5) for _ in range(300)]
+        # When the batch is scored
+        scores = score_batch(np.array(hands))
+        # Then every score is the sum of score_meld over the melds of the hand
+        gs = GameState(events=NullSink())
+        for hand, score in zip(hands, scores):
+            melds = GameState.powerset([CARDS[i] for i in hand])
+            self.assertEqual(score, sum(gs.score_meld(m) for m in melds), hand)
+
+    def test_score_batch_rejects_wrong_shape(self):
+        # Given hands with 4 cards
+        # Then scoring them raises an error
+        with self.assertRaises(ValueError):
+            score_batch(np.zeros((3, 4), dtype=int))
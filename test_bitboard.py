@@ -0,0 +1,102 @@
+import random
+import unittest
+from itertools import combinations
+
+import scoring
+from bitboard import (card_count, fifteens, from_bitboard, rank_counts, rank_key, rank_union, score,
+                      score_meld, score_parts, suit_key, to_bitboard)
+from deck import CARDS, Deck
+from events import NullSink
+from game_state import GameState
+from scoring import score_hand
+
+
+def powerset_score(cards):
+    gs = GameState(events=NullSink())
+    return sum(gs.score_meld(meld) for meld in GameState.powerset(cards))
+
+
+class TestBitboard(unittest.TestCase):
+
+    def test_round_trip(self):
+        # Given a hand
+        hand = Deck.all_from_string(["K♣", "A♥", "10♦", "5♠"])
+        # When it is made a bitboard and back
+        board = to_bitboard(hand)
+        # Then it has the same cards, in card id order
+        self.assertEqual(from_bitboard(board), sorted(hand, key=lambda c: c.id))
+        self.assertEqual(card_count(board), 4)
+
+    def test_ranks(self):
+        # Given a hand with two fives
+        board = to_bitboard(Deck.all_from_string(["5♠", "5♥", "6♦", "8♣"]))
+        # Then the union holds each rank once and the counts hold both fives
+        self.assertEqual(rank_union(board), 0b10110000)
+        self.assertEqual(rank_counts(board)[4], 2)
+
+    def test_double_run(self):
+        # Given a double run of three with a pair and a fifteen
+        cards = Deck.all_from_string(["3♠", "4♥", "5♦", "5♣", "K♠"])
+        # Then it scores like the powerset of score_meld
+        self.assertEqual(score(to_bitboard(cards)), powerset_score(cards))
+
+    def test_score_matches_score_hand(self):
+        # Given a lot of random hands and top cards
+        rng = random.Random(3)
+        for _ in range(500):
+            cards = rng.sample(CARDS, 5)
+            # Then the bitboard score and the sum of its parts are the table score
+            board = to_bitboard(cards)
+            self.assertEqual(score(board), score_hand(cards[:4], cards[4]), cards)
+            self.assertEqual(score_parts(board), score(board), cards)
+
+    def test_keys_match_scoring(self):
+        # Given a hand
+        cards = Deck.all_from_string(["5♠", "5♥", "6♦", "J♣", "Q♣"])
+        board = to_bitboard(cards)
+        # Then the rank and suit keys are the histograms scoring.py makes card by card
+        self.assertEqual(rank_key(board), sum(scoring.CARD_RANK_KEY[c.id] for c in cards))
+        self.assertEqual(suit_key(board), sum(scoring.CARD_SUIT_KEY[c.id] for c in cards))
+
+    def test_fifteens(self):
+        # Given two fives and three tens
+        board = to_bitboard(Deck.all_from_string(["5♠", "5♥", "10♦", "J♣", "Q♣"]))
+        # Then each five makes 15 with each ten
+        self.assertEqual(fifteens(board), 2 * 6)
+
+    def test_score_matches_powerset_of_bigger_hands(self):
+        # Given random hands of up to 8 cards
+        rng = random.Random(4)
+        for size in range(2, 9):
+            for _ in range(20):
+                cards = rng.sample(CARDS, size)
+                # Then the bitboard score is the powerset of score_meld
+                self.assertEqual(score(to_bitboard(cards)), powerset_score(cards), cards)
+
+    def test_score_meld_matches_game_state(self):
+        # Given every meld of a lot of random hands
+        gs = GameState(events=NullSink())
+        rng = random.Random(5)
+        for _ in range(100):
+            for meld in GameState.powerset(rng.sample(CARDS, 5)):
+                # Then the bitboard meld score is score_meld
+                self.assertEqual(score_meld(to_bitboard(meld)), gs.score_meld(meld), meld)
+
+    def test_score_meld_four_of_a_suit(self):
+        # Given a run of four hearts
+        meld = Deck.all_from_string(["2♥", "3♥", "4♥", "5♥"])
+        # Then it scores the run and the flush
+        self.assertEqual(score_meld(to_bitboard(meld)), 8)
+
+    def test_score_meld_too_short(self):
+        # Given a single card
+        # Then it is not a meld
+        with self.assertRaises(ValueError):
+            score_meld(to_bitboard(CARDS[:1]))
+
+    def test_every_pair_of_cards(self):
+        # Given every two cards of the deck
+        gs = GameState(events=NullSink())
+        for meld in combinations(CARDS, 2):
+            # Then the bitboard meld score is score_meld
+            self.assertEqual(score_meld(to_bitboard(meld)), gs.score_meld(meld), meld)
@@ -0,0 +1,55 @@
+import unittest
+from itertools import combinations
+from math import comb
+
+from canonical import (canonical_key, canonicalize, classes, count_classes, first_masks, invert,
+                       permute)
+from deck import CARDS, Deck
+from scoring import score_hand
+
+
+class TestCanonical(unittest.TestCase):
+
+    def test_suit_relabelled_hands_are_the_same(self):
+        # Given a hand and the same hand with every suit relabelled
+        hand = Deck.all_from_string(["5♥", "5♠", "J♦", "K♣", "2♥"])
+        relabelled = Deck.all_from_string(["5♦", "5♣", "J♠", "K♥", "2♦"])
+        # When both are canonicalized
+        # Then they give the same canonical hand and key
+        self.assertEqual(canonicalize(hand)[0], canonicalize(relabelled)[0])
+        self.assertEqual(canonical_key(hand), canonical_key(relabelled))
+
+    def test_canonical_hand_scores_the_same(self):
+        # Given a flush and its canonical hand
+        hand = Deck.all_from_string(["3♣", "7♣", "9♣", "Q♣", "K♦"])
+        canonical, _ = canonicalize(hand)
+        # Then they score the same
+        self.assertEqual(score_hand(canonical), score_hand(hand))
+
+    def test_permutation_round_trip(self):
+        # Given a hand and its canonical permutation
+        hand = Deck.all_from_string(["A♣", "4♦", "4♣", "10♠"])
+        canonical, perm = canonicalize(hand)
+        # When the canonical hand is permuted back
+        # Then it is the original hand
+        self.assertCountEqual(permute(canonical, invert(perm)), hand)
+
+    def test_count_classes(self):
+        # Given every 2 and 3 card hand
+        # Then there are 169 and 1755 suit isomorphism classes
+        self.assertEqual(count_classes(2), 169)
+        self.assertEqual(count_classes(3), 1755)
+
+    def test_classes_enumerate_every_hand(self):
+        # Given the classes of 3 card hands, enumerated without looking at any hand
+        found = {}
+        for first in first_masks(3):
+            for masks, hands in classes(3, first):
+                found[masks] = hands
+        # Then they are the classes of every hand, with the number of hands in each
+        expected = {}
+        for hand in combinations(CARDS, 3):
+            key = canonical_key(hand)
+            expected[key] = expected.get(key, 0) + 1
+        self.assertEqual(found, expected)
+        self.assertEqual(sum(found.values()), comb(52, 3))
@@ -1,5 +1,6 @@
+import random
 from unittest import TestCase
-from deck import Card, Rank, Suit
+from deck import Card, Deck, DeckArray, Rank, Suit
 
 class TestCard(TestCase):
 
@@ -27,3 +28,149 @@ class TestCard(TestCase):
         ten_of_spades = "10♠"
         ts = Card.from_string(ten_of_spades)
         self.assertEqual(ts, Card(Suit.SPADES, Rank.TEN))
+
+    def test_cards_are_interned(self):
+        # Given the same card made from a string and from its suit and rank
+        ts = Card.from_string("10♠")
+        # Then both are the same instance, with the id and points of the ten of spades
+        self.assertIs(ts, Card(Suit.SPADES, Rank.TEN))
+        self.assertIs(ts, Card.from_id(ts.id))
+        self.assertEqual(ts.id, 22)
+        self.assertEqual(ts.points, 10)
+
+    def test_cards_are_immutable(self):
+        # Given a card
+        card = Card.from_string("A♥")
+        # When its rank is changed
+        # Then an error is raised
+        with self.assertRaises(AttributeError):
+            card.rank = Rank.TWO
+
+    def test_cards_with_different_rank_are_not_equal(self):
+        # Given two cards of the same suit and different rank
+        # Then they are not equal
+        self.assertNotEqual(Card.from_string("A♥"), Card.from_string("2♥"))
+
+    def test_mask_round_trip(self):
+        # Given a few cards
+        cards = Deck.all_from_string(["A♥", "7♦", "K♣"])
+        # When they are converted to a bitmask and back
+        # Then the same cards come back in id order
+        self.assertEqual(Deck.from_mask(Deck.to_mask(cards)), cards)
+
+    def test_from_string_ascii_suits(self):
+        # Given cards written with ASCII suit letters, upper and lower case, and T for ten
+        # Then they are the same cards as with suit symbols
+        self.assertIs(Card.from_string("QD"), Card.from_string("Q♦"))
+        self.assertIs(Card.from_string("10s"), Card.from_string("10♠"))
+        self.assertIs(Card.from_string("TC"), Card.from_string("10♣"))
+        self.assertIs(Card.from_string("1H"), Card.from_string("A♥"))
+
+    def test_from_string_invalid(self):
+        # Given strings that are not cards
+        # Then they are rejected
+        for s in ["", "Q", "14♦", "QX", "Q♦ "]:
+            with self.assertRaises(ValueError):
+                Card.from_string(s)
+
+    def test_rank_tables(self):
+        # Given every rank
+        # Then face cards count 10 and the rest their value, and the symbols parse back
+        self.assertEqual([r.points() for r in Rank], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10])
+        for r in Rank:
+            self.assertIs(Rank.fromString(str(r)), r)
+        self.assertEqual(str(Rank.QUEEN), "Q")
+
+    def test_from_hand_string(self):
+        # Given a hand string with symbols and one with ASCII letters and commas
+        symbols = Deck.from_hand_string("Q♦ J♣ 4♦  10♣\n")
+        ascii = Deck.from_hand_string("QD,JC, 4D,TC")
+        # Then both parse to the same cards
+        self.assertEqual(symbols, Deck.all_from_string(["Q♦", "J♣", "4♦", "10♣"]))
+        self.assertEqual(ascii, symbols)
+        with self.assertRaises(ValueError):
+            Deck.from_hand_string("QD JX")
+
+    def test_read_hands(self):
+        # Given lines of a log with a blank line
+        lines = ["5H 5S JD KC\n", "\n", "AH 2H 3H 4H\n"]
+        # Then each hand is read
+        self.assertEqual(list(Deck.read_hands(lines)),
+                         [Deck.from_hand_string("5♥ 5♠ J♦ K♣"), Deck.from_hand_string("A♥ 2♥ 3♥ 4♥")])
+
+
+class TestDeckArray(TestCase):
+
+    def test_shuffle_matches_deck_shuffled(self):
+        # Given the same seed
+        random.seed(123)
+        cards = Deck.shuffled()
+        random.seed(123)
+        deck = DeckArray()
+        # When the deck array is shuffled
+        deck.shuffle()
+        # Then its cards are in the same order as Deck.shuffled
+        self.assertEqual(list(deck), cards)
+        # And a seeded rng shuffles it the same every time
+        deck.shuffle(random.Random(1))
+        again = DeckArray()
+        again.shuffle(random.Random(1))
+        self.assertEqual(list(deck), list(again))
+
+    def test_permute_puts_every_card_back_in_a_random_order(self):
+        # Given a deck that was partly dealt
+        deck = DeckArray()
+        deck.deal(20)
+        # When it is permuted with a seeded rng
+        deck.permute(random.Random(1))
+        # Then all 52 cards are back, and the same seed gives the same order
+        self.assertEqual(len(deck), 52)
+        self.assertEqual(sorted(c.id for c in deck), list(range(52)))
+        again = DeckArray()
+        again.permute(random.Random(1))
+        self.assertEqual(list(deck), list(again))
+        # And over many permutations every card comes out on top about as often
+        tops = [0] * 52
+        rng = random.Random(2)
+        for _ in range(5200):
+            deck.permute(rng)
+            tops[deck[0].id] += 1
+        self.assertGreater(min(tops), 50)
+        self.assertLess(max(tops), 160)
+
+    def test_deal_and_cut_move_the_cursor(self):
+        # Given a new deck
+        deck = DeckArray()
+        # When two hands are dealt and the 10th card left is cut
+        first, second = deck.deal(6), deck.deal(6)
+        cut = deck.pop(10)
+        # Then the cards come off the top, the cut card is gone and the rest are left
+        self.assertEqual(first + second, Deck.from_ids(range(12)))
+        self.assertEqual(cut, Deck.from_ids([22])[0])
+        self.assertEqual(len(deck), 39)
+        self.assertNotIn(cut, list(deck))
+        self.assertEqual(sorted(c.id for c in deck), [12] + [i for i in range(13, 52) if i != 22])
+
+    def test_state_restores_a_deal(self):
+        # Given a shuffled deck and its state
+        deck = DeckArray()
+        deck.shuffle(random.Random(2))
+        state = deck.state()
+        hand = deck.deal(6)
+        deck.pop(3)
+        # When the state is restored
+        deck.restore(state)
+        # Then the same cards are dealt again
+        self.assertEqual(deck.deal(6), hand)
+        self.assertEqual(len(deck), 46)
+
+    def test_out_of_range(self):
+        # Given a deck with 2 cards left
+        deck = DeckArray()
+        deck.deal(50)
+        # Then it cannot deal 3 or cut past the end
+        with self.assertRaises(IndexError):
+            deck.deal(3)
+        with self.assertRaises(IndexError):
+            deck.pop(2)
+        self.assertEqual(deck[-1], Deck.from_ids([51])[0])
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from itertools import combinations
+from unittest.mock import patch
+
+import crib_table
+from crib_table import CRIBS_PER_KEY, build, crib_keys, crib_total, key_cards, load, verify
+from deck import CARDS
+from discard_solver import crib_key
+from scoring import score_hand
+
+
+def fake_total(key):
+    low, high, suited = key
+    return low * 1000 + high * 10 + suited
+
+
+class TestCribTable(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'crib.bin')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_keys_cover_every_pair(self):
+        # Given every pair of cards
+        keys = {crib_key(a, b) for a, b in combinations(range(52), 2)}
+        # Then the table has exactly their keys, and each key's cards have that key
+        self.assertEqual(sorted(keys), sorted(crib_keys()))
+        self.assertEqual(len(crib_keys()), 169)
+        for key in crib_keys():
+            self.assertEqual(crib_key(*key_cards(key)), key)
+
+    def test_crib_total_enumerates_every_crib(self):
+        # Given a pair of fives laid away
+        key = (4, 4, False)
+        a, b = key_cards(key)
+        rest = [c for c in CARDS if c.id not in (a, b)]
+        # When every opponent lay away and top card is scored
+        expected = 0
+        for x, y in combinations(rest, 2):
+            for t in rest:
+                if t is not x and t is not y:
+                    expected += score_hand([CARDS[a], CARDS[b], x, y], t)
+        # Then the total is the same
+        self.assertEqual(crib_total(key), expected)
+
+    def test_build_load_and_verify(self):
+        # Given a table built with made up totals
+        with patch.object(crib_table, 'crib_total', fake_total):
+            build(self.path, processes=1)
+            # When it is loaded
+            averages = load(self.path)
+            # Then each key has its average and the table verifies
+            self.assertEqual(averages[(2, 5, True)], fake_total((2, 5, True)) / CRIBS_PER_KEY)
+            self.assertEqual(verify(self.path, processes=1), [])
+            self.assertEqual(verify(self.path, keys=5, processes=1), [])
+        # And a recompute that differs is reported
+        with patch.object(crib_table, 'crib_total', lambda key: fake_total(key) + (key == (0, 0, False))):
+            self.assertEqual(verify(self.path, processes=1), [(0, 0, False)])
+
+    def test_load_rejects_bad_files(self):
+        # Given a truncated table
+        with open(self.path, 'wb') as f:
+            f.write(b'CRIB-EV\x01')
+        # Then it is not loaded
+        with self.assertRaises(ValueError):
+            load(self.path)
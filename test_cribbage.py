@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import unittest
+
+import cribbage
+
+
+def run(code):
+    """
+    Runs code in a fresh interpreter and returns what it prints
+    """
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return out.stdout.split()
+
+
+class TestCribbage(unittest.TestCase):
+
+    def test_every_export_resolves(self):
+        # Given every name the module exports
+        for name in cribbage.__all__:
+            # When it is looked up
+            # Then it comes from the module named for it
+            self.assertIs(getattr(cribbage, name),
+                          getattr(__import__(cribbage.EXPORTS[name]), name))
+
+    def test_unknown_name(self):
+        # Given a name the module does not export
+        # When it is looked up
+        # Then it is an AttributeError, like any other module
+        with self.assertRaises(AttributeError):
+            cribbage.NotAName
+
+    def test_import_loads_no_game_modules(self):
+        # Given a fresh interpreter
+        # When cribbage is imported
+        loaded = run("import sys, cribbage; print(*sorted(set(cribbage.EXPORTS.values()) & set(sys.modules)))")
+        # Then none of the modules it exports from are loaded yet
+        self.assertEqual(loaded, [])
+
+    def test_game_state_is_light(self):
+        # Given a fresh interpreter
+        # When a GameState is built through cribbage
+        loaded = run("import sys, cribbage; cribbage.GameState(inputFn=None); "
+                     "print(*[m for m in ['discard_solver', 'crib_table', 'numpy', 'multiprocessing', "
+                     "'argparse'] if m in sys.modules])")
+        # Then the solvers, pools and command line parsing are not loaded
+        self.assertEqual(loaded, [])
+
+    def test_strategies_do_not_load_the_solvers(self):
+        # Given a fresh interpreter
+        # When the strategies are looked up through cribbage
+        loaded = run("import sys, cribbage; cribbage.Strategy; cribbage.SearchStrategy; "
+                     "print(*[m for m in ['discard_solver', 'pegging_search', 'pegging'] if m in sys.modules])")
+        # Then the solver and search modules are not loaded until a strategy uses them
+        self.assertEqual(loaded, [])
+
+    def test_game_state_does_not_shuffle_until_played(self):
+        # Given the state of the random module
+        import random
+        state = random.getstate()
+        # When a game is built
+        cribbage.GameState(inputFn=None)
+        # Then nothing has been drawn from it
+        self.assertEqual(random.getstate(), state)
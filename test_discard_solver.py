@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import crib_table
+import discard_solver
+from crib_table import CRIBS_PER_KEY
+from deck import CARDS, Deck
+from discard_solver import crib_average, crib_key, load_crib_averages, solve
+from scoring import score_hand
+
+
+def fake_total(key):
+    low, high, suited = key
+    return low * 1000 + high * 10 + suited
+
+
+class TestDiscardSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.hand = Deck.all_from_string(["5♥", "5♠", "J♦", "K♣", "2♥", "9♠"])
+
+    def test_solve_ranks_every_discard(self):
+        # Given a 6 card hand
+        # When it is solved
+        discards = solve(self.hand, True)
+        # Then all 15 discards are ranked best first
+        self.assertEqual(len(discards), 15)
+        evs = [d.ev for d in discards]
+        self.assertEqual(evs, sorted(evs, reverse=True))
+        for d in discards:
+            self.assertCountEqual(d.discard + d.keep, self.hand)
+
+    def test_hand_ev_averages_every_top_card(self):
+        # Given the best discard of a hand
+        best = solve(self.hand, False)[0]
+        # Then its hand ev is the average score over the 46 other cards
+        top_cards = [c for c in CARDS if c not in self.hand]
+        expected = sum(score_hand(best.keep, t) for t in top_cards) / 46
+        self.assertAlmostEqual(best.hand_ev, expected)
+
+    def test_crib_counts_for_dealer_and_against_pone(self):
+        # Given the same hand for the dealer and the pone
+        dealer = {tuple(d.discard): d for d in solve(self.hand, True)}
+        pone = {tuple(d.discard): d for d in solve(self.hand, False)}
+        # Then the crib is added for the dealer and taken away for the pone
+        for discard, d in dealer.items():
+            self.assertAlmostEqual(d.ev, d.hand_ev + d.crib_ev)
+            self.assertAlmostEqual(pone[discard].ev, d.hand_ev - d.crib_ev)
+
+    def test_suits_do_not_change_the_solution(self):
+        # Given the same hand with hearts and spades swapped
+        swapped = Deck.all_from_string(["5♠", "5♥", "J♦", "K♣", "2♠", "9♥"])
+        # When both are solved
+        # Then the expected values are the same
+        self.assertEqual([d.ev for d in solve(self.hand, True)],
+                         [d.ev for d in solve(swapped, True)])
+
+
+class TestCribAverages(unittest.TestCase):
+
+    def setUp(self):
+        self.hand = Deck.all_from_string(["5♥", "5♠", "J♦", "K♣", "2♥", "9♠"])
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'crib.bin')
+        solve(self.hand, True)
+        self.averages = dict(discard_solver._crib_averages)
+
+    def tearDown(self):
+        discard_solver._crib_averages.clear()
+        discard_solver._crib_averages.update(self.averages)
+        discard_solver._solve_canonical.cache_clear()
+        self.dir.cleanup()
+
+    def test_missing_table_is_computed_exactly(self):
+        # Given no crib table file
+        with patch.object(crib_table, 'crib_total', fake_total):
+            # When the crib averages are loaded
+            load_crib_averages(self.path)
+        # Then every key has the exact average of the crib table, not an estimate
+        self.assertEqual(len(discard_solver._crib_averages), 169)
+        self.assertEqual(crib_average(2, 18), fake_total(crib_key(2, 18)) / CRIBS_PER_KEY)
+
+    def test_new_table_drops_cached_solutions(self):
+        # Given a hand solved with the crib averages in use
+        before = solve(self.hand, True)[0]
+        # When a different crib table is loaded
+        with patch.object(crib_table, 'crib_total', fake_total):
+            crib_table.build(self.path, processes=1)
+        load_crib_averages(self.path)
+        # Then the hand is solved again with the new averages
+        after = {tuple(d.discard): d for d in solve(self.hand, True)}[tuple(before.discard)]
+        self.assertEqual(after.crib_ev, crib_average(*(c.id for c in before.discard)))
+        self.assertNotEqual(after.crib_ev, before.crib_ev)
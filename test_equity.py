@@ -0,0 +1,88 @@
+import random
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+import equity
+from deck import Deck
+from equity import (EquityEstimator, RolloutGame, rollout, solve_table, table_equity,
+                    win_probability, wilson)
+from game_state import WINNING_SCORE
+from strategy import RandomStrategy
+
+
+class TestEquity(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(123)
+
+    def test_wilson_interval(self):
+        # Given an even win rate over more and more games
+        wide = wilson(5, 10)
+        narrow = wilson(500, 1000)
+        # Then the interval holds the win rate and narrows
+        self.assertLess(wide[0], narrow[0])
+        self.assertLess(narrow[0], 0.5)
+        self.assertGreater(narrow[1], 0.5)
+        self.assertLess(narrow[1], wide[1])
+        self.assertEqual(wilson(0, 0), (0.0, 1.0))
+
+    def test_rollout_deals_known_hand(self):
+        # Given player 1's known hand
+        hand = Deck.all_from_string(["5♦", "5♣", "J♠", "Q♥", "2♣", "9♦"])
+        game = RolloutGame(hand)
+        # When the first round is dealt
+        game.re_shuffle()
+        game.deal()
+        # Then player 1 holds it, and the next round is dealt at random
+        self.assertEqual(game.player1.hand, hand)
+        self.assertEqual(len(set(game.deck) & set(hand)), 0)
+        self.assertIsNone(game.known_hand)
+
+    def test_rollout_near_the_end(self):
+        # Given player 1 needs a point and player 2 needs many, player 2 dealing
+        rng = random.Random(1)
+        strategies = [RandomStrategy(rng), RandomStrategy(rng)]
+        # When the games are rolled out
+        winners = [rollout(strategies, rng, 120, 0, dealer=1) for _ in range(20)]
+        # Then player 1 wins them all
+        self.assertEqual(winners, [0] * 20)
+
+    def test_estimate_stops_at_tolerance(self):
+        # Given an estimator running in this process
+        with EquityEstimator([RandomStrategy, RandomStrategy], processes=1,
+                             tolerance=0.1, batch_size=20) as estimator:
+            # When it estimates a close position
+            equity = estimator.estimate(100, 100, dealer=0)
+        # Then it stops once the interval is within the tolerance
+        self.assertLessEqual((equity.high - equity.low) / 2, 0.1)
+        self.assertLess(equity.games, 200)
+        self.assertTrue(equity.low <= equity.win_rate <= equity.high)
+
+    def test_win_probability_keeps_its_estimator(self):
+        # Given no estimator yet, and estimators that count how often they are made
+        made = []
+
+        def make_estimator():
+            made.append(EquityEstimator([RandomStrategy, RandomStrategy], processes=1,
+                                        tolerance=0.2, batch_size=20))
+            return made[-1]
+        hand = Deck.all_from_string(["5♥", "5♠", "J♦", "K♣", "2♥", "9♠"])
+        with patch.object(equity, '_estimator', None), patch.object(equity, 'EquityEstimator', make_estimator):
+            # When positions with known cards are rolled out without an estimator
+            win_probability(100, 100, hand=hand)
+            win_probability(110, 90, hand=hand)
+        # Then one estimator was made and used for both
+        self.assertEqual(len(made), 1)
+
+    def test_solve_table_with_fixed_rounds(self):
+        # Given rounds where only the dealer scores, 1 point in the play phase
+        table = solve_table(Counter({(0, 1): 1}), Counter({(0, 0): 1}))
+        n = WINNING_SCORE
+        # Then the pone 1 short wins, as they deal next round
+        self.assertEqual(table[120 * n + 0], 1.0)
+        # And the pone against a dealer 1 short loses
+        self.assertEqual(table[0 * n + 120], 0.0)
+        # And lookups see it from player 1's side
+        self.assertEqual(table_equity(120, 0, dealer=1, table=[round(e * 65535) for e in table]), 1.0)
+        self.assertEqual(table_equity(121, 50, dealer=0, table=[0] * (n * n)), 1.0)
@@ -0,0 +1,77 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from deck import Card
+from events import BufferedFileSink, ListSink, NullSink, ScoreEvent, TurnEvent
+from game_state import GameState
+
+
+class TestEvents(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(123)
+
+    def test_null_sink_builds_no_events(self):
+        # Given a game state with a null sink that fails if anything is emitted
+        sink = NullSink()
+        sink.emit = MagicMock(side_effect=AssertionError)
+        gs = GameState(inputFn=MagicMock(return_value=0), events=sink)
+        gs.deal()
+        # When a round is played up to counting the hands
+        gs.make_crib()
+        gs.cut()
+        gs.start()
+        gs.peg()
+        # Then nothing was emitted
+        sink.emit.assert_not_called()
+
+    def test_play_phase_events(self):
+        # Given a game state listening to events
+        sink = ListSink()
+        gs = GameState(events=sink)
+        # When a ten and a five are played
+        gs.apply_score(Card.from_string("10♦"), gs.player1)
+        gs.apply_score(Card.from_string("5♣"), gs.player2)
+        # Then both turns are reported and the 15 is scored for player 2
+        turns = [e for e in sink.events if isinstance(e, TurnEvent)]
+        self.assertEqual([e.count for e in turns], [10, 15])
+        scores = [e for e in sink.events if isinstance(e, ScoreEvent)]
+        self.assertEqual(len(scores), 1)
+        self.assertEqual((scores[0].kind, scores[0].points, scores[0].player),
+                         ('fifteen_or_31', 2, gs.player2))
+
+    def test_buffered_file_sink_writes_batches(self):
+        # Given a file sink writing batches of 2 events
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'events.jsonl')
+            sink = BufferedFileSink(path, batch_size=2)
+            gs = GameState(events=sink)
+            # When one event is emitted, nothing is written yet
+            gs.message("one")
+            sink.file.flush()
+            self.assertEqual(os.path.getsize(path), 0)
+            # and when the sink is closed, everything is written as JSON lines
+            gs.message("two")
+            gs.message("three")
+            sink.close()
+            with open(path, encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([line['text'] for line in lines], ["one", "two", "three"])
+
+    def test_turn_without_a_player_is_written(self):
+        # Given a file sink writing every event
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'events.jsonl')
+            sink = BufferedFileSink(path, batch_size=1)
+            gs = GameState(events=sink)
+            # When a card is scored without a player
+            gs.apply_score(Card.from_string('5♣'))
+            sink.close()
+            # Then its turn is written with no player
+            with open(path, encoding='utf-8') as f:
+                turns = [e for e in map(json.loads, f) if e['event'] == 'turn']
+            self.assertEqual(turns, [{'event': 'turn', 'player': None, 'card': '5♣', 'count': 5}])
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from records import (ROUND_BYTES, GameRecord, RecordReader, RecordWriter, RoundRecord,
+                     read_varint, write_varint)
+from simulator import play_seeded, recorded_games
+from strategy import GreedyStrategy, RandomStrategy
+
+STRATEGIES = [GreedyStrategy, RandomStrategy]
+
+
+class TestGameRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'games.crib')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_varint_round_trip(self):
+        # Given numbers around the 7 bit boundaries
+        for value in [0, 1, 127, 128, 300, 16383, 16384, 2 ** 40]:
+            out = bytearray()
+            # When the number is written and read back
+            write_varint(out, value)
+            # Then it reads back the same
+            self.assertEqual(read_varint(out, 0), (value, len(out)))
+        self.assertEqual(len(out), 6)
+
+    def test_round_is_fixed_size(self):
+        # Given a round that ended early and a full round
+        short = GameRecord(rounds=[RoundRecord(deck=range(52))]).encode()
+        full = GameRecord(rounds=[RoundRecord(range(52), [0, 1, 2, 3], 4, range(5, 13))]).encode()
+        # Then the cards take the same 49 bytes
+        self.assertEqual(ROUND_BYTES, 49)
+        self.assertEqual(len(short), len(full))
+
+    def test_recorded_game_matches_result(self):
+        # Given a recorded game
+        result = recorded_games(STRATEGIES, 1)[0]
+        record = result.record
+        # Then the record agrees with the result of the game
+        self.assertEqual(record.winner, result.winner)
+        self.assertEqual(len(record.rounds), result.rounds)
+        self.assertEqual(max(record.scores), record.scores[record.winner])
+        self.assertGreaterEqual(record.scores[record.winner], 121)
+        self.assertEqual(sum(sum(r.play_points) for r in record.rounds), sum(result.points['start']))
+        # And every finished round holds a whole deck, the crib and the 8 cards played
+        for r in record.rounds[:-1]:
+            self.assertEqual(sorted(r.deck), list(range(52)))
+            self.assertEqual(len(r.crib), 4)
+            self.assertEqual(len(r.played), 8)
+            self.assertEqual(set(r.crib) | set(r.played) | {r.top_card}, set(r.deck[:12]) | {r.top_card})
+
+    def test_seed_replays_the_game(self):
+        # Given recorded games, each tagged with its seed
+        for record in [r.record for r in recorded_games(STRATEGIES, 3, seed=9)]:
+            # When a game is played again from the stored seed and first dealer
+            again = play_seeded(STRATEGIES, record.seed, record.first_dealer, record=True).record
+            # Then it is the same game
+            self.assertEqual(again.encode(), record.encode())
+
+    def test_write_and_read_back(self):
+        # Given games appended over two writers
+        games = [r.record for r in recorded_games(STRATEGIES, 5)]
+        with RecordWriter(self.path) as writer:
+            for record in games[:3]:
+                writer.append(record)
+        with RecordWriter(self.path) as writer:
+            for record in games[3:]:
+                writer.append(record)
+        # When they are read back
+        with RecordReader(self.path) as reader:
+            # Then iterating and indexing give the same records
+            self.assertEqual(len(reader), 5)
+            read = list(reader)
+            self.assertEqual([r.encode() for r in read], [r.encode() for r in games])
+            self.assertEqual(reader[3].encode(), games[3].encode())
+            self.assertEqual(reader[-1].seed, games[4].seed)
+            with self.assertRaises(IndexError):
+                reader[5]
+
+    def test_reader_rejects_other_files(self):
+        # Given a file that is not a record file
+        with open(self.path, 'wb') as f:
+            f.write(b'{"json": true}')
+        # Then the reader refuses it
+        with self.assertRaises(ValueError):
+            RecordReader(self.path)
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 from game_state import GameState
 import random
 from deck import Card, Rank, Suit, Deck
+from strategy import GreedyStrategy, RandomStrategy
 
 
 class TestGameState(unittest.TestCase):
@@ -94,116 +95,54 @@ class TestGameState(unittest.TestCase):
         expected = []
         self.assertEqual(filtered, expected)
 
-    def test_check_straight_adds_single_card(self):
-        # Given an empty straight list
+    def test_apply_score_adds_to_the_count(self):
+        # Given a count of 10
         gs = GameState()
-        self.assertEqual(gs.straight, [])
-        # When the player plays a new card and the straight is checked
-        played_card = Card.from_string("Q♦")
-        score = gs.check_straight(played_card)
-        # Then no score is returned and that card is in the straight list
-        expected_score = 0
-        expected_straight_list = [played_card]
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.straight, expected_straight_list)
-
-    def test_check_straight_adds_rising_pair(self):
-        # Given a straight list with a card
-        gs = GameState()
-        gs.straight = [Card.from_string("Q♦")]
-        # When the player plays a new card that is one rank below the existing card, with a different suit (suit doesn't matter)
-        played_card = Card.from_string("J♣")
-        score = gs.check_straight(played_card)
-        # Then no score is returned, and both cards are still in the straight list, sorted in ascending order
-        expected_score = 0
-        expected_straight_list = [played_card, Card.from_string("Q♦")]
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.straight, expected_straight_list)
-
-    def test_check_straight_adds_triple(self):
-        # Given a straight list with a rising pair
-        gs = GameState()
-        starting_straight = [Card.from_string("3♠"), Card.from_string("4♠")]
-        gs.straight = starting_straight
-        # When the player plays a new card that is one rank below the lowest card in the pair
-        played_card = Card.from_string("2♦")
-        score = gs.check_straight(played_card)
-        # Then the score returned is 3, and the straight list is ascending
-        expected_score = 3
-        expected_straight_list = [
-            played_card, Card.from_string("3♠"), Card.from_string("4♠")]
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.straight, expected_straight_list)
-
-    def test_check_straight_adds_quad(self):
-        # Given a straight list with a triple
-        gs = GameState()
-        starting_straight = Deck.all_from_string(["2♦", "3♠", "4♠"])
-        gs.straight = starting_straight
-        # When the player plays a new card that fits the straight
-        played_card = Card.from_string("A♦")
-        score = gs.check_straight(played_card)
-        # Then the score returned is 4, and the straight list is ascending
-        expected_score = 4
-        expected_straight_list = Deck.all_from_string(["A♦", "2♦", "3♠", "4♠"])
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.straight, expected_straight_list)
-
-    def test_check_straight_breaks_straight(self):
-        # Given a straight list with a triple
-        gs = GameState()
-        starting_straight = Deck.all_from_string(["2♦", "3♠", "4♠"])
-        gs.straight = starting_straight
-        # When the player plays a new card that break the straight
-        played_card = Card.from_string("6♦")
-        score = gs.check_straight(played_card)
-        # Then the score returned is 0, and the straight list contains only that newly played card
-        expected_score = 0
-        expected_straight_list = Deck.all_from_string(["6♦"])
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.straight, expected_straight_list)
-
-    def test_check_match_single_played_card(self):
-        # Given an empty match list
-        gs = GameState()
-        starting_matches = []
-        gs.matches = starting_matches
-        # When the player plays a new card
-        played_card = Card.from_string("3♣")
-        score = gs.check_match(played_card)
-        # Then the score returned is 0, and the match list contains that one card
-        expected_score = 0
-        expected_matches_list = [played_card]
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.matches, expected_matches_list)
-
-    def test_check_match_two_matched_cards(self):
-        # Given a match list with one card
-        gs = GameState()
-        starting_matches = [Card.from_string("3♣")]
-        gs.matches = starting_matches
-        # When the player plays a card with the same rank
-        played_card = Card.from_string("3♦")
-        score = gs.check_match(played_card)
-        # Then the score returned is 2, and the match list contains the played card
-        expected_score = 2
-        expected_matches_list = Deck.all_from_string(["3♣", "3♦"])
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.matches, expected_matches_list)
-
-    def test_check_match_break_card(self):
-        # Given a match list with one card
+        gs.apply_score(Card.from_string("10♦"))
+        # When a five is played
+        score = gs.apply_score(Card.from_string("5♣"))
+        # Then the count is 15 and the score returned is 2
+        self.assertEqual(gs.count, 15)
+        self.assertEqual(score, 2)
+
+    def test_reset_count(self):
+        # Given a count with a card played
         gs = GameState()
-        starting_matches = [Card.from_string("K♦")]
-        gs.matches = starting_matches
-        # When the player plays a card with a different rank
-        played_card = Card.from_string("A♦")
-        score = gs.check_match(played_card)
-        # The the score returned is 0, and the match contains just the newly played card
-        expected_score = 0
-        expected_matches_list = [played_card]
-        self.assertEqual(score, expected_score)
-        self.assertEqual(gs.matches, expected_matches_list)
+        gs.apply_score(Card.from_string("10♦"))
+        # When the count is reset
+        gs.reset_count()
+        # Then the count is 0
+        self.assertEqual(gs.count, 0)
+
+    def test_start_plays_every_card(self):
+        # Given players who always play their first playable card
+        gs = GameState(inputFn=MagicMock(return_value=0))
+        gs.deal()
+        gs.make_crib()
+        # When the play phase is over
+        gs.start()
+        # Then both hands are empty, all 8 cards were played and points were scored
+        self.assertEqual(gs.player1.hand, [])
+        self.assertEqual(gs.player2.hand, [])
+        self.assertEqual(len(gs.played_stack), 8)
+        self.assertGreater(gs.player1.score + gs.player2.score, 0)
+        # and the original hands are kept for counting
+        self.assertEqual(len(gs.player1.original_hand), 4)
+
+    def test_strategies_decide_instead_of_input(self):
+        # Given players with strategies and an input that must not be asked
+        strategies = [GreedyStrategy(random.Random(1)), RandomStrategy(random.Random(2))]
+        gs = GameState(inputFn=MagicMock(side_effect=AssertionError), strategies=strategies)
+        gs.deal()
+        # When the crib is made, the deck cut and the cards played
+        gs.make_crib()
+        gs.cut()
+        gs.start()
+        # Then the strategies made every decision, greedy keeping the run of four
+        self.assertEqual(gs.crib[:2], Deck.all_from_string(["4♦", "8♠"]))
+        self.assertEqual(len(gs.crib), 4)
+        self.assertIsNotNone(gs.top_card)
+        self.assertEqual(len(gs.played_stack), 8)
 
     def test_score_meld_15(self):
         # Given a meld that adds up to 15
@@ -251,4 +190,111 @@ class TestGameState(unittest.TestCase):
         # Then the score returned is 4
         self.assertEqual(score, 4)
 
+    def test_state_restore(self):
+        # Given a game in the middle of play phase
+        gs = GameState(inputFn=None)
+        gs.begin_round()
+        rng = random.Random(0)
+        while gs.decision != 'play':
+            gs.apply(rng.choice(list(gs.moves())))
+        gs.apply(gs.moves()[0])
+        state = gs.state()
+        # When the rest of the round is played and the state restored
+        while gs.decision is not None:
+            gs.apply(gs.moves()[0])
+        gs.restore(state)
+        # Then the game is back to the same hands, count, scores and player to move
+        self.assertEqual(gs.state(), state)
+        self.assertEqual(len(gs.player1.hand) + len(gs.player2.hand), 7)
+        self.assertEqual(gs.count, gs.played_stack[0].points)
+        self.assertIs(gs.to_move, gs.dealer)
+
+    def test_apply_undo(self):
+        # Given a newly dealt round
+        gs = GameState(inputFn=None)
+        gs.begin_round()
+        rng = random.Random(1)
+        states = []
+        # When every move of the round is applied and then undone
+        while gs.decision is not None:
+            states.append(gs.state())
+            gs.apply(rng.choice(list(gs.moves())))
+        self.assertEqual(len(gs.played_stack), 8)
+        # Then each undo goes back one state, to the deal
+        while states:
+            gs.undo()
+            self.assertEqual(gs.state(), states.pop())
+        self.assertEqual(gs.decision, 'discard')
+        self.assertEqual(len(gs.player1.hand), 6)
+
+    def test_clone_is_independent(self):
+        # Given a game with strategies after the crib is made
+        strategies = [GreedyStrategy(random.Random(0)), RandomStrategy(random.Random(0))]
+        gs = GameState(inputFn=None, strategies=strategies)
+        gs.re_shuffle()
+        gs.deal()
+        gs.make_crib()
+        # When it is cloned and the clone plays on
+        clone = gs.clone()
+        clone.cut()
+        # Then the game is untouched and the clone keeps the strategies for its own players
+        self.assertIsNone(gs.top_card)
+        self.assertEqual(len(gs.deck), 40)
+        self.assertEqual(len(clone.deck), 39)
+        self.assertEqual(gs.player1.hand, clone.player1.hand)
+        self.assertIsNot(gs.player1.hand, clone.player1.hand)
+        self.assertIs(clone.strategies[clone.player1], strategies[0])
+        self.assertEqual(clone.phases[0], clone.re_shuffle)
+
+    def test_strategy_is_told_about_go(self):
+        # Given a count of 28 the pone cannot play on, holding only tens
+        class Recording(RandomStrategy):
+            def choose_play(self, playable, count, played, hand, top_card, opponent_passed):
+                self.calls.append((count, top_card, opponent_passed))
+                return super().choose_play(playable, count, played, hand, top_card, opponent_passed)
+        dealer = Recording(random.Random(0))
+        dealer.calls = []
+        gs = GameState(inputFn=None, strategies=[RandomStrategy(random.Random(0)), dealer])
+        gs.dealer = gs.player2
+        gs.top_card = Deck.all_from_string(["A♣"])[0]
+        gs.player1.hand = Deck.all_from_string(["10♠", "J♠"])
+        gs.player2.hand = Deck.all_from_string(["2♦", "A♥"])
+        gs.begin_play()
+        for card in Deck.all_from_string(["9♥", "9♦", "10♣"]):
+            gs.apply_score(card)
+        gs.to_move = gs.player1
+        # When play moves on
+        playable = gs.next_turn()
+        gs.play_card(gs.choose_play(playable))
+        # Then the dealer plays knowing the pone said GO, and knowing the top card
+        self.assertEqual(dealer.calls[0], (28, gs.top_card, True))
+        self.assertIs(gs.passed, gs.player1)
+
+    def test_profiled_clone_leaves_the_game_alone(self):
+        # Given a profiled game with a hand dealt
+        from profiler import Profiler
+        profiler = Profiler()
+        gs = profiler.attach(GameState(inputFn=None))
+        gs.deal()
+        # When the clone scores points
+        clone = gs.clone()
+        clone.award(clone.player1, 5)
+        clone.apply_score(clone.player2.hand[0], clone.player2)
+        # Then only the clone has them, and the profiler did not time the clone
+        self.assertEqual(clone.player1.score, 5)
+        self.assertEqual(gs.player1.score, 0)
+        self.assertEqual(gs.count, 0)
+        self.assertNotIn('award', profiler.by_function())
+
+    def test_state_keeps_scores_past_255(self):
+        # Given a game where a score has gone past a byte
+        gs = GameState(inputFn=None)
+        gs.player1.score = 300
+        # When it is restored from its state
+        state = gs.state()
+        gs.player1.score = 0
+        gs.restore(state)
+        # Then the score is kept
+        self.assertEqual(gs.player1.score, 300)
+
 # ♠♥♦♣
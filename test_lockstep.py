@@ -0,0 +1,52 @@
+import unittest
+
+from lockstep import LockstepScheduler, simulate_lockstep
+from strategy import GreedyStrategy, RandomStrategy
+
+
+class CountingStrategy(RandomStrategy):
+    """
+    RandomStrategy remembering the size of every batch it is asked to decide
+    """
+    batches = []
+
+    def choose_discards(self, decisions):
+        CountingStrategy.batches.append(('discard', len(decisions)))
+        return super().choose_discards(decisions)
+
+    def choose_plays(self, decisions):
+        CountingStrategy.batches.append(('play', len(decisions)))
+        return super().choose_plays(decisions)
+
+
+class TestLockstep(unittest.TestCase):
+
+    def test_games_finish(self):
+        # Given games between two strategies in lockstep
+        summary = simulate_lockstep([GreedyStrategy, RandomStrategy], 30, seed=1)
+        # Then every game has a winner with at least the winning score
+        self.assertEqual(summary.games, 30)
+        self.assertEqual(sum(summary.wins), 30)
+        self.assertGreater(summary.average_rounds(), 1)
+        for player in range(2):
+            points = sum(summary.points[phase][player] for phase in summary.points)
+            self.assertGreaterEqual(points, 121 * summary.wins[player])
+
+    def test_decisions_are_batched(self):
+        # Given many games with a strategy counting its batches
+        CountingStrategy.batches = []
+        scheduler = LockstepScheduler()
+        simulate_lockstep([CountingStrategy, RandomStrategy], 50, seed=2, scheduler=scheduler)
+        # Then the first discards of every game came in one batch
+        self.assertEqual(CountingStrategy.batches[0], ('discard', 50))
+        # And there are far fewer batches than decisions
+        self.assertLess(scheduler.steps * 10, scheduler.decisions)
+
+    def test_lockstep_is_deterministic(self):
+        # Given the same seed
+        # When games are played in lockstep twice
+        first = simulate_lockstep([GreedyStrategy, RandomStrategy], 20, seed=3)
+        second = simulate_lockstep([GreedyStrategy, RandomStrategy], 20, seed=3)
+        # Then the summaries are the same
+        self.assertEqual(first.wins, second.wins)
+        self.assertEqual(first.points, second.points)
@@ -0,0 +1,67 @@
+import unittest
+
+from deck import Deck
+from pegging import PeggingScorer
+
+
+def play_all(scorer, cards):
+    return [scorer.play(c) for c in Deck.all_from_string(cards)]
+
+
+class TestPeggingScorer(unittest.TestCase):
+
+    def test_single_card_scores_nothing(self):
+        # Given an empty count
+        scorer = PeggingScorer()
+        # When one card is played
+        # Then it scores nothing and counts its points
+        self.assertEqual(play_all(scorer, ["Q♦"]), [0])
+        self.assertEqual(scorer.count, 10)
+
+    def test_fifteen_and_31(self):
+        # Given cards landing on 15 and then 31
+        scorer = PeggingScorer()
+        # When they are played
+        scores = play_all(scorer, ["10♦", "5♣", "8♠", "8♦"])
+        # Then 15 and 31 score 2 each, and the eights pair
+        self.assertEqual(scores, [0, 2, 0, 2 + 2])
+        self.assertEqual(scorer.count, 31)
+
+    def test_pair_triple_and_quad(self):
+        # Given four cards of the same rank
+        scorer = PeggingScorer()
+        # When they are played
+        # Then they score 2, 6 and 12 for the pair, triple and quad
+        self.assertEqual(play_all(scorer, ["3♣", "3♦", "3♠", "3♥"]), [0, 2, 6, 12])
+
+    def test_run_in_any_order(self):
+        # Given cards making a run out of order
+        scorer = PeggingScorer()
+        # When they are played
+        # Then the third card scores a run of 3 and the fourth a run of 4
+        self.assertEqual(play_all(scorer, ["4♦", "2♣", "3♠", "A♦"]), [0, 0, 3, 4])
+
+    def test_run_uses_only_the_last_cards(self):
+        # Given a run after a card that is not part of it
+        scorer = PeggingScorer()
+        # When they are played
+        # Then only the last three cards score
+        self.assertEqual(play_all(scorer, ["10♦", "6♣", "5♠", "7♦"]), [0, 0, 0, 3])
+
+    def test_repeated_rank_breaks_the_run(self):
+        # Given a run, then a pair, then a card that would run with the cards before the pair
+        scorer = PeggingScorer()
+        # When they are played
+        # Then the pair scores 2 and the last card does not make a run through it
+        self.assertEqual(play_all(scorer, ["2♦", "3♣", "4♠", "4♦", "5♦"]), [0, 0, 3, 2, 0])
+
+    def test_restore_state(self):
+        # Given a scorer with a pair played
+        scorer = PeggingScorer()
+        play_all(scorer, ["7♦", "7♣"])
+        state = scorer.state()
+        # When another card is played and the state is restored
+        play_all(scorer, ["7♠"])
+        scorer.restore(state)
+        # Then the third seven scores the triple again
+        self.assertEqual(play_all(scorer, ["7♥"]), [6])
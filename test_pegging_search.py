@@ -0,0 +1,91 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from deck import CARDS, Deck
+from pegging import PeggingScorer
+from pegging_search import PeggingSearch
+from strategy import SearchStrategy
+
+
+def minimax(hands, scorer, mover, last):
+    """
+    Plain minimax over the play phase, points for mover minus points for the other player
+    """
+    playable = [c for c in hands[mover] if c.points <= 31 - scorer.count]
+    other = 1 - mover
+    if not hands[0] and not hands[1]:
+        return 0 if scorer.count == 0 or last is None else (1 if last == mover else -1)
+    if not playable:
+        if any(c.points <= 31 - scorer.count for c in hands[other]):
+            return -minimax(hands, scorer, other, last)
+        state = scorer.state()
+        scorer.reset()
+        value = minimax(hands, scorer, 1 - last, None)
+        scorer.restore(state)
+        return (value if 1 - last == mover else -value) + (1 if last == mover else -1)
+    best = None
+    for card in playable:
+        state = scorer.state()
+        points = scorer.play(card)
+        if scorer.count == 31:
+            scorer.reset()
+        rest = list(hands)
+        rest[mover] = [c for c in hands[mover] if c is not card]
+        value = points - minimax(rest, scorer, other, mover)
+        scorer.restore(state)
+        best = value if best is None else max(best, value)
+    return best
+
+
+class TestPeggingSearch(unittest.TestCase):
+
+    def test_value_matches_minimax(self):
+        # Given random hands with every card known
+        rng = random.Random(11)
+        for _ in range(10):
+            cards = rng.sample(CARDS, 8)
+            hand, opponent_hand = cards[:4], cards[4:]
+            # When the best play is searched
+            search = PeggingSearch()
+            card, value = search.best_play(hand, PeggingScorer(), opponent_hand)
+            # Then its value is the minimax value of the play phase
+            self.assertEqual(value, minimax([hand, opponent_hand], PeggingScorer(), 0, None))
+            self.assertIn(card, hand)
+
+    def test_takes_the_fifteen(self):
+        # Given a count of 10 and a five in hand, with nothing else worth playing for
+        scorer = PeggingScorer()
+        scorer.play(Deck.all_from_string(["10♣"])[0])
+        hand = Deck.all_from_string(["5♥"])
+        opponent_hand = Deck.all_from_string(["K♦"])
+        # When the best play is searched
+        card, value = PeggingSearch().best_play(hand, scorer, opponent_hand)
+        # Then the five is played for 15
+        self.assertEqual(card, hand[0])
+        self.assertEqual(value, 2 - 1)
+
+    def test_node_budget_still_returns_a_play(self):
+        # Given hidden opponent cards and a small node budget
+        hand = Deck.all_from_string(["5♥", "5♠", "J♦", "K♣"])
+        unseen = [c for c in CARDS if c not in hand]
+        search = PeggingSearch(max_nodes=2000, rng=random.Random(1))
+        # When the best play is searched
+        card, _ = search.best_play(hand, PeggingScorer(), unseen=unseen, opponent_cards=4)
+        # Then a card from the hand is played without going far over budget
+        self.assertIn(card, hand)
+        self.assertLess(search.stats.nodes, 2000 + 1024)
+
+    def test_search_strategy_knows_the_top_card_and_go(self):
+        # Given a strategy to play after the opponent said GO on a count of 25
+        strategy = SearchStrategy(random.Random(0))
+        hand = Deck.all_from_string(["3♥", "4♠"])
+        played = Deck.all_from_string(["2♦", "K♣", "5♠", "10♦"])
+        top_card = Deck.all_from_string(["7♣"])[0]
+        with patch.object(strategy.search, 'best_play', return_value=(hand[0], 0.0)) as best_play:
+            # When it chooses a play
+            strategy.choose_play(hand, 25, played, hand, top_card, True)
+        # Then the opponent's hand is never sampled with the top card and the search knows of the GO
+        _, kwargs = best_play.call_args
+        self.assertNotIn(top_card, kwargs['unseen'])
+        self.assertTrue(kwargs['opponent_passed'])
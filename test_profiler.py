@@ -0,0 +1,77 @@
+import random
+import unittest
+from itertools import count
+
+from events import NullSink
+from game_state import GameState
+from profiler import SCORING, Profiler
+from simulator import play_game
+from strategy import RandomStrategy
+
+
+def ticking_profiler():
+    # every reading of the clock is 1 second after the last one
+    ticks = count()
+    return Profiler(clock=lambda: float(next(ticks)))
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(123)
+
+    def test_nested_calls(self):
+        # Given a function that calls another twice
+        profiler = ticking_profiler()
+        inner = profiler.wrap('inner', lambda: None)
+        outer = profiler.wrap('outer', lambda: [inner(), inner()])
+        # When it is called
+        outer()
+        # Then both are recorded by call stack, inner time counted inside outer
+        self.assertEqual(profiler.stats[('outer', 'inner')].calls, 2)
+        self.assertEqual(profiler.stats[('outer', 'inner')].total, 2.0)
+        self.assertEqual(profiler.stats[('outer',)].total, 5.0)
+        self.assertEqual(profiler.stats[('outer',)].own, 3.0)
+        self.assertEqual(profiler.folded(), "outer 3000000\nouter;inner 2000000\n")
+
+    def test_game_phases_and_scoring(self):
+        # Given a profiled game
+        profiler = Profiler()
+        rng = random.Random(1)
+        play_game([RandomStrategy(rng), RandomStrategy(rng)], rng, profiler=profiler)
+        functions = profiler.by_function()
+        # Then every phase and the scoring inside them were timed
+        for name in ['re_shuffle', 'deal', 'make_crib', 'cut', 'start', 'peg', 'score', 'apply_score']:
+            self.assertIn(name, functions)
+        self.assertIn(('start', 'apply_score'), profiler.stats)
+        self.assertIn(('peg', 'score'), profiler.stats)
+        self.assertEqual(functions['re_shuffle'].calls, functions['start'].calls)
+        self.assertIn('apply_score', profiler.summary())
+
+    def test_attach_and_detach(self):
+        # Given a game that is not profiled
+        game = GameState(events=NullSink())
+        # Then it runs its own methods
+        for name in SCORING:
+            self.assertNotIn(name, game.__dict__)
+        # When it is attached and detached again
+        phases = list(game.phases)
+        Profiler().attach(game)
+        self.assertIn('score', game.__dict__)
+        Profiler.detach(game)
+        # Then it is back to its own methods
+        self.assertEqual(game.phases, phases)
+        for name in SCORING:
+            self.assertNotIn(name, game.__dict__)
+
+    def test_merge(self):
+        # Given two profilers that timed the same function
+        a, b = ticking_profiler(), ticking_profiler()
+        a.wrap('f', lambda: None)()
+        b.wrap('f', lambda: None)()
+        b.wrap('g', lambda: None)()
+        # When they are merged
+        a.merge(b)
+        # Then the calls add up
+        self.assertEqual(a.stats[('f',)].calls, 2)
+        self.assertEqual(a.stats[('g',)].calls, 1)
@@ -0,0 +1,77 @@
+import unittest
+
+from deck import Deck
+from replay import Replay
+from simulator import play_seeded
+from strategy import GreedyStrategy, RandomStrategy
+
+
+def recorded_game(seed, dealer=0):
+    return play_seeded([GreedyStrategy, RandomStrategy], seed, dealer, record=True).record
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_replay_reaches_recorded_result(self):
+        for seed, dealer in [(1, 0), (2, 1), (3, 0)]:
+            # Given a recorded game
+            record = recorded_game(seed, dealer)
+            # When it is replayed to the end
+            game = Replay.from_record(record).final_state()
+            # Then the scores and the winner are the recorded ones
+            self.assertEqual((game.player1.score, game.player2.score), record.scores)
+            self.assertEqual([game.player1, game.player2].index(game.winner), record.winner)
+            self.assertEqual(game.moves, len(Replay.from_record(record)))
+
+    def test_state_at_move_stops_before_it(self):
+        # Given the replay of a recorded game
+        record = recorded_game(4)
+        replay = Replay.from_record(record)
+        # When jumping to the first card played
+        game = replay.state_at(5)
+        # Then the crib is laid away and the top card cut, waiting on the pone's lead
+        self.assertEqual([c.id for c in game.crib], record.rounds[0].crib)
+        self.assertEqual(game.top_card.id, record.rounds[0].top_card)
+        self.assertEqual(game.played_stack, [])
+        self.assertEqual(game.decision, 'play')
+        self.assertIs(game.to_move, game.pone())
+
+    def test_snapshots_match_replay_from_start(self):
+        # Given a replay with snapshots and one without
+        record = recorded_game(5)
+        replay = Replay.from_record(record, snapshot_every=8)
+        replay.final_state()
+        plain = Replay.from_record(record, snapshot_every=None)
+        self.assertGreater(len(replay.snapshots), 1)
+        self.assertEqual(len(plain.snapshots), 1)
+        for move in range(0, len(replay), 7):
+            # When jumping to a move with both
+            a, b = replay.state_at(move), plain.state_at(move)
+            # Then the states are the same
+            self.assertEqual(a.moves, move)
+            self.assertEqual((a.player1.score, a.player2.score), (b.player1.score, b.player2.score))
+            self.assertEqual(a.played_stack, b.played_stack)
+            self.assertEqual(a.player1.hand, b.player1.hand)
+            self.assertEqual(a.count, b.count)
+
+    def test_jumps_do_not_change_snapshots(self):
+        # Given a replay that has been jumped around in
+        record = recorded_game(6)
+        replay = Replay.from_record(record, snapshot_every=4)
+        late = replay.state_at(len(replay) - 3)
+        replay.state_at(10)
+        # When jumping back to the same late move
+        again = replay.state_at(len(replay) - 3)
+        # Then the state is the same as before
+        self.assertEqual((again.player1.score, again.player2.score),
+                         (late.player1.score, late.player2.score))
+
+    def test_invalid_action_is_reported(self):
+        # Given a log that cuts a card already dealt
+        deck = [c.id for c in Deck.shuffled()]
+        actions = deck[:2] + deck[6:8] + [deck[0]]
+        replay = Replay([deck], actions)
+        # When it is replayed
+        # Then the bad move is reported
+        with self.assertRaises(ValueError):
+            replay.final_state()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from itertools import combinations
+
+from deck import Deck
+from score_index import _COMB, HAND_SIZE, INDEX_SIZE, ScoreIndex, build_block, hand_rank
+from scoring import score_hand
+
+# the index is written for the hands of the first CARDS cards only
+CARDS = 12
+
+
+class TestScoreIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'scores.bin')
+        with open(self.path, 'wb') as f:
+            f.truncate(INDEX_SIZE)
+            for high in range(HAND_SIZE - 1, CARDS):
+                high, block = build_block(high)
+                f.seek(_COMB[5][high])
+                f.write(block)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_hand_rank_is_dense(self):
+        # Given every hand of 5 out of the first 9 cards, in ascending order
+        ranks = [hand_rank(c) for c in sorted(combinations(range(9), 5), key=lambda c: c[::-1])]
+        # Then the ranks count up from 0 without gaps
+        self.assertEqual(ranks, list(range(len(ranks))))
+
+    def test_build_block_matches_score_hand(self):
+        # Given the block of hands whose highest card is the 11th card
+        high, block = build_block(10)
+        # Then every entry is the score of the hand at its rank
+        for ids in combinations(range(high), 4):
+            cards = Deck.from_ids(ids)
+            rank = hand_rank(ids + (high,)) - hand_rank((0, 1, 2, 3, high))
+            self.assertEqual(block[rank], score_hand(cards, Deck.from_ids([high])[0]))
+
+    def test_lookups_match_score_hand(self):
+        # Given an index with the blocks of the first 12 cards written
+        with ScoreIndex(self.path) as index:
+            # When every hand of those cards is looked up
+            for ids in combinations(range(CARDS), 5):
+                hand = Deck.from_ids(ids[1:])
+                top_card = Deck.from_ids(ids[:1])[0]
+                # Then both lookups are the hand's score, whichever card is the top card
+                expected = score_hand(hand, top_card)
+                self.assertEqual(index.score(hand, top_card), expected)
+                self.assertEqual(index.score_ids(ids), expected)
+
+    def test_rejects_a_file_of_the_wrong_size(self):
+        # Given an index file missing its last hand
+        with open(self.path, 'r+b') as f:
+            f.truncate(INDEX_SIZE - 1)
+        # When it is opened
+        # Then it is refused
+        with self.assertRaises(ValueError):
+            ScoreIndex(self.path)
@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from deck import Deck
+from events import NullSink
+from game_state import GameState
+from scoring import score_hand
+
+
+def powerset_score(hand, top_card):
+    gs = GameState(events=NullSink())
+    return sum(gs.score_meld(meld) for meld in GameState.powerset(list(hand) + [top_card]))
+
+
+class TestScoring(unittest.TestCase):
+
+    def test_score_hand_fifteens_and_pair(self):
+        # Given a hand with a pair of fives and two tens
+        hand = Deck.all_from_string(["5♦", "5♣", "10♠", "K♥"])
+        top_card = Deck.all_from_string(["A♠"])[0]
+        # When the hand is scored
+        score = score_hand(hand, top_card)
+        # Then each five makes 15 with each ten (8) and the fives pair (2)
+        self.assertEqual(score, 10)
+
+    def test_score_hand_flush(self):
+        # Given four spades with no other scoring melds
+        hand = Deck.all_from_string(["2♠", "4♠", "8♠", "Q♠"])
+        top_card = Deck.all_from_string(["K♦"])[0]
+        # When the hand is scored
+        score = score_hand(hand, top_card)
+        # Then only the flush scores
+        self.assertEqual(score, 4)
+
+    def test_score_hand_matches_powerset(self):
+        # Given a lot of random hands
+        rng = random.Random(7)
+        for _ in range(300):
+            cards = rng.sample(Deck.shuffled(), 5)
+            # When the hand is scored with the tables and with score_meld
+            # Then the scores are the same
+            self.assertEqual(score_hand(cards[:4], cards[4]),
+                             powerset_score(cards[:4], cards[4]), cards)
+
+    def test_game_state_score_uses_tables(self):
+        # Given a hand with a straight of three
+        gs = GameState()
+        hand = Deck.all_from_string(["2♦", "3♠", "4♠", "9♣"])
+        top_card = Deck.all_from_string(["J♥"])[0]
+        # When the game state scores it
+        score = gs.score(hand, top_card)
+        # Then it matches the powerset walk
+        self.assertEqual(score, powerset_score(hand, top_card))
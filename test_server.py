@@ -0,0 +1,107 @@
+import asyncio
+import random
+import unittest
+
+from async_game import AsyncGameState
+from events import NullSink
+from server import HOST, GameServer, loadtest, random_player
+
+
+class TestAsyncGameState(unittest.TestCase):
+
+    def test_play_with_awaitable_input(self):
+        # Given a game whose input is a coroutine always picking the first card
+        async def first_card(options):
+            await asyncio.sleep(0)
+            return 0
+        random.seed(123)
+        gs = AsyncGameState(inputFn=first_card, events=NullSink())
+        # When the game is played
+        winner = asyncio.run(gs.play())
+        # Then somebody wins with at least 121 points
+        self.assertGreaterEqual(winner.score, 121)
+
+
+class TestGameServer(unittest.TestCase):
+
+    def test_loadtest_plays_every_table(self):
+        # Given 3 tables of loopback clients
+        # When they play
+        metrics = asyncio.run(loadtest(3))
+        # Then all 3 games finish and moves were timed
+        self.assertEqual(metrics.games, 3)
+        self.assertGreater(metrics.moves, 0)
+        self.assertGreater(metrics.percentile(99), 0)
+
+    def test_move_timeout_plays_the_first_card(self):
+        # Given a player who never answers, and a short move timeout
+        async def game():
+            server = GameServer(move_timeout=0.005)
+            port = await server.start(HOST, 0)
+            silent = await asyncio.open_connection(HOST, port)
+            playing = await asyncio.open_connection(HOST, port)
+            await random_player(*playing, random.Random(0))
+            silent[1].close()
+            await server.close()
+            return server.metrics
+        # When the game is played
+        metrics = asyncio.run(game())
+        # Then the game still finishes, with the silent player's moves timed out
+        self.assertEqual(metrics.games, 1)
+        self.assertGreater(metrics.timeouts, 0)
+
+    def test_late_reply_is_dropped(self):
+        # Given a player who answers its first prompt once the next prompt has come
+        async def late_player(reader, writer):
+            unanswered = None
+            prompts = 0
+            async for line in reader:
+                parts = line.decode().split()
+                if parts[0] == 'PROMPT':
+                    prompts += 1
+                    if prompts == 1:
+                        unanswered = parts[1]
+                        continue
+                    if unanswered is not None:
+                        writer.write(f"{unanswered} 0\n".encode())
+                        unanswered = None
+                    writer.write(f"{parts[1]} 0\n".encode())
+                    await writer.drain()
+                elif parts[0] == 'END':
+                    break
+            writer.close()
+
+        async def game():
+            server = GameServer(move_timeout=0.01)
+            port = await server.start(HOST, 0)
+            late = await asyncio.open_connection(HOST, port)
+            playing = await asyncio.open_connection(HOST, port)
+            await asyncio.gather(late_player(*late), random_player(*playing, random.Random(0)))
+            await server.close()
+            return server.metrics
+        # When the game is played
+        metrics = asyncio.run(game())
+        # Then the late reply is dropped instead of answering the next prompt
+        self.assertEqual(metrics.games, 1)
+        self.assertEqual(metrics.timeouts, 1)
+        self.assertEqual(metrics.stale, 1)
+
+    def test_dropped_waiting_client_is_not_seated(self):
+        # Given a client that connects and drops before an opponent comes
+        async def game():
+            server = GameServer()
+            port = await server.start(HOST, 0)
+            _, dropped = await asyncio.open_connection(HOST, port)
+            dropped.close()
+            await dropped.wait_closed()
+            await asyncio.sleep(0.05)
+            # When two more clients connect
+            players = [await asyncio.open_connection(HOST, port) for _ in range(2)]
+            await asyncio.wait_for(asyncio.gather(
+                *(random_player(*p, random.Random(i)) for i, p in enumerate(players))), 30)
+            await server.close()
+            return server.metrics
+        metrics = asyncio.run(game())
+        # Then they play each other and no game is abandoned
+        self.assertEqual(metrics.games, 1)
+        self.assertEqual(metrics.abandoned, 0)
@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from simulator import SimulationSummary, play_game, simulate
+from strategy import GreedyStrategy, RandomStrategy
+
+
+class TestSimulator(unittest.TestCase):
+
+    def test_play_game_until_winning_score(self):
+        # Given two random strategies
+        rng = random.Random(1)
+        strategies = [RandomStrategy(rng), RandomStrategy(rng)]
+        # When a game is played
+        result = play_game(strategies, rng)
+        # Then there is a winner, who scored at least 121 points
+        self.assertIn(result.winner, (0, 1))
+        points = sum(p[result.winner] for p in result.points.values())
+        self.assertGreaterEqual(points, 121)
+        self.assertGreater(result.rounds, 0)
+
+    def test_simulate_is_deterministic(self):
+        # Given the same seed
+        # When games are simulated twice
+        first = simulate([GreedyStrategy, RandomStrategy], 20, seed=3, processes=1, chunk_size=5)
+        second = simulate([GreedyStrategy, RandomStrategy], 20, seed=3, processes=1, chunk_size=5)
+        # Then the summaries are the same
+        self.assertEqual(first.games, 20)
+        self.assertEqual(first.wins, second.wins)
+        self.assertEqual(first.points, second.points)
+        self.assertEqual(first.rounds, second.rounds)
+
+    def test_fast_shuffle_is_deterministic(self):
+        # Given the same seed
+        # When games are simulated twice with decks permuted instead of shuffled
+        first = simulate([GreedyStrategy, RandomStrategy], 10, seed=3, processes=1, fast_shuffle=True)
+        second = simulate([GreedyStrategy, RandomStrategy], 10, seed=3, processes=1, fast_shuffle=True)
+        # Then the summaries are the same
+        self.assertEqual(first.games, 10)
+        self.assertEqual(first.points, second.points)
+        self.assertEqual(first.rounds, second.rounds)
+
+    def test_merge_summaries(self):
+        # Given two summaries
+        a = simulate([RandomStrategy, RandomStrategy], 4, seed=1, processes=1)
+        b = simulate([RandomStrategy, RandomStrategy], 6, seed=2, processes=1)
+        # When they are merged
+        total = SimulationSummary()
+        total.merge(a)
+        total.merge(b)
+        # Then the totals add up
+        self.assertEqual(total.games, 10)
+        self.assertEqual(sum(total.wins), 10)
+        self.assertEqual(total.rounds, a.rounds + b.rounds)
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import tournament
+from strategy import GreedyStrategy, RandomStrategy
+from tournament import Tournament, fit_ratings, games_won, play_deals, play_duplicate
+
+
+class TestTournament(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'cache.json')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_duplicate_deals_of_the_same_strategy_split(self):
+        # Given a strategy playing itself on the same deals in both seats
+        outcomes = play_deals((GreedyStrategy, GreedyStrategy), 0, 0, 10)
+        # Then the same seat wins both games, so every deal is split
+        self.assertEqual(outcomes, [0, 10, 0])
+
+    def test_duplicate_games_deal_and_cut_the_same_cards(self):
+        # Given deals played by different strategies in swapped seats
+        for deal_seed in range(20):
+            first, second = (r.record for r in play_duplicate(
+                (GreedyStrategy, RandomStrategy), deal_seed, dealer=deal_seed % 2, record=True))
+            # Then every round both games play shuffles the same deck, so the seats
+            # are dealt the same hands, and cuts the same top card
+            self.assertEqual(first.first_dealer, second.first_dealer)
+            for a, b in zip(first.rounds, second.rounds):
+                self.assertEqual(a.deck, b.deck)
+                self.assertEqual(a.top_card, b.top_card)
+
+    def test_duplicate_games_of_one_strategy_are_the_same(self):
+        # Given a strategy playing itself in both games of a deal
+        first, second = (r.record for r in play_duplicate(
+            (RandomStrategy, RandomStrategy), 7, record=True))
+        # Then the hands, cribs, top cards and plays of every round are the same
+        self.assertEqual(first.encode(), second.encode())
+
+    def test_play_deals_is_deterministic(self):
+        # Given the same deals played twice
+        # Then the outcomes are the same
+        self.assertEqual(play_deals((GreedyStrategy, RandomStrategy), 3, 5, 4),
+                         play_deals((GreedyStrategy, RandomStrategy), 3, 5, 4))
+
+    def test_fit_ratings(self):
+        # Given a beating b 3 games to 1
+        elo = fit_ratings(['a', 'b'], {('a', 'b'): 3, ('b', 'a'): 1})
+        # Then a is rated above b, both averaging 0
+        self.assertGreater(elo['a'], 0)
+        self.assertAlmostEqual(elo['a'] + elo['b'], 0)
+        # And with the half win each way the expected score matches 3.5 / 5
+        expected = 1 / (1 + 10 ** ((elo['b'] - elo['a']) / 400))
+        self.assertAlmostEqual(expected, 3.5 / 5)
+
+    def test_games_won(self):
+        # Given a match where a lost 1 deal, split 2 and won 3
+        # Then a won 2 + 6 games and b won 2 + 2
+        self.assertEqual(games_won({('a', 'b'): [1, 2, 3]}), {('a', 'b'): 8, ('b', 'a'): 4})
+
+    def test_cache_skips_played_chunks(self):
+        # Given a round robin played with a cache
+        first = Tournament([GreedyStrategy, RandomStrategy], deals=6, processes=1, cache_path=self.path)
+        first.round_robin()
+        # When it is played again with the same versions and seed
+        second = Tournament([RandomStrategy, GreedyStrategy], deals=6, processes=1, cache_path=self.path)
+        with patch.object(tournament, 'play_deals') as play:
+            second.round_robin()
+        # Then nothing is played and the results are the same
+        play.assert_not_called()
+        self.assertEqual(second.outcomes, first.outcomes)
+
+    def test_new_version_is_replayed(self):
+        # Given a round robin played with a cache
+        Tournament([GreedyStrategy, RandomStrategy], deals=6, processes=1, cache_path=self.path).round_robin()
+
+        # When a strategy has a new version
+        class NewGreedy(GreedyStrategy):
+            version = 2
+        NewGreedy.__name__ = 'GreedyStrategy'
+        second = Tournament([NewGreedy, RandomStrategy], deals=6, processes=1, cache_path=self.path)
+        with patch.object(tournament, 'play_deals', return_value=[0, 6, 0]) as play:
+            second.round_robin()
+        # Then its matches are played again
+        play.assert_called_once()
+
+    def test_ratings(self):
+        # Given a round robin of greedy against random
+        t = Tournament([GreedyStrategy, RandomStrategy], deals=20, processes=1)
+        t.round_robin()
+        ratings = t.ratings(bootstrap=50)
+        # Then greedy is rated first, inside its confidence interval
+        self.assertEqual([r.name for r in ratings], ['GreedyStrategy', 'RandomStrategy'])
+        best = ratings[0]
+        self.assertLessEqual(best.low, best.elo)
+        self.assertLessEqual(best.elo, best.high)
+        self.assertEqual(best.games, 40)
+
+    def test_swiss_pairs_strategies_not_played(self):
+        # Given three strategies after one match
+        t = Tournament([GreedyStrategy, RandomStrategy, type('Other', (RandomStrategy,), {})],
+                       deals=2, processes=1)
+        t.play([('GreedyStrategy', 'RandomStrategy')])
+        # When the next swiss round is paired
+        pairs = t.swiss_pairs()
+        # Then only strategies that have not played each other are paired
+        self.assertEqual(len(pairs), 1)
+        self.assertIn('Other', pairs[0])
@@ -0,0 +1,296 @@
+"""
+Strategy tournaments played as duplicate cribbage, rated with Bradley-Terry (Elo).
+
+Every match plays the same deal set: deal i seeds the deck and the cuts of two
+games, one with each strategy in each seat, so both strategies are dealt the same
+cards and cut the same top cards, and the luck of the deal cancels out. A deal ends with one strategy winning both games or
+with a split. Matches are split into chunks of deals spread over a process pool.
+
+Each finished chunk is kept in a JSON cache keyed by both strategies' names and
+versions (Strategy.version), the seed and the deals of the chunk, so a pairing
+that has not changed is never played again, and playing more deals only plays
+the new chunks.
+
+Ratings are the Bradley-Terry maximum likelihood fit of the games won, on the Elo
+scale with an average of 0. The confidence intervals are percentiles of the ratings
+fit to resampled deals of every match.
+
+    python tournament.py [strategies...] [--deals N] [--seed S] [--processes N]
+                         [--cache PATH] [--swiss ROUNDS]
+"""
+import argparse
+import json
+import math
+import os
+import random
+from itertools import combinations
+from multiprocessing import Pool
+
+import strategy
+from simulator import play_seeded
+
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tournament_cache.json')
+
+DEALS = 500
+CHUNK_DEALS = 50
+
+# ratings fit to resampled deals for the confidence intervals
+BOOTSTRAP = 200
+CONFIDENCE = 0.95
+# half a win each way between every pair that played, so a strategy
+# winning every game still has a finite rating
+PRIOR_WINS = 0.5
+ELO_SCALE = 400 / math.log(10)
+
+# outcomes of a deal for the first strategy of a match
+LOST_BOTH, SPLIT, WON_BOTH = 0, 1, 2
+
+# mixed into a deal's seed for the rng cutting the deck in both of its games
+CUT_SALT = 0x5EED_C07
+# bumped whenever deals are played differently, so older cached chunks are played again
+CACHE_FORMAT = 2
+
+
+class Rating:
+
+    def __init__(self, name, elo, low, high, games, wins):
+        self.name = name
+        self.elo = elo
+        self.low = low  # confidence interval of elo
+        self.high = high
+        self.games = games
+        self.wins = wins
+
+    def __str__(self):
+        return (f"{self.name:<16} {self.elo:>7.1f}  [{self.low:>7.1f}, {self.high:>7.1f}]  "
+                f"{self.games:>7} games  wins {self.wins / self.games if self.games else 0:.1%}")
+
+
+class ResultCache:
+    """
+    Deal outcomes of match chunks by key, saved to a JSON file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.results = json.load(f)
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def put(self, key, outcomes):
+        self.results[key] = outcomes
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.results, f)
+        os.replace(tmp_path, self.path)
+
+
+def play_duplicate(strategy_classes, deal_seed, dealer=0, record=False):
+    """
+    The GameResults of the deal played with the strategies in their seats, then swapped.
+    Both games shuffle the same decks and cut at the same places, and the strategy
+    in each seat gets the same rng.
+    """
+    return [play_seeded(seats, deal_seed, dealer, record, cut_rng=random.Random(deal_seed ^ CUT_SALT))
+            for seats in (strategy_classes, strategy_classes[::-1])]
+
+
+def play_deals(strategy_classes, seed, first, count):
+    """
+    Plays deals first to first + count of the deal set, each twice with the seats swapped.
+    Returns the number of deals where the first strategy lost both, split and won both.
+    """
+    outcomes = [0, 0, 0]
+    for deal in range(first, first + count):
+        games = play_duplicate(strategy_classes, (seed << 32) + deal, dealer=deal % 2)
+        wins = sum(result.winner == seat for seat, result in enumerate(games))
+        outcomes[wins] += 1
+    return outcomes
+
+
+def _play_chunk(chunk):
+    a, b, seed, first, count = chunk
+    return chunk, play_deals((a, b), seed, first, count)
+
+
+def fit_ratings(names, wins):
+    """
+    Bradley-Terry ratings on the Elo scale, averaging 0, from {(winner, loser): games won}
+    """
+    won = dict.fromkeys(names, 0.0)
+    games = {}  # {(name, name): games between them}, both ways
+    for (a, b), n in wins.items():
+        won[a] += n
+        games[a, b] = games.get((a, b), 0) + n
+        games[b, a] = games.get((b, a), 0) + n
+    for a, b in list(games):
+        won[a] += PRIOR_WINS
+        games[a, b] += 2 * PRIOR_WINS
+    # minorization-maximization (Hunter 2004) on the strengths
+    strength = dict.fromkeys(names, 1.0)
+    for _ in range(1000):
+        updated = {}
+        for a in names:
+            total = sum(n / (strength[a] + strength[b]) for (x, b), n in games.items() if x == a)
+            updated[a] = won[a] / total if total else 1.0
+        mean = sum(math.log(s) for s in updated.values()) / len(names)
+        updated = {a: s / math.exp(mean) for a, s in updated.items()}
+        change = max(abs(updated[a] - strength[a]) for a in names)
+        strength = updated
+        if change < 1e-10:
+            break
+    return {a: ELO_SCALE * math.log(s) for a, s in strength.items()}
+
+
+def games_won(outcomes):
+    """
+    {(winner, loser): games won} from the deal outcomes of each match
+    """
+    wins = {}
+    for (a, b), (lost_both, split, won_both) in outcomes.items():
+        wins[a, b] = wins.get((a, b), 0) + split + 2 * won_both
+        wins[b, a] = wins.get((b, a), 0) + split + 2 * lost_both
+    return wins
+
+
+class Tournament:
+
+    def __init__(self, strategy_classes, deals=DEALS, seed=0, processes=None, cache_path=None):
+        self.classes = {cls.__name__: cls for cls in strategy_classes}
+        self.names = list(self.classes)
+        self.deals = deals
+        self.seed = seed
+        self.processes = processes
+        self.cache = ResultCache(cache_path) if cache_path is not None else None
+        # {(name, name): deals lost both, split, won both by the first}, names sorted
+        self.outcomes = {}
+
+    def key(self, a, b, first, count):
+        return (f"{a}@{self.classes[a].version} {b}@{self.classes[b].version} "
+                f"seed {self.seed} deals {first}-{first + count} format {CACHE_FORMAT}")
+
+    def play(self, pairs, progress=None):
+        """
+        Plays the matches between each pair of names that are not played or cached yet
+        """
+        todo = []
+        for pair in pairs:
+            a, b = sorted(pair)
+            if (a, b) in self.outcomes:
+                continue
+            self.outcomes[a, b] = [0, 0, 0]
+            for first in range(0, self.deals, CHUNK_DEALS):
+                count = min(CHUNK_DEALS, self.deals - first)
+                cached = self.cache.get(self.key(a, b, first, count)) if self.cache is not None else None
+                if cached is None:
+                    todo.append((self.classes[a], self.classes[b], self.seed, first, count))
+                else:
+                    self.add(a, b, cached)
+        if self.processes == 1 or not todo:
+            results = map(_play_chunk, todo)
+            pool = None
+        else:
+            pool = Pool(self.processes)
+            results = pool.imap_unordered(_play_chunk, todo)
+        try:
+            for done, ((a, b, _, first, count), outcomes) in enumerate(results, 1):
+                self.add(a.__name__, b.__name__, outcomes)
+                if self.cache is not None:
+                    self.cache.put(self.key(a.__name__, b.__name__, first, count), outcomes)
+                    self.cache.save()
+                if progress is not None:
+                    progress(done, len(todo))
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def add(self, a, b, outcomes):
+        self.outcomes[a, b] = [x + y for x, y in zip(self.outcomes[a, b], outcomes)]
+
+    def round_robin(self, progress=None):
+        self.play(combinations(self.names, 2), progress)
+
+    def swiss(self, rounds, progress=None):
+        """
+        Plays rounds of matches, each pairing strategies rated close together
+        that have not played yet
+        """
+        for _ in range(rounds):
+            pairs = self.swiss_pairs()
+            if not pairs:
+                break
+            self.play(pairs, progress)
+
+    def swiss_pairs(self):
+        elo = fit_ratings(self.names, games_won(self.outcomes))
+        # the listed order breaks ties before anything is played
+        standings = sorted(self.names, key=lambda n: -elo[n])
+        played = {frozenset(pair) for pair in self.outcomes}
+        pairs = []
+        while len(standings) > 1:
+            a = standings.pop(0)
+            # the closest rated opponent not played yet, a strategy left over sits the round out
+            b = next((b for b in standings if frozenset((a, b)) not in played), None)
+            if b is not None:
+                standings.remove(b)
+                pairs.append((a, b))
+        return pairs
+
+    def ratings(self, bootstrap=BOOTSTRAP, confidence=CONFIDENCE, seed=0):
+        """
+        The Rating of every strategy, best first
+        """
+        wins = games_won(self.outcomes)
+        elo = fit_ratings(self.names, wins)
+        rng = random.Random(seed)
+        samples = {name: [] for name in self.names}
+        for _ in range(bootstrap):
+            resampled = {}
+            for pair, outcomes in self.outcomes.items():
+                deals = rng.choices(range(3), weights=outcomes, k=sum(outcomes)) if any(outcomes) else []
+                resampled[pair] = [deals.count(LOST_BOTH), deals.count(SPLIT), deals.count(WON_BOTH)]
+            for name, value in fit_ratings(self.names, games_won(resampled)).items():
+                samples[name].append(value)
+        tail = (1 - confidence) / 2
+        ratings = []
+        for name in self.names:
+            values = sorted(samples[name])
+            if values:
+                low = values[int(tail * (len(values) - 1))]
+                high = values[math.ceil((1 - tail) * (len(values) - 1))]
+            else:
+                low = high = elo[name]
+            games = sum(n for (a, b), n in wins.items() if name in (a, b))
+            won = sum(n for (a, _), n in wins.items() if a == name)
+            ratings.append(Rating(name, elo[name], low, high, games, won))
+        return sorted(ratings, key=lambda r: -r.elo)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('strategies', nargs='*',
+                        default=['RandomStrategy', 'GreedyStrategy', 'SolverStrategy'])
+    parser.add_argument('--deals', type=int, default=DEALS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--swiss', type=int, default=None, metavar='ROUNDS')
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f"{done}/{total} chunks", flush=True)
+
+    tournament = Tournament([getattr(strategy, name) for name in args.strategies], args.deals,
+                            args.seed, args.processes, args.cache)
+    if args.swiss is None:
+        tournament.round_robin(progress)
+    else:
+        tournament.swiss(args.swiss, progress)
+    for rating in tournament.ratings():
+        print(rating)